@@ -1,13 +1,14 @@
-from typing import List
+from typing import List, Optional
 
 import allure
-from appium.webdriver import WebElement
 from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 
+from page_objects.cart_rows import CartRows
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class CartDetailsPage(DriverCommands):
@@ -17,7 +18,7 @@ class CartDetailsPage(DriverCommands):
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "CART_ITEMS": {
-            "android": (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().description("test-Item")'),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Item"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "CONTINUE_SHOPPING_BUTTON": {
@@ -59,22 +60,42 @@ class CartDetailsPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
+        self._cart_rows: Optional[CartRows] = None
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["CART_CONTENT"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["CART_CONTENT"])
+
+    def cart_rows(self) -> CartRows:
+        """
+        Gets the product rows of the cart, read again only when the screen generation changed.
+
+        :return: CartRows of the current screen
+        """
+        rows = self._cart_rows
+        if rows is None or rows.generation != self.element_cache.generation:
+            self.wait.wait_for_presence_of_element(self.selectors["CART_CONTENT"])
+            snapshot = self.snapshot()
+            rows = CartRows(
+                snapshot,
+                self.selectors,
+                self.element_cache.generation,
+                snapshot.find(self.selectors["CART_CONTENT"]),
+            )
+            self._cart_rows = rows
+        return rows
 
     @allure.step("Get all products in cart")
     def get_products_in_cart(self) -> List[WebElement]:
-        cart_id = self.SELECTORS["CART_CONTENT"][self.platform]
-        items_id = self.SELECTORS["CART_ITEMS"][self.platform]
+        cart_id = self.selectors["CART_CONTENT"]
+        items_id = self.selectors["CART_ITEMS"]
         return self.find_all_child_elements_in_parent_element(cart_id, items_id)
 
     @allure.step("Get amount of products in cart")
     def get_amount_of_products_in_cart(self) -> int:
-        return len(self.get_products_in_cart())
+        return len(self.cart_rows())
 
     @allure.step("Assert amount of products in cart")
     def assert_amount_of_products_in_cart(self, expected_amount: int) -> None:
@@ -89,10 +110,7 @@ class CartDetailsPage(DriverCommands):
 
     @allure.step("Get product name based on index")
     def get_product_name(self, product_index: int) -> str:
-        product_text_selector = self.SELECTORS["PRODUCT_TEXT"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_text_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].name
 
     @allure.step("Assert product name")
     def assert_product_name(self, product_index: int, expected_name: str) -> None:
@@ -103,10 +121,7 @@ class CartDetailsPage(DriverCommands):
 
     @allure.step("Get product price based on index")
     def get_product_price(self, product_index: int) -> str:
-        product_price_selector = self.SELECTORS["PRODUCT_PRICE"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_price_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].price
 
     @allure.step("Assert product price")
     def assert_product_price(self, product_index: int, expected_price: str) -> None:
@@ -117,33 +132,40 @@ class CartDetailsPage(DriverCommands):
 
     @allure.step("Check remove button visibility")
     def check_if_remove_button_visible_on_product_item(self, product_index: int) -> None:
-        remove_button = self.SELECTORS["REMOVE_BUTTON"][self.platform]
-        self.find_child_element_in_parent_element(self.get_product(product_index), remove_button)
+        if not self.cart_rows()[product_index].has_remove_button:
+            remove_button = self.selectors["REMOVE_BUTTON"]
+            self.find_child_element_in_parent_element(
+                self.get_product(product_index), remove_button
+            )
 
     @allure.step("Remove product from cart")
     def remove_product_from_cart(self, product_index: int) -> None:
-        remove_button = self.SELECTORS["REMOVE_BUTTON"][self.platform]
-        self.find_child_element_in_parent_element(self.get_product(product_index), remove_button)
-        self.click_element(remove_button)
+        row = self.cart_rows()[product_index]
+        if row.remove_button_displayed and self.is_on_screen(row.remove_button_bounds):
+            self.tap_bounds(row.remove_button_bounds)
+        else:
+            remove_button = self.selectors["REMOVE_BUTTON"]
+            self.click_element(
+                self.find_child_element_in_parent_element(
+                    self.get_product(product_index), remove_button
+                )
+            )
 
     @allure.step("Click continue shopping button")
     def click_continue_shopping_button(self) -> None:
-        continue_button_id = self.SELECTORS["CONTINUE_SHOPPING_BUTTON"][self.platform]
+        continue_button_id = self.selectors["CONTINUE_SHOPPING_BUTTON"]
         self.swipe.swipe_to_object_down(continue_button_id)
         self.click_element(continue_button_id)
 
     @allure.step("Click checkout button")
     def click_checkout_button(self) -> None:
-        checkout_button_id = self.SELECTORS["CHECKOUT_BUTTON"][self.platform]
+        checkout_button_id = self.selectors["CHECKOUT_BUTTON"]
         self.swipe.swipe_to_object_down(checkout_button_id)
         self.click_element(checkout_button_id)
 
     @allure.step("Get product quantity")
     def get_product_quantity(self, product_index: int) -> str:
-        product_quantity_selector = self.SELECTORS["PRODUCT_QUANTITY"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_quantity_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].quantity
 
     @allure.step("Assert product quantity")
     def assert_product_quantity(self, product_index: int, expected_quantity: str) -> None:
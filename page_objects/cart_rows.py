@@ -0,0 +1,80 @@
+from typing import List, Optional, Tuple
+
+from utils.page_snapshot import PageSnapshot, SnapshotNode
+from utils.selector_table import SelectorTable
+
+
+class CartRow:
+    """
+    Product row of the cart or the checkout overview read from the page snapshot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        price: str,
+        quantity: str,
+        bounds: Tuple[int, int, int, int],
+        remove_button_bounds: Optional[Tuple[int, int, int, int]],
+        remove_button_displayed: bool = False,
+    ) -> None:
+        self.name = name
+        self.price = price
+        self.quantity = quantity
+        self.bounds = bounds
+        self.remove_button_bounds = remove_button_bounds
+        self.remove_button_displayed = remove_button_displayed
+
+    @property
+    def has_remove_button(self) -> bool:
+        return self.remove_button_bounds is not None
+
+    def __repr__(self) -> str:
+        return f"<CartRow {self.name!r} {self.price!r} x{self.quantity}>"
+
+
+class CartRows:
+    """
+    All product rows visible on the screen, read in one page source request. Used by the cart
+    and the checkout overview, which share the row layout. The rows belong to the screen
+    generation they were read in and have to be read again after the UI changes.
+    """
+
+    def __init__(
+        self,
+        snapshot: PageSnapshot,
+        selectors: SelectorTable,
+        generation: int,
+        container: Optional[SnapshotNode] = None,
+    ) -> None:
+        self.generation = generation
+        self.rows: List[CartRow] = [
+            self._read_row(snapshot, selectors, node)
+            for node in snapshot.find_all(selectors["CART_ITEMS"], container)
+        ]
+
+    def __getitem__(self, index: int) -> CartRow:
+        return self.rows[index]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _read_row(snapshot: PageSnapshot, selectors: SelectorTable, node: SnapshotNode) -> CartRow:
+        def read_text(selector_name: str) -> str:
+            found = snapshot.find(selectors[selector_name], node)
+            return found.text.rstrip() if found else ""
+
+        remove_button = (
+            snapshot.find(selectors["REMOVE_BUTTON"], node)
+            if "REMOVE_BUTTON" in selectors
+            else None
+        )
+        return CartRow(
+            name=read_text("PRODUCT_TEXT"),
+            price=read_text("PRODUCT_PRICE"),
+            quantity=read_text("PRODUCT_QUANTITY"),
+            bounds=node.bounds,
+            remove_button_bounds=remove_button.bounds if remove_button else None,
+            remove_button_displayed=remove_button.displayed if remove_button else False,
+        )
@@ -3,8 +3,8 @@ from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class CheckoutCompletePage(DriverCommands):
@@ -19,11 +19,9 @@ class CheckoutCompletePage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(
-            self.SELECTORS["CHECKOUT_COMPLETE_CONTEXT"][self.platform]
-        )
+        self.wait.wait_for_element_visibility(self.selectors["CHECKOUT_COMPLETE_CONTEXT"])
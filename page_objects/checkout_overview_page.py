@@ -1,13 +1,16 @@
-from typing import List
+import logging as log
+from typing import Dict, List, Optional, Tuple
 
 import allure
-from appium.webdriver import WebElement
 from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 
+from page_objects.cart_rows import CartRow, CartRows
 from utils.driver_commands import DriverCommands
+from utils.page_snapshot import PageSnapshot
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class CheckoutOverviewPage(DriverCommands):
@@ -20,7 +23,7 @@ class CheckoutOverviewPage(DriverCommands):
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "CART_ITEMS": {
-            "android": (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().description("test-Item")'),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Item"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_TEXT": {
@@ -28,6 +31,7 @@ class CheckoutOverviewPage(DriverCommands):
                 AppiumBy.ANDROID_UIAUTOMATOR,
                 'new UiSelector().description("test-Description").childSelector(new UiSelector().className("android.widget.TextView").instance(0))',  # noqa E501
             ),
+            "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_PRICE": {
             "android": (
@@ -71,22 +75,34 @@ class CheckoutOverviewPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
+        self._cart_rows: Optional[CartRows] = None
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(
-            self.SELECTORS["CHECKOUT_OVERVIEW_LABEL"][self.platform]
-        )
+        self.wait.wait_for_element_visibility(self.selectors["CHECKOUT_OVERVIEW_LABEL"])
+
+    def cart_rows(self) -> CartRows:
+        """
+        Gets the product rows of the overview, read again only when the screen generation
+        changed.
+
+        :return: CartRows of the current screen
+        """
+        rows = self._cart_rows
+        if rows is None or rows.generation != self.element_cache.generation:
+            rows = CartRows(self.snapshot(), self.selectors, self.element_cache.generation)
+            self._cart_rows = rows
+        return rows
 
     @allure.step("Get all products on overview")
     def get_products_on_overview(self) -> List[WebElement]:
-        return self.find_elements(self.SELECTORS["CART_ITEMS"][self.platform])
+        return self.find_elements(self.selectors["CART_ITEMS"])
 
     @allure.step("Get amount of all products on overview")
     def get_amount_of_products_on_overview(self) -> int:
-        return len(self.get_products_on_overview())
+        return len(self.cart_rows())
 
     @allure.step("Assert amount of products on overview")
     def assert_amount_of_products_on_overview(self, expected_amount: int) -> None:
@@ -101,10 +117,7 @@ class CheckoutOverviewPage(DriverCommands):
 
     @allure.step("Get product name based on index")
     def get_product_name(self, product_index: int) -> str:
-        product_text_selector = self.SELECTORS["PRODUCT_TEXT"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_text_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].name
 
     @allure.step("Assert product name")
     def assert_product_name(self, product_index: int, expected_name: str) -> None:
@@ -115,10 +128,7 @@ class CheckoutOverviewPage(DriverCommands):
 
     @allure.step("Get product price based on index")
     def get_product_price(self, product_index: int) -> str:
-        product_price_selector = self.SELECTORS["PRODUCT_PRICE"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_price_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].price
 
     @allure.step("Assert product price")
     def assert_product_price(self, product_index: int, expected_price: str) -> None:
@@ -129,10 +139,7 @@ class CheckoutOverviewPage(DriverCommands):
 
     @allure.step("Get product quantity")
     def get_product_quantity(self, product_index: int) -> str:
-        product_quantity_selector = self.SELECTORS["PRODUCT_QUANTITY"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product(product_index), product_quantity_selector
-        ).text.rstrip()
+        return self.cart_rows()[product_index].quantity
 
     @allure.step("Assert product quantity")
     def assert_product_quantity(self, product_index: int, expected_quantity: str) -> None:
@@ -141,13 +148,27 @@ class CheckoutOverviewPage(DriverCommands):
             product_quantity == expected_quantity
         ), f"Product quantity is incorrect, expected {expected_quantity} but got {product_quantity}"  # noqa E501
 
+    @allure.step("Assert product on overview")
+    def assert_product_on_overview(
+        self,
+        products_amount: int,
+        product_index: int,
+        product_name: str,
+        product_price: str,
+        product_quantity: str,
+    ) -> None:
+        self.assert_amount_of_products_on_overview(products_amount)
+        self.assert_product_name(product_index, product_name)
+        self.assert_product_price(product_index, product_price)
+        self.assert_product_quantity(product_index, product_quantity)
+
     @allure.step("Click finish button")
     def click_finish_button(self) -> None:
-        self.click_element(self.SELECTORS["FINISH_BUTTON"][self.platform])
+        self.click_element(self.selectors["FINISH_BUTTON"])
 
     @allure.step("Assert item total value")
     def assert_item_total_value(self, expected_value: str) -> None:
-        item_total_selector = self.SELECTORS["ITEM_TOTAL"][self.platform]
+        item_total_selector = self.selectors["ITEM_TOTAL"]
         self.swipe.swipe_to_object_down(item_total_selector)
         item_total_value = self.get_text_from_element(item_total_selector)
         assert (
@@ -156,7 +177,7 @@ class CheckoutOverviewPage(DriverCommands):
 
     @allure.step("Assert tax value")
     def assert_tax_value(self, expected_value: str) -> None:
-        tax_selector = self.SELECTORS["TAX"][self.platform]
+        tax_selector = self.selectors["TAX"]
         self.swipe.swipe_to_object_down(tax_selector)
         tax_value = self.get_text_from_element(tax_selector)
         assert (
@@ -165,16 +186,51 @@ class CheckoutOverviewPage(DriverCommands):
 
     @allure.step("Assert total value")
     def assert_total_value(self, expected_value: str) -> None:
-        total_selector = (
-            self.SELECTORS["TOTAL"][self.platform][0],
-            self.SELECTORS["TOTAL"][self.platform][1] % expected_value,
-        )
+        total_selector = self.selectors.format("TOTAL", expected_value)
         self.swipe.swipe_to_object_down(total_selector)
         total_value = self.get_text_from_element(total_selector)
         assert (
             total_value == f"Total: ${expected_value}"
         ), f"Total value is incorrect, expected {expected_value} but got {total_value}"
 
+    @allure.step("Scan checkout overview")
+    def scan_overview(self, max_count_of_swipe: int = 10) -> Tuple[List[CartRow], Dict[str, str]]:
+        """
+        Scrolls the overview once from the current position to the bottom and collects every
+        product row and summary label passed on the way.
+
+        :param max_count_of_swipe: the maximum number of swipes to perform, defaults to 10
+        :return: (product rows in screen order, texts of the summary labels by selector name)
+        """
+        rows: Dict[str, CartRow] = {}
+        labels: Dict[str, str] = {}
+        summary_selectors = {
+            "ITEM_TOTAL": self.selectors["ITEM_TOTAL"],
+            "TAX": self.selectors["TAX"],
+            "TOTAL": self.selectors.format("TOTAL", ""),
+        }
+        previous_page_source = None
+        for _ in range(max_count_of_swipe + 1):
+            page_source = self.driver.page_source
+            if page_source == previous_page_source:
+                break
+            previous_page_source = page_source
+            snapshot = PageSnapshot(page_source, self.platform)
+            for row in CartRows(snapshot, self.selectors, self.element_cache.generation).rows:
+                known = rows.get(row.name)
+                # A row cut by the screen edge is read again complete after the next swipe.
+                if row.name and (known is None or not (known.price and known.quantity)):
+                    rows[row.name] = row
+            for selector_name, selector in summary_selectors.items():
+                node = snapshot.find(selector)
+                if node:
+                    labels[selector_name] = node.text
+            if len(labels) == len(summary_selectors):
+                break
+            self.swipe.swipe_down()
+        log.info("Overview scanned. Rows: %s, labels: %s", len(rows), labels)
+        return list(rows.values()), labels
+
     @allure.step("Assert checkout overview page")
     def assert_checkout_overview_page(
         self,
@@ -185,11 +241,30 @@ class CheckoutOverviewPage(DriverCommands):
         product_quantity: str,
         tax_value: str,
         total_price: str,
+        one_pass: bool = True,
     ):
-        self.assert_amount_of_products_on_overview(products_amount)
-        self.assert_product_name(product_index, product_name)
-        self.assert_product_price(product_index, product_price)
-        self.assert_product_quantity(product_index, product_quantity)
-        self.assert_item_total_value(product_price)
-        self.assert_tax_value(str(tax_value))
-        self.assert_total_value(str(total_price))
+        if not one_pass:
+            self.assert_product_on_overview(
+                products_amount, product_index, product_name, product_price, product_quantity
+            )
+            self.assert_item_total_value(product_price)
+            self.assert_tax_value(str(tax_value))
+            self.assert_total_value(str(total_price))
+            return
+        rows, labels = self.scan_overview()
+        row = rows[product_index] if product_index < len(rows) else None
+        checks = [
+            ("Amount of items on overview", products_amount, len(rows)),
+            ("Product name", product_name, row.name if row else None),
+            ("Product price", product_price, row.price if row else None),
+            ("Product quantity", product_quantity, row.quantity if row else None),
+            ("Item total value", f"Item total: {product_price}", labels.get("ITEM_TOTAL")),
+            ("Tax value", f"Tax: ${tax_value}", labels.get("TAX")),
+            ("Total value", f"Total: ${total_price}", labels.get("TOTAL")),
+        ]
+        mismatches = [
+            f"{label} is incorrect, expected {expected} but got {actual}"
+            for label, expected, actual in checks
+            if expected != actual
+        ]
+        assert not mismatches, "Checkout overview is incorrect:\n" + "\n".join(mismatches)
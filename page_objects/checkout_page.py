@@ -4,8 +4,8 @@ from appium.webdriver.webdriver import WebDriver
 from faker import Faker
 
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class CheckoutPage(DriverCommands):
@@ -48,28 +48,28 @@ class CheckoutPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["CHECKOUT_CONTENT"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["CHECKOUT_CONTENT"])
 
     @allure.step("Insert first name")
     def insert_first_name(self, first_name_value: str = faker.first_name()) -> None:
-        self.type_text(self.SELECTORS["FIRST_NAME_INPUT"][self.platform], first_name_value)
+        self.type_text(self.selectors["FIRST_NAME_INPUT"], first_name_value)
 
     @allure.step("Insert last name")
     def insert_last_name(self, last_name_value: str = faker.last_name()) -> None:
-        self.type_text(self.SELECTORS["LAST_NAME_INPUT"][self.platform], last_name_value)
+        self.type_text(self.selectors["LAST_NAME_INPUT"], last_name_value)
 
     @allure.step("Insert postal code")
     def insert_postal_code(self, postal_code_value=faker.postalcode()) -> None:
-        self.type_text(self.SELECTORS["POSTAL_CODE_INPUT"][self.platform], postal_code_value)
+        self.type_text(self.selectors["POSTAL_CODE_INPUT"], postal_code_value)
 
     @allure.step("Click continue button")
     def click_continue_button(self) -> None:
-        continue_button_id = self.SELECTORS["CONTINUE_BUTTON"][self.platform]
+        continue_button_id = self.selectors["CONTINUE_BUTTON"]
         self.swipe.swipe_to_object_down(continue_button_id)
         self.click_element(continue_button_id)
 
@@ -80,17 +80,22 @@ class CheckoutPage(DriverCommands):
         last_name_value: str = faker.last_name(),
         postal_code_value=faker.postalcode(),
     ) -> None:
-        self.insert_first_name(first_name_value)
-        self.insert_last_name(last_name_value)
-        self.insert_postal_code(postal_code_value)
+        # The fields are typed in one request, which does not wait for them like type_text does.
+        self.wait.wait_for_element_visibility(self.selectors["FIRST_NAME_INPUT"])
+        with allure.step("Insert first name, last name and postal code"):
+            (
+                self.batch()
+                .type(self.selectors["FIRST_NAME_INPUT"], first_name_value)
+                .type(self.selectors["LAST_NAME_INPUT"], last_name_value)
+                .type(self.selectors["POSTAL_CODE_INPUT"], postal_code_value)
+                .run()
+            )
         self.click_continue_button()
 
     @allure.step("Get error message")
     def get_error_message(self) -> str:
-        error_message = self.wait.wait_for_element_visibility(
-            self.SELECTORS["ERROR_MESSAGE"][self.platform]
-        )
-        error_message_text_selector = self.SELECTORS["ERROR_MESSAGE_TEXT"][self.platform]
+        error_message = self.wait.wait_for_element_visibility(self.selectors["ERROR_MESSAGE"])
+        error_message_text_selector = self.selectors["ERROR_MESSAGE_TEXT"]
         error_message_text = self.find_child_element_in_parent_element(
             error_message, error_message_text_selector
         )
@@ -1,14 +1,19 @@
-from typing import List, Literal, Union
+import logging as log
+from typing import Iterable, Iterator, List, Literal, Optional, Tuple, TypeVar
 
 import allure
-from appium.webdriver import WebElement
 from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 
 from helper_methods.value_formatting import format_price_value_to_float
+from page_objects.product_list_view import ButtonState, ProductItem, ProductListView
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
+
+# Sorted values are all names or all prices.
+V = TypeVar("V", str, float)
 
 
 class DashboardPage(DriverCommands):
@@ -26,35 +31,23 @@ class DashboardPage(DriverCommands):
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_ITEM": {
-            "android": (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().description("test-Item")'),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Item"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_TEXT": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-Item title")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Item title"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_PRICE": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-Price")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Price"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "ADD_TO_CARD_BUTTON": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-ADD TO CART")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-ADD TO CART"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "REMOVE_BUTTON": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-REMOVE")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-REMOVE"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "SWITCH_VIEW_BUTTON": {
@@ -74,17 +67,11 @@ class DashboardPage(DriverCommands):
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "NAMES": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-Item title")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Item title"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRICES": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-Price")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Price"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
     }
@@ -93,96 +80,216 @@ class DashboardPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
+        self._product_list_view: Optional[ProductListView] = None
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["DASHBOARD_LABEL"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["DASHBOARD_LABEL"])
 
     @allure.step("Get product items")
     def get_products_items(self) -> List[WebElement]:
-        return self.find_elements(self.SELECTORS["PRODUCT_ITEM"][self.platform])
+        return self.find_elements(self.selectors["PRODUCT_ITEM"])
 
     @allure.step("Get product items based on index")
     def get_product_item_based_on_index(self, product_index: int) -> WebElement:
         return self.get_products_items()[product_index]
 
+    def product_list_view(self) -> ProductListView:
+        """
+        Gets the visible product tiles, read again only when the screen generation changed.
+
+        :return: ProductListView of the current screen
+        """
+        view = self._product_list_view
+        if view is None or view.generation != self.element_cache.generation:
+            view = ProductListView(self.snapshot(), self.selectors, self.element_cache.generation)
+            self._product_list_view = view
+        return view
+
     @allure.step("Open product details")
     def open_products_details(self, product_index: int) -> None:
-        self.click_element(self.get_product_item_based_on_index(product_index))
+        product = self.product_list_view()[product_index]
+        if product.displayed and self.is_on_screen(product.bounds):
+            self.tap_bounds(product.bounds)
+        else:
+            self.click_element(self.get_product_item_based_on_index(product_index))
 
     @allure.step("Get product name based on index")
     def get_product_name(self, product_index: int) -> str:
-        product_text_selector = self.SELECTORS["PRODUCT_TEXT"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), product_text_selector
-        ).text.rstrip()
+        return self.product_list_view()[product_index].name.rstrip()
 
     @allure.step("Get product price based on index")
     def get_product_price(self, product_index: int) -> str:
-        product_price_selector = self.SELECTORS["PRODUCT_PRICE"][self.platform]
-        return self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), product_price_selector
-        ).text.rstrip()
+        return self.product_list_view()[product_index].price.rstrip()
 
     @allure.step("Add product to cart")
     def add_product_to_cart(self, product_index: int) -> None:
-        add_cart_selector = self.SELECTORS["ADD_TO_CARD_BUTTON"][self.platform]
-        self.swipe.swipe_to_object_down(add_cart_selector)
-        add_button = self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), add_cart_selector
-        )
-        self.click_element(add_button)
+        add_cart_selector = self.selectors["ADD_TO_CARD_BUTTON"]
+        scroll_to_button = self.swipe.scroll_into_view_selector(add_cart_selector)
+        if scroll_to_button is None:
+            self.swipe.swipe_to_object_down(add_cart_selector)
+            self.__tap_product_button(product_index, "add", add_cart_selector)
+            return
+        self.batch().find(scroll_to_button, optional=True).click(
+            self.selectors["PRODUCT_ITEM"], index=product_index, child=add_cart_selector
+        ).run()
 
     @allure.step("Check remove button visibility")
     def check_if_remove_button_visible_on_product_item(self, product_index: int) -> None:
-        remove_button = self.SELECTORS["REMOVE_BUTTON"][self.platform]
-        self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), remove_button
-        )
+        self.__wait_for_product_button(product_index, "remove", self.selectors["REMOVE_BUTTON"])
 
     @allure.step("Check add cart button visibility")
     def check_if_add_cart_button_visible_on_product_item(self, product_index: int) -> None:
-        add_to_cart_button = self.SELECTORS["ADD_TO_CARD_BUTTON"][self.platform]
-        self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), add_to_cart_button
-        )
+        add_to_cart_button = self.selectors["ADD_TO_CARD_BUTTON"]
+        self.__wait_for_product_button(product_index, "add", add_to_cart_button)
 
     @allure.step("Remove product")
     def remove_product(self, product_index: int) -> None:
-        remove_button_selector = self.SELECTORS["REMOVE_BUTTON"][self.platform]
-        remove_button = self.find_child_element_in_parent_element(
-            self.get_product_item_based_on_index(product_index), remove_button_selector
-        )
-        self.click_element(remove_button)
+        self.__tap_product_button(product_index, "remove", self.selectors["REMOVE_BUTTON"])
+
+    def __tap_product_button(
+        self, product_index: int, button: ButtonState, button_selector: Tuple[str, str]
+    ) -> None:
+        product = self.product_list_view()[product_index]
+        if (
+            product.button == button
+            and product.button_bounds
+            and product.button_displayed
+            and self.is_on_screen(product.button_bounds)
+        ):
+            self.tap_bounds(product.button_bounds)
+        else:
+            self.click_element(
+                self.find_child_element_in_parent_element(
+                    self.get_product_item_based_on_index(product_index), button_selector
+                )
+            )
+
+    def __wait_for_product_button(
+        self, product_index: int, button: ButtonState, button_selector: Tuple[str, str]
+    ) -> None:
+        # The view may have been read before the app re-rendered the tile, only then the waiting
+        # element lookup is needed.
+        if self.product_list_view()[product_index].button != button:
+            self.find_child_element_in_parent_element(
+                self.get_product_item_based_on_index(product_index), button_selector
+            )
 
     @allure.step("Switch view")
     def switch_view(self) -> None:
-        self.click_element(self.SELECTORS["SWITCH_VIEW_BUTTON"][self.platform])
+        self.click_element(self.selectors["SWITCH_VIEW_BUTTON"])
+
+    @allure.step("Select view showing most products")
+    def select_densest_view(self) -> None:
+        """
+        Switches between the grid and the list view and stays in the one which shows more
+        complete products on the screen.
+        """
+        current_view_count = self.__count_complete_products()
+        self.switch_view()
+        if self.__count_complete_products() < current_view_count:
+            self.switch_view()
+
+    def iter_catalog(self, max_count_of_swipe: int = 20) -> Iterator[ProductItem]:
+        """
+        Yields every product of the list in screen order, scrolling down only when the products
+        on the screen are consumed. The products a swipe leaves on the screen are recognised by
+        their position, so products repeated on overlapping screens are yielded once while
+        distinct products with the same name are not merged. Products cut by the screen edge are
+        yielded from the screen showing them complete.
+
+        :param max_count_of_swipe: the maximum number of swipes to perform, defaults to 20
+        :return: iterator of ProductItem
+        """
+        previous_products: List[ProductItem] = []
+        for swipe_count in range(max_count_of_swipe + 1):
+            products = [
+                product for product in self.product_list_view() if product.name and product.price
+            ]
+            overlapping = self.__count_overlapping(previous_products, products)
+            new_products = products[overlapping:]
+            if swipe_count and not new_products:
+                log.info("End of product list reached after %s swipes", swipe_count)
+                return
+            yield from new_products
+            previous_products = products
+            screen_height = self.swipe.screen_size["height"]
+            self.swipe.swipe_down(start_y=int(screen_height - self.swipe.screen_border_y))
+        raise AssertionError(f"End of product list not reached in {max_count_of_swipe} swipes")
+
+    def iter_product_names(self) -> Iterator[str]:
+        return (product.name for product in self.iter_catalog())
+
+    def iter_product_prices(self) -> Iterator[float]:
+        return (format_price_value_to_float(product.price) for product in self.iter_catalog())
 
     @allure.step("Click sorting button")
     def click_sorting_button(self) -> None:
-        self.click_element(self.SELECTORS["SORTING_BUTTON"][self.platform])
+        sorting_button = self.selectors["SORTING_BUTTON"]
+        self.swipe.swipe_to_object_up(sorting_button)
+        self.click_element(sorting_button)
 
     @allure.step("Get all products names")
     def get_all_names(self) -> List[str]:
-        visible_products_names = self.find_elements(self.SELECTORS["NAMES"][self.platform])
+        visible_products_names = self.snapshot().find_all(self.selectors["NAMES"])
         names = list(map(lambda x: x.text, visible_products_names))
         return names
 
     @allure.step("Get all products prices")
     def get_all_prices(self) -> List[float]:
-        visible_products_prices = self.find_elements(self.SELECTORS["PRICES"][self.platform])
+        visible_products_prices = self.snapshot().find_all(self.selectors["PRICES"])
         prices = list(map(lambda x: x.text, visible_products_prices))
         prices_as_float = list(map(lambda x: format_price_value_to_float(x), prices))
         return prices_as_float
 
     @allure.step("Assert sorting order")
     def assert_sorting_order(
-        self, sorting_order: Literal["asc", "desc"], list_to_check: Union[List[str], List[float]]
+        self,
+        sorting_order: Literal["asc", "desc"],
+        values_to_check: Iterable[V],
     ) -> None:
-        reverse_sorting = False if sorting_order == "asc" else True
-        assert (
-            sorted(list_to_check, reverse=reverse_sorting) == list_to_check
-        ), f"Sorting order is not correct, expected {sorted(list_to_check, reverse=reverse_sorting)} but got {list_to_check}"  # noqa E501
+        """
+        Checks the values pair by pair while they are produced, so a streamed catalog stops
+        scrolling at the first pair in wrong order.
+
+        :param sorting_order: expected order, asc or desc
+        :param values_to_check: list or iterator of names or prices
+        """
+        checked_values: List[V] = []
+        for value in values_to_check:
+            if checked_values:
+                previous_value = checked_values[-1]
+                in_order = (
+                    previous_value <= value if sorting_order == "asc" else previous_value >= value
+                )
+                assert (
+                    in_order
+                ), f"Sorting order is not correct, {previous_value} is followed by {value} at position {len(checked_values)}, checked values: {checked_values + [value]}"  # noqa E501
+            checked_values.append(value)
+        log.info("Sorting order %s correct for %s values", sorting_order, len(checked_values))
+
+    @staticmethod
+    def __count_overlapping(previous: List[ProductItem], current: List[ProductItem]) -> int:
+        # The longest tail of the previous screen starting the current one, shifted by the swipe
+        # as a whole: same products, same columns, moved up by the same distance.
+        for count in range(min(len(previous), len(current)), 0, -1):
+            pairs = list(zip(previous[-count:], current[:count]))
+            shifts = {after.bounds[1] - before.bounds[1] for before, after in pairs}
+            if (
+                len(shifts) == 1
+                and max(shifts) <= 0
+                and all(
+                    (before.name, before.price, before.bounds[0])
+                    == (after.name, after.price, after.bounds[0])
+                    for before, after in pairs
+                )
+            ):
+                return count
+        return 0
+
+    def __count_complete_products(self) -> int:
+        return len(
+            [product for product in self.product_list_view() if product.name and product.price]
+        )
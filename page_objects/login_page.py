@@ -7,8 +7,8 @@ from appium.webdriver.webdriver import WebDriver
 
 from utils.driver_commands import DriverCommands
 from utils.file_manager import load_config_from_json
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class LoginPage(DriverCommands):
@@ -48,27 +48,24 @@ class LoginPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["USERNAME"][self.platform])
-        self.wait.wait_for_element_visibility(self.SELECTORS["PASSWORD"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["USERNAME"])
+        self.wait.wait_for_element_visibility(self.selectors["PASSWORD"])
 
     @allure.step("Click login button")
     def click_login_button(self) -> None:
-        login_button_id = self.SELECTORS["LOGIN_BUTTON"][self.platform]
+        login_button_id = self.selectors["LOGIN_BUTTON"]
         self.swipe.swipe_to_object_up(login_button_id)
         self.click_element(login_button_id)
 
     @allure.step("Select_user_type")
     def select_user_type(self, user: UserType) -> None:
         user_id = f"{user}_user"
-        selector = (
-            self.SELECTORS["USER"][self.platform][0],
-            self.SELECTORS["USER"][self.platform][1] % user_id,
-        )
+        selector = self.selectors.format("USER", user_id)
         self.swipe.swipe_to_object_down(selector)
         self.click_element(selector)
 
@@ -79,29 +76,27 @@ class LoginPage(DriverCommands):
     @allure.step("Insert username")
     def insert_username(self, user: ExtendedUserType) -> None:
         user_credential = self.get_user_data()[user]["login"] if user else ""
-        self.type_text(self.SELECTORS["USERNAME"][self.platform], user_credential)
+        self.type_text(self.selectors["USERNAME"], user_credential)
 
     @allure.step("Insert password")
     def insert_password(self, user: ExtendedUserType) -> None:
         password = self.get_user_data()[user]["password"] if user else ""
-        self.type_text(self.SELECTORS["PASSWORD"][self.platform], password)
+        self.type_text(self.selectors["PASSWORD"], password)
 
     @allure.step("Log in to the app")
     def log_in(self, user: UserType) -> None:
         user_data: dict = load_config_from_json("users.json")
-        self.type_text(self.SELECTORS["USERNAME"][self.platform], user_data[user]["login"])
+        self.type_text(self.selectors["USERNAME"], user_data[user]["login"])
         self.type_text(
-            self.SELECTORS["PASSWORD"][self.platform],
+            self.selectors["PASSWORD"],
             (os.getenv("PASSWORD", user_data[user]["password"])),
         )
-        self.click_element(self.SELECTORS["LOGIN_BUTTON"][self.platform])
+        self.click_element(self.selectors["LOGIN_BUTTON"])
 
     @allure.step("Get error message")
     def get_error_message(self) -> str:
-        error_message = self.wait.wait_for_element_visibility(
-            self.SELECTORS["ERROR_MESSAGE"][self.platform]
-        )
-        error_message_text_selector = self.SELECTORS["ERROR_MESSAGE_TEXT"][self.platform]
+        error_message = self.wait.wait_for_element_visibility(self.selectors["ERROR_MESSAGE"])
+        error_message_text_selector = self.selectors["ERROR_MESSAGE_TEXT"]
         error_message_text = self.find_child_element_in_parent_element(
             error_message, error_message_text_selector
         )
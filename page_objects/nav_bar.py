@@ -3,6 +3,7 @@ from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 
 
 class NavBar(DriverCommands):
@@ -12,7 +13,7 @@ class NavBar(DriverCommands):
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "CART_PRODUCT_COUNT": {
-            "android": (AppiumBy.XPATH, "//android.widget.TextView"),
+            "android": (AppiumBy.CLASS_NAME, "android.widget.TextView"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
     }
@@ -21,15 +22,16 @@ class NavBar(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
+        self.selectors = selector_table_for(type(self), platform)
 
     @allure.step("Click cart button")
     def click_cart_button(self) -> None:
-        self.click_element(self.SELECTORS["CART_BUTTON"][self.platform])
+        self.click_element(self.selectors["CART_BUTTON"])
 
     @allure.step("Check cart button label")
     def check_cart_button_label(self, expected_label: str) -> None:
-        add_cart_selector = self.SELECTORS["CART_BUTTON"][self.platform]
-        add_cart_label_selector = self.SELECTORS["CART_PRODUCT_COUNT"][self.platform]
+        add_cart_selector = self.selectors["CART_BUTTON"]
+        add_cart_label_selector = self.selectors["CART_PRODUCT_COUNT"]
         add_cart_button_label = self.find_child_element_in_parent_element(
             add_cart_selector, add_cart_label_selector
         )
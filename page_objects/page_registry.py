@@ -0,0 +1,48 @@
+import weakref
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar, cast
+
+from appium.webdriver.webdriver import WebDriver
+
+from utils.driver_commands import DriverCommands
+
+P = TypeVar("P", bound=DriverCommands)
+# Page object classes take the driver and the platform name, unlike DriverCommands itself.
+PageClass = Callable[[WebDriver, str], P]
+
+_PAGES: "weakref.WeakKeyDictionary[WebDriver, Dict[PageClass, DriverCommands]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def page_for(driver: WebDriver, platform: str, page_class: PageClass[P]) -> P:
+    """
+    Gets the page object of the driver session, creating it on first use.
+
+    :param driver: Appium driver
+    :param platform: platform name, android or ios
+    :param page_class: page object class, eg. LoginPage
+    :return: page object shared by all test classes using the driver
+    """
+    pages = _PAGES.setdefault(driver, {})
+    if page_class not in pages:
+        pages[page_class] = page_class(driver, platform)
+    return cast(P, pages[page_class])
+
+
+class LazyPage(Generic[P]):
+    """
+    Test class attribute which builds the page object on first access and caches it per driver
+    session. The owner class has to provide driver and PLATFORM attributes.
+    """
+
+    def __init__(self, page_class: PageClass[P]) -> None:
+        self.page_class = page_class
+        self.name = page_class.__name__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional[object], owner: Any) -> P:
+        if owner.driver is None:
+            raise AttributeError(f"{self.name} is not available before the driver is created")
+        return page_for(owner.driver, owner.PLATFORM, self.page_class)
@@ -3,17 +3,14 @@ from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 
 from utils.driver_commands import DriverCommands
+from utils.selector_table import selector_table_for
 from utils.swipe import Swipe
-from utils.wait_commands import WaitCommands
 
 
 class ProductDetailsPage(DriverCommands):
     SELECTORS = {
         "PRODUCT_CONTENT": {
-            "android": (
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().description("test-Inventory item page")',
-            ),
+            "android": (AppiumBy.ACCESSIBILITY_ID, "test-Inventory item page"),
             "ios": (AppiumBy.ACCESSIBILITY_ID, ""),
         },
         "PRODUCT_TITLE": {
@@ -37,25 +34,25 @@ class ProductDetailsPage(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
-        self.swipe = Swipe(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
+        self.swipe = Swipe(self.driver, driver_commands=self)
 
     @allure.step("Wait for page loaded")
     def wait_for_page_loaded(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["PRODUCT_CONTENT"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["PRODUCT_CONTENT"])
 
     @allure.step("Get product name")
     def get_product_name(self) -> str:
-        return self.get_text_from_element(self.SELECTORS["PRODUCT_TITLE"][self.platform])
+        return self.get_text_from_element(self.selectors["PRODUCT_TITLE"])
 
     @allure.step("Add to cart")
     def add_to_cart(self) -> None:
-        add_to_cart_button_selector = self.SELECTORS["ADD_TO_CART_BUTTON"][self.platform]
+        add_to_cart_button_selector = self.selectors["ADD_TO_CART_BUTTON"]
         self.swipe.swipe_to_object_down(add_to_cart_button_selector)
         self.click_element(add_to_cart_button_selector)
 
     @allure.step("Get product price")
     def get_product_price(self) -> str:
-        product_price_selector = self.SELECTORS["PRODUCT_PRICE"][self.platform]
+        product_price_selector = self.selectors["PRODUCT_PRICE"]
         self.swipe.swipe_to_object_down(product_price_selector)
         return self.get_text_from_element(product_price_selector)
@@ -0,0 +1,76 @@
+from typing import Iterator, List, Literal, Optional, Tuple
+
+from utils.page_snapshot import PageSnapshot, SnapshotNode
+from utils.selector_table import SelectorTable
+
+ButtonState = Optional[Literal["add", "remove"]]
+
+
+class ProductItem:
+    """
+    Product tile read from the page snapshot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        price: str,
+        button: ButtonState,
+        bounds: Tuple[int, int, int, int],
+        button_bounds: Optional[Tuple[int, int, int, int]],
+        displayed: bool = True,
+        button_displayed: bool = True,
+    ) -> None:
+        self.name = name
+        self.price = price
+        self.button = button
+        self.bounds = bounds
+        self.button_bounds = button_bounds
+        self.displayed = displayed
+        self.button_displayed = button_displayed
+
+    def __repr__(self) -> str:
+        return f"<ProductItem {self.name!r} {self.price!r} button={self.button}>"
+
+
+class ProductListView:
+    """
+    All product tiles visible on the dashboard, read in one page source request. The view
+    belongs to the screen generation it was read in and has to be read again after the UI
+    changes.
+    """
+
+    def __init__(self, snapshot: PageSnapshot, selectors: SelectorTable, generation: int) -> None:
+        self.generation = generation
+        self.items: List[ProductItem] = [
+            self._read_item(snapshot, selectors, node)
+            for node in snapshot.find_all(selectors["PRODUCT_ITEM"])
+        ]
+
+    def __getitem__(self, index: int) -> ProductItem:
+        return self.items[index]
+
+    def __iter__(self) -> Iterator[ProductItem]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def _read_item(
+        snapshot: PageSnapshot, selectors: SelectorTable, node: SnapshotNode
+    ) -> ProductItem:
+        title = snapshot.find(selectors["PRODUCT_TEXT"], node)
+        price = snapshot.find(selectors["PRODUCT_PRICE"], node)
+        add_button = snapshot.find(selectors["ADD_TO_CARD_BUTTON"], node)
+        remove_button = snapshot.find(selectors["REMOVE_BUTTON"], node)
+        button = add_button or remove_button
+        return ProductItem(
+            name=title.text if title else "",
+            price=price.text if price else "",
+            button="add" if add_button else "remove" if remove_button else None,
+            bounds=node.bounds,
+            button_bounds=button.bounds if button else None,
+            displayed=node.displayed,
+            button_displayed=button.displayed if button else False,
+        )
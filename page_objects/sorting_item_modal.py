@@ -5,7 +5,7 @@ from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 
 from utils.driver_commands import DriverCommands
-from utils.wait_commands import WaitCommands
+from utils.selector_table import selector_table_for
 
 
 class SortingItemModal(DriverCommands):
@@ -24,7 +24,7 @@ class SortingItemModal(DriverCommands):
         DriverCommands.__init__(self, driver)
         self.driver = driver
         self.platform = platform
-        self.wait = WaitCommands(self.driver)
+        self.selectors = selector_table_for(type(self), platform)
 
     SORTING_RULES = {
         "name_ascending": "Name (A to Z)",
@@ -35,7 +35,7 @@ class SortingItemModal(DriverCommands):
 
     @allure.step("Check sort item modal visibility")
     def check_sorting_modal_visibility(self) -> None:
-        self.wait.wait_for_element_visibility(self.SELECTORS["SORT_ITEM_CONTAINER"][self.platform])
+        self.wait.wait_for_element_visibility(self.selectors["SORT_ITEM_CONTAINER"])
 
     @allure.step("Select sorting rule")
     def select_sorting_rule(
@@ -44,8 +44,5 @@ class SortingItemModal(DriverCommands):
             "name_ascending", "name_descending", "price_ascending", "price_descending"
         ],
     ) -> None:
-        sorting_selector = (
-            self.SELECTORS["SORTING_RULE"][self.platform][0],
-            self.SELECTORS["SORTING_RULE"][self.platform][1] % self.SORTING_RULES[sorting_name],
-        )
+        sorting_selector = self.selectors.format("SORTING_RULE", self.SORTING_RULES[sorting_name])
         self.click_element(sorting_selector)
@@ -0,0 +1,90 @@
+import logging as log
+from typing import Literal, Optional, Sequence
+
+import allure
+from appium.webdriver.webdriver import WebDriver
+
+from utils.driver_commands import DriverCommands
+from utils.reset_strategies import app_id_for
+
+
+class StateInjector(DriverCommands):
+    """
+    Opens screens of the app directly through swaglabs:// deep links, with the chosen products
+    already in the cart and without logging in. Products are identified by their index in the
+    app inventory (0 - Sauce Labs Backpack, 1 - Sauce Labs Bike Light, ...). Tests which do not
+    test login or navigation use it to skip the UI path to the screen under test.
+    """
+
+    SCHEME = "swaglabs://"
+    SCREENS = {
+        "dashboard": "swag-overview",
+        "product_details": "swag-item",
+        "cart": "cart",
+        "checkout": "personal-info",
+        "checkout_overview": "checkout-overview",
+        "checkout_complete": "complete",
+    }
+    Screen = Literal[
+        "dashboard",
+        "product_details",
+        "cart",
+        "checkout",
+        "checkout_overview",
+        "checkout_complete",
+    ]
+
+    def __init__(self, driver: WebDriver, platform: str) -> None:
+        DriverCommands.__init__(self, driver)
+        self.driver = driver
+        self.platform = platform
+
+    @classmethod
+    def deep_link(
+        cls, screen: Screen, cart: Sequence[int] = (), product: Optional[int] = None
+    ) -> str:
+        """
+        Builds the deep link of the screen.
+
+        :param screen: screen to open, eg. 'checkout'
+        :param cart: indexes of the products in the cart
+        :param product: index of the product, only for 'product_details'
+        :return: deep link url, eg. 'swaglabs://personal-info/0,2'
+        """
+        if screen == "product_details":
+            assert product is not None, "Product index is required to open product details"
+            return f"{cls.SCHEME}{cls.SCREENS[screen]}/{product}"
+        if screen == "checkout_complete":
+            return f"{cls.SCHEME}{cls.SCREENS[screen]}"
+        return f"{cls.SCHEME}{cls.SCREENS[screen]}/{','.join(map(str, cart))}"
+
+    @allure.step("Open screen through deep link")
+    def open_screen(
+        self, screen: Screen, cart: Sequence[int] = (), product: Optional[int] = None
+    ) -> None:
+        """
+        Opens the screen with the products in the cart, the previous cart content is replaced.
+
+        :param screen: screen to open, eg. 'checkout'
+        :param cart: indexes of the products in the cart
+        :param product: index of the product, only for 'product_details'
+        """
+        url = self.deep_link(screen, cart, product)
+        # The session capabilities carry the platform and the app id the session was started with.
+        app_id = app_id_for(self.driver, self.driver.capabilities)
+        app = {"package": app_id} if self.driver_is_android() else {"bundleId": app_id}
+        self.driver.execute_script("mobile: deepLink", {"url": url, **app})
+        self.element_cache.next_generation()
+        log.info(f"Opened {url}")
+
+    def open_dashboard(self, cart: Sequence[int] = ()) -> None:
+        self.open_screen("dashboard", cart)
+
+    def open_cart(self, cart: Sequence[int]) -> None:
+        self.open_screen("cart", cart)
+
+    def open_checkout(self, cart: Sequence[int]) -> None:
+        self.open_screen("checkout", cart)
+
+    def open_checkout_overview(self, cart: Sequence[int]) -> None:
+        self.open_screen("checkout_overview", cart)
@@ -3,12 +3,28 @@ import logging
 import logging.config
 import os
 import unittest
+from typing import Optional
 
+import allure
 import coloredlogs
 from appium import webdriver
 
-from utils.create_driver import create_driver
+from page_objects.cart_details_page import CartDetailsPage
+from page_objects.checkout_complete_page import CheckoutCompletePage
+from page_objects.checkout_overview_page import CheckoutOverviewPage
+from page_objects.checkout_page import CheckoutPage
+from page_objects.dashboard_page import DashboardPage
+from page_objects.login_page import LoginPage
+from page_objects.nav_bar import NavBar
+from page_objects.page_registry import LazyPage
+from page_objects.product_details_page import ProductDetailsPage
+from page_objects.sorting_item_modal import SortingItemModal
+from page_objects.state_injector import StateInjector
+from utils.adb_commands import adb_commands_for
+from utils.command_metrics import COMMAND_METRICS
 from utils.file_manager import load_config_from_json
+from utils.reset_strategies import ResetStrategy, parse_reset_strategy, reset_app
+from utils.session_pool import SESSION_POOL
 
 
 def safe_run(func):
@@ -32,29 +48,81 @@ class BaseTest(unittest.TestCase):
     CONFIG: dict = load_config_from_json(os.getenv("CONFIG_FILE", "android_config.json"))
     APP_DIRECTORY: str = os.getenv("APP_DIRECTORY", os.path.join(ROOT_PATH, "test_apps"))
     PLATFORM: str = os.getenv("PLATFORM", CONFIG["platformName"].lower())
+    REUSE_SESSIONS: bool = os.getenv("REUSE_SESSIONS", "true").lower() == "true"
+    PREWARM_SESSIONS: bool = os.getenv("PREWARM_SESSIONS", "false").lower() == "true"
+    COMMAND_METRICS_DIR: str = os.getenv(
+        "COMMAND_METRICS_DIR", os.path.join(ROOT_PATH, "command-metrics")
+    )
+    # Reset of a reused session before the class and of the session between tests of the class,
+    # test classes override them; None means the configured default, see reset_strategies.
+    RESET_STRATEGY: Optional[ResetStrategy] = None
+    TEST_RESET_STRATEGY: ResetStrategy = parse_reset_strategy(
+        os.getenv("TEST_RESET_STRATEGY", "none")
+    )
     driver: webdriver = None
     ANDROID = "android"
     IOS = "ios"
     set_up_failed = False
     recording = False
+    login_page: LazyPage[LoginPage] = LazyPage(LoginPage)
+    dashboard_page: LazyPage[DashboardPage] = LazyPage(DashboardPage)
+    product_details_page: LazyPage[ProductDetailsPage] = LazyPage(ProductDetailsPage)
+    cart_details_page: LazyPage[CartDetailsPage] = LazyPage(CartDetailsPage)
+    checkout_page: LazyPage[CheckoutPage] = LazyPage(CheckoutPage)
+    checkout_overview_page: LazyPage[CheckoutOverviewPage] = LazyPage(CheckoutOverviewPage)
+    checkout_complete_page: LazyPage[CheckoutCompletePage] = LazyPage(CheckoutCompletePage)
+    nav_bar: LazyPage[NavBar] = LazyPage(NavBar)
+    sorting_item_modal: LazyPage[SortingItemModal] = LazyPage(SortingItemModal)
+    state_injector: LazyPage[StateInjector] = LazyPage(StateInjector)
 
     @classmethod
     def setUpClass(cls):
-        cls.driver = create_driver(cls.CONFIG, cls.APP_DIRECTORY)
+        cls.driver = SESSION_POOL.acquire(cls.CONFIG, cls.APP_DIRECTORY, cls.RESET_STRATEGY)
+        cls.first_test_pending = True
+        if cls.PREWARM_SESSIONS:
+            SESSION_POOL.prewarm(cls.CONFIG, cls.APP_DIRECTORY)
 
     def setUp(self):
         self.test_name = self.__dict__["_testMethodName"]
         logging.info(f"RUNNING TEST: {self.test_name}")
+        if not type(self).first_test_pending:
+            reset_app(self.driver, self.CONFIG, self.TEST_RESET_STRATEGY, self.APP_DIRECTORY)
+        type(self).first_test_pending = False
+
+    def tearDown(self):
+        if self.driver and self.is_failed():
+            self.attach_failure_artifacts()
+        COMMAND_METRICS.attach_and_export(
+            f"{type(self).__name__}.{self._testMethodName}", self.COMMAND_METRICS_DIR or None
+        )
 
     @classmethod
     def tearDownClass(cls):
         if cls.driver:
-            cls.driver.quit()
+            SESSION_POOL.release(cls.driver, keep_alive=cls.REUSE_SESSIONS)
 
     def is_failed(self):
         if self.set_up_failed:
             return self.set_up_failed
-        elif self._outcome.errors:
-            return True
-        else:
+        elif self._outcome is None:
             return False
+        elif getattr(self._outcome, "errors", None):
+            return True
+        # Python 3.11 dropped _Outcome.errors, failures are only reported to the result: pytest
+        # keeps them in _excinfo, unittest in errors and failures.
+        result = self._outcome.result
+        reported = getattr(result, "errors", []) + getattr(result, "failures", [])
+        return bool(getattr(result, "_excinfo", None)) or any(test is self for test, _ in reported)
+
+    def attach_failure_artifacts(self):
+        """
+        Attaches a screenshot and, on Android, the recent logcat to the allure report of the
+        failed test. Both are read over adb when the device is reachable.
+        """
+        adb = adb_commands_for(self.driver)
+        try:
+            allure.attach(adb.screenshot(), "Screenshot", allure.attachment_type.PNG)
+            if self.PLATFORM == self.ANDROID:
+                allure.attach(adb.logcat(), "Logcat", allure.attachment_type.TEXT)
+        except Exception as e:
+            logging.warning(f"Failure artifacts of {self._testMethodName} were not captured: {e}")
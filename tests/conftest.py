@@ -0,0 +1,9 @@
+import pytest
+
+from utils.session_pool import SESSION_POOL
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    # Counted after deselection, eg. with -k, so pre-warming stops after the last class run.
+    classes = {getattr(item, "cls", None) for item in session.items}
+    SESSION_POOL.plan_classes(len(classes - {None}))
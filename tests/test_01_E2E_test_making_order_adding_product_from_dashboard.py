@@ -5,41 +5,26 @@ from helper_methods.value_formatting import (
     format_value_to_two_decimal_places,
     round_value_to_two_decimal_places,
 )
-from page_objects.cart_details_page import CartDetailsPage
-from page_objects.checkout_complete_page import CheckoutCompletePage
-from page_objects.checkout_overview_page import CheckoutOverviewPage
-from page_objects.checkout_page import CheckoutPage
-from page_objects.dashboard_page import DashboardPage
-from page_objects.login_page import LoginPage
-from page_objects.nav_bar import NavBar
 from tests.baseTest import BaseTest, safe_run
 
 
 class MakingOrderFromDashboardTests(BaseTest):
+    RESET_STRATEGY = "terminate"
 
     @classmethod
     @safe_run
     def setUpClass(cls):
-        BaseTest().setUpClass()
-        cls.login_page = LoginPage(cls.driver, cls.PLATFORM)
-        cls.dashboard_page = DashboardPage(cls.driver, cls.PLATFORM)
-        cls.cart_details_page = CartDetailsPage(cls.driver, cls.PLATFORM)
-        cls.checkout_page = CheckoutPage(cls.driver, cls.PLATFORM)
-        cls.checkout_overview_page = CheckoutOverviewPage(cls.driver, cls.PLATFORM)
-        cls.checkout_complete_page = CheckoutCompletePage(cls.driver, cls.PLATFORM)
-        cls.nav_bar = NavBar(cls.driver, cls.PLATFORM)
+        super().setUpClass()
 
     def setUp(self):
-        BaseTest().setUp()
+        super().setUp()
 
     @allure.title("test 01 - Making order - adding product from dashboard to cart - happy path")
     def test_01_adding_product_from_dashboard_to_cart_and_making_order_happy_path(self):
         products_amount = 1
         product_quantity = "1"
         percentage = 0.08
-        self.login_page.wait_for_page_loaded()
-        self.login_page.select_user_type("standard")
-        self.login_page.click_login_button()
+        self.state_injector.open_dashboard()
         self.dashboard_page.wait_for_page_loaded()
         product_name = self.dashboard_page.get_product_name(0)
         product_price = self.dashboard_page.get_product_price(0)
@@ -5,34 +5,19 @@ from helper_methods.value_formatting import (
     format_value_to_two_decimal_places,
     round_value_to_two_decimal_places,
 )
-from page_objects.cart_details_page import CartDetailsPage
-from page_objects.checkout_complete_page import CheckoutCompletePage
-from page_objects.checkout_overview_page import CheckoutOverviewPage
-from page_objects.checkout_page import CheckoutPage
-from page_objects.dashboard_page import DashboardPage
-from page_objects.login_page import LoginPage
-from page_objects.nav_bar import NavBar
-from page_objects.product_details_page import ProductDetailsPage
 from tests.baseTest import BaseTest, safe_run
 
 
 class MakingOrderFromProductDetailsTests(BaseTest):
+    RESET_STRATEGY = "terminate"
 
     @classmethod
     @safe_run
     def setUpClass(cls):
-        BaseTest().setUpClass()
-        cls.login_page = LoginPage(cls.driver, cls.PLATFORM)
-        cls.dashboard_page = DashboardPage(cls.driver, cls.PLATFORM)
-        cls.product_details_page = ProductDetailsPage(cls.driver, cls.PLATFORM)
-        cls.cart_details_page = CartDetailsPage(cls.driver, cls.PLATFORM)
-        cls.checkout_page = CheckoutPage(cls.driver, cls.PLATFORM)
-        cls.checkout_overview_page = CheckoutOverviewPage(cls.driver, cls.PLATFORM)
-        cls.checkout_complete_page = CheckoutCompletePage(cls.driver, cls.PLATFORM)
-        cls.nav_bar = NavBar(cls.driver, cls.PLATFORM)
+        super().setUpClass()
 
     def setUp(self):
-        BaseTest().setUp()
+        super().setUp()
 
     @allure.title(
         "test 01 - Making order - adding product from product details to cart - happy path"
@@ -41,8 +26,7 @@ class MakingOrderFromProductDetailsTests(BaseTest):
         products_amount = 1
         product_quantity = "1"
         percentage = 0.08
-        self.login_page.wait_for_page_loaded()
-        self.login_page.log_in("standard")
+        self.state_injector.open_dashboard()
         self.dashboard_page.wait_for_page_loaded()
         self.dashboard_page.open_products_details(1)
         self.product_details_page.wait_for_page_loaded()
@@ -1,31 +1,20 @@
 import allure
 
-from page_objects.cart_details_page import CartDetailsPage
-from page_objects.checkout_complete_page import CheckoutCompletePage
-from page_objects.checkout_overview_page import CheckoutOverviewPage
-from page_objects.checkout_page import CheckoutPage
-from page_objects.dashboard_page import DashboardPage
-from page_objects.login_page import LoginPage
 from tests.baseTest import BaseTest, safe_run
 
 
 class ValidateErrorsOnLoginPageTests(BaseTest):
+    RESET_STRATEGY = "terminate"
     USERNAME_ERROR_MESSAGE = "Username is required"
     PASSWORD_ERROR_MESSAGE = "Password is required"
 
     @classmethod
     @safe_run
     def setUpClass(cls):
-        BaseTest().setUpClass()
-        cls.login_page = LoginPage(cls.driver, cls.PLATFORM)
-        cls.dashboard_page = DashboardPage(cls.driver, cls.PLATFORM)
-        cls.cart_details_page = CartDetailsPage(cls.driver, cls.PLATFORM)
-        cls.checkout_page = CheckoutPage(cls.driver, cls.PLATFORM)
-        cls.checkout_overview_page = CheckoutOverviewPage(cls.driver, cls.PLATFORM)
-        cls.checkout_complete_page = CheckoutCompletePage(cls.driver, cls.PLATFORM)
+        super().setUpClass()
 
     def setUp(self):
-        BaseTest().setUp()
+        super().setUp()
         self.login_page.wait_for_page_loaded()
 
     @allure.title("test 01 - Try to login without providing any credentials")
@@ -1,16 +1,10 @@
 import allure
 
-from page_objects.cart_details_page import CartDetailsPage
-from page_objects.checkout_complete_page import CheckoutCompletePage
-from page_objects.checkout_overview_page import CheckoutOverviewPage
-from page_objects.checkout_page import CheckoutPage
-from page_objects.dashboard_page import DashboardPage
-from page_objects.login_page import LoginPage
-from page_objects.nav_bar import NavBar
 from tests.baseTest import BaseTest, safe_run
 
 
 class ValidateErrorsOnCheckoutPageTests(BaseTest):
+    RESET_STRATEGY = "terminate"
     FIRST_NAME_ERROR_MESSAGE = "First Name is required"
     LAST_NAME_ERROR_MESSAGE = "Last Name is required"
     POSTAL_CODE_ERROR_MESSAGE = "Postal Code is required"
@@ -18,26 +12,12 @@ class ValidateErrorsOnCheckoutPageTests(BaseTest):
     @classmethod
     @safe_run
     def setUpClass(cls):
-        BaseTest().setUpClass()
-        cls.login_page = LoginPage(cls.driver, cls.PLATFORM)
-        cls.dashboard_page = DashboardPage(cls.driver, cls.PLATFORM)
-        cls.cart_details_page = CartDetailsPage(cls.driver, cls.PLATFORM)
-        cls.checkout_page = CheckoutPage(cls.driver, cls.PLATFORM)
-        cls.checkout_overview_page = CheckoutOverviewPage(cls.driver, cls.PLATFORM)
-        cls.checkout_complete_page = CheckoutCompletePage(cls.driver, cls.PLATFORM)
-        cls.nav_bar = NavBar(cls.driver, cls.PLATFORM)
-        cls.login_page.wait_for_page_loaded()
-        cls.login_page.select_user_type("standard")
-        cls.login_page.click_login_button()
-        cls.dashboard_page.wait_for_page_loaded()
-        cls.dashboard_page.add_product_to_cart(0)
-        cls.nav_bar.click_cart_button()
-        cls.cart_details_page.wait_for_page_loaded()
-        cls.cart_details_page.click_checkout_button()
+        super().setUpClass()
+        cls.state_injector.open_checkout(cart=[0])
         cls.checkout_page.wait_for_page_loaded()
 
     def setUp(self):
-        BaseTest().setUp()
+        super().setUp()
 
     @allure.title("test 01 - Try to checkout without providing any data")
     def test_01_checkout_without_data(self):
@@ -0,0 +1,84 @@
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+
+from utils.page_snapshot import PageSnapshot, parse_ui_selector
+from utils.simulated_driver import SimulatedDriver
+
+
+@pytest.fixture
+def dashboard() -> PageSnapshot:
+    driver = SimulatedDriver({"platformName": "Android"})
+    driver.app.open_url("swaglabs://swag-overview/")
+    return PageSnapshot(driver.page_source, "android")
+
+
+def test_text_contains(dashboard: PageSnapshot) -> None:
+    nodes = dashboard.find_all(
+        (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().textContains("Sauce Labs B")')
+    )
+    assert [node.text for node in nodes] == [
+        "Sauce Labs Backpack",
+        "Sauce Labs Bike Light",
+        "Sauce Labs Bolt T-Shirt",
+    ]
+
+
+def test_instance(dashboard: PageSnapshot) -> None:
+    items = dashboard.find_all((AppiumBy.ACCESSIBILITY_ID, "test-Item"))
+    selector = 'new UiSelector().description("test-Item").instance(2)'
+    assert dashboard.find_all((AppiumBy.ANDROID_UIAUTOMATOR, selector)) == [items[2]]
+
+
+def test_instance_out_of_range(dashboard: PageSnapshot) -> None:
+    selector = 'new UiSelector().description("test-Item").instance(99)'
+    assert dashboard.find_all((AppiumBy.ANDROID_UIAUTOMATOR, selector)) == []
+
+
+def test_child_selector(dashboard: PageSnapshot) -> None:
+    selector = (
+        'new UiSelector().description("test-Item").instance(1)'
+        '.childSelector(new UiSelector().description("test-Item title"))'
+    )
+    nodes = dashboard.find_all((AppiumBy.ANDROID_UIAUTOMATOR, selector))
+    assert [node.text for node in nodes] == ["Sauce Labs Bike Light"]
+
+
+def test_absolute_xpath(dashboard: PageSnapshot) -> None:
+    nodes = dashboard.find_all(
+        (
+            AppiumBy.XPATH,
+            "/hierarchy/android.widget.FrameLayout/android.widget.ScrollView"
+            "/android.view.ViewGroup[@content-desc='test-Cart drop zone']",
+        )
+    )
+    assert [node.content_desc for node in nodes] == ["test-Cart drop zone"]
+
+
+def test_relative_xpath_in_parent(dashboard: PageSnapshot) -> None:
+    item = dashboard.find_all((AppiumBy.ACCESSIBILITY_ID, "test-Item"))[3]
+    nodes = dashboard.find_all((AppiumBy.XPATH, "//*[@content-desc='test-Price']"), item)
+    assert len(nodes) == 1 and item.contains(nodes[0])
+
+
+def test_parse_ui_selector() -> None:
+    ui_selector = parse_ui_selector(
+        'new UiSelector().className("android.widget.TextView").clickable(false).instance(0)'
+        '.childSelector(new UiSelector().text("a \\"quoted\\" text"));'
+    )
+    assert ui_selector.criteria == [("className", "android.widget.TextView"), ("clickable", False)]
+    assert ui_selector.instance == 0
+    assert ui_selector.child.criteria == [("text", 'a "quoted" text')]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        'new UiSelector().text("x"',
+        'new UiSelector().instance("first")',
+        'new UiScrollable().text("x")',
+        'new UiSelector().text("x") trailing',
+    ],
+)
+def test_parse_ui_selector_rejects(expression: str) -> None:
+    with pytest.raises(ValueError):
+        parse_ui_selector(expression)
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from typing import Tuple, Union
+from typing import Tuple, TypeGuard, Union
 
-from appium.webdriver.webelement import WebElement
+from selenium.webdriver.remote.webelement import WebElement
 
 ELEMENT = Union[WebElement, Tuple[str, str], str]
 
 
-def is_webelement(selector: ELEMENT) -> bool:
+def is_webelement(selector: ELEMENT) -> TypeGuard[WebElement]:
     return selector.__class__.__name__ == "WebElement"
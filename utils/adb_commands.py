@@ -0,0 +1,202 @@
+import logging as log
+import os
+import socket
+import time
+import weakref
+from typing import Optional
+
+from adbutils import AdbClient, AdbDevice
+from adbutils.errors import AdbError
+from appium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+USE_ADB: bool = os.getenv("USE_ADB", "true").lower() == "true"
+ADB_HOST: str = os.getenv("ANDROID_ADB_SERVER_HOST", "127.0.0.1")
+ADB_PORT: int = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+ADB_CONNECT_TIMEOUT = 1
+LOGCAT_LINES = 500
+
+
+class AdbCommands:
+    """
+    Direct adb connection to the Android device of a driver session, for operations which are
+    much cheaper over adb than through the Appium HTTP -> UiAutomator2 chain: clearing app data,
+    screen capture, text input, readiness checks and logcat. The device is looked up on the adb
+    server once; when it is not reachable, eg. on iOS, with a remote Appium server or with
+    USE_ADB=false, every operation falls back to the Appium command.
+    """
+
+    def __init__(self, driver: Optional[webdriver] = None, serial: Optional[str] = None) -> None:
+        self.driver = driver
+        self.serial = serial
+        self._client = AdbClient(ADB_HOST, ADB_PORT)
+        self._device: Optional[AdbDevice] = None
+        self._available: Optional[bool] = None
+
+    @property
+    def available(self) -> bool:
+        """
+        True when the device is connected to the local adb server, checked once.
+        """
+        if self._available is None:
+            self._device = self._connect()
+            self._available = self._device is not None
+        return self._available
+
+    def shell(self, command: str) -> str:
+        """
+        Runs a shell command on the device over adb.
+
+        :param command: shell command, eg. 'getprop sys.boot_completed'
+        :return: command output
+        """
+        assert self.available, f"Device {self.serial} is not reachable over adb"
+        started = time.perf_counter()
+        output = self._device.shell(command)
+        log.debug("adb shell %s took %.3f s", command, time.perf_counter() - started)
+        return output
+
+    def clear_app(self, app_id: str) -> None:
+        """
+        Stops the app and clears its data.
+
+        :param app_id: package of the app
+        """
+        if self.available:
+            output = self.shell(f"pm clear {app_id}")
+            assert "Success" in output, f"Clearing {app_id} data failed: {output}"
+            return
+        assert self.driver is not None, f"Neither adb nor a session is available to clear {app_id}"
+        self.driver.execute_script("mobile: clearApp", {"appId": app_id})
+
+    def screenshot(self) -> bytes:
+        """
+        Captures the screen.
+
+        :return: PNG image
+        """
+        if self.available:
+            try:
+                return self._screencap()
+            except (AdbError, OSError) as e:
+                log.warning(f"adb screencap failed, taking the screenshot through Appium: {e}")
+        assert self.driver is not None, "Neither adb nor a session is available for a screenshot"
+        return self.driver.get_screenshot_as_png()
+
+    def input_text(self, text: str) -> None:
+        """
+        Types text into the focused input field.
+
+        :param text: text to type
+        """
+        if self.available:
+            self._device.send_keys(text)
+            return
+        assert self.driver is not None, "Neither adb nor a session is available to type text"
+        self.driver.switch_to.active_element.send_keys(text)
+
+    def is_package_installed(self, app_id: str) -> bool:
+        """
+        Checks whether the package is installed on the device.
+
+        :param app_id: package of the app
+        :return: True when the package manager knows the package
+        """
+        return self.shell(f"pm path {app_id}").startswith("package:")
+
+    def is_ready(self) -> bool:
+        """
+        Checks whether the device finished booting and the package manager is running. Without
+        adb the device is considered ready when the session is alive and the screen unlocked.
+
+        :return: True when the device is ready for the app
+        """
+        if self.available:
+            return self.shell("getprop sys.boot_completed") == "1" and self.shell(
+                "pm path android"
+            ).startswith("package:")
+        if self.driver is None:
+            return True
+        return not self.driver.is_locked()
+
+    def wait_until_ready(self, timeout: float = 60, interval: float = 1) -> None:
+        """
+        Waits for the device to be ready, eg. an emulator which is still booting.
+
+        :param timeout: maximum time to wait in seconds
+        :param interval: time between checks in seconds
+        """
+        deadline = time.monotonic() + timeout
+        while not self.is_ready():
+            assert time.monotonic() < deadline, f"Device {self.serial} not ready in {timeout} s"
+            log.info(f"Waiting for device {self.serial} to get ready")
+            time.sleep(interval)
+
+    def logcat(self, lines: int = LOGCAT_LINES) -> str:
+        """
+        Reads the most recent device log lines.
+
+        :param lines: number of lines
+        :return: log text, empty when the log can not be read
+        """
+        if self.available:
+            return self.shell(f"logcat -d -t {lines}")
+        assert self.driver is not None, "Neither adb nor a session is available to read logcat"
+        try:
+            entries = self.driver.get_log("logcat")
+        except WebDriverException as e:
+            log.warning(f"Reading logcat through Appium failed: {e}")
+            return ""
+        return "\n".join(entry["message"] for entry in entries[-lines:])
+
+    def _connect(self) -> Optional[AdbDevice]:
+        if not USE_ADB:
+            return None
+        if self.serial is None and self.driver is not None:
+            capabilities = self.driver.capabilities
+            if capabilities.get("platformName", "").lower() != "android":
+                return None
+            self.serial = capabilities.get("deviceUDID") or capabilities.get("udid")
+        if not self.serial:
+            return None
+        # Probed with a plain socket, adbutils would try to start a local adb server instead.
+        try:
+            socket.create_connection((ADB_HOST, ADB_PORT), timeout=ADB_CONNECT_TIMEOUT).close()
+            serials = [device.serial for device in self._client.device_list()]
+        except (AdbError, OSError) as e:
+            log.info(f"adb server {ADB_HOST}:{ADB_PORT} is not reachable, using Appium: {e}")
+            return None
+        if self.serial not in serials:
+            log.info(f"Device {self.serial} is not connected to the adb server, using Appium")
+            return None
+        log.info(f"Using direct adb connection to {self.serial}")
+        return self._client.device(self.serial)
+
+    def _screencap(self) -> bytes:
+        # Android 7+ runs "shell:" without a terminal, so the PNG comes through unchanged.
+        connection = self._client.shell(self.serial, "screencap -p", stream=True)
+        chunks = []
+        try:
+            while True:
+                chunk = connection.conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            connection.close()
+        return b"".join(chunks)
+
+
+_ADB_COMMANDS: "weakref.WeakKeyDictionary[webdriver, AdbCommands]" = weakref.WeakKeyDictionary()
+
+
+def adb_commands_for(driver: webdriver) -> AdbCommands:
+    """
+    Gets the adb commands of the driver session, creating them on first use.
+
+    :param driver: Appium driver
+    :return: AdbCommands shared by all helpers using the driver
+    """
+    if driver not in _ADB_COMMANDS:
+        _ADB_COMMANDS[driver] = AdbCommands(driver)
+    return _ADB_COMMANDS[driver]
@@ -0,0 +1,261 @@
+"""
+Command-level benchmark of the test suite against the stand-in Appium server.
+
+Every test scenario is run once per round-trip time. The simulated app is served by
+utils.stand_in_server with the round-trip time injected into every command, so the numbers show
+how the framework itself scales with device latency: commands per test, latency distribution of
+every allure step and total time of the run. Results can be saved as a baseline and later runs
+compared against it.
+
+Usage:
+    python -m utils.benchmark --save benchmarks/baseline.json
+    python -m utils.benchmark --latency-ms 50 --compare benchmarks/baseline.json -k test_01
+
+The module is also the pytest plugin which runs inside every measured pytest process
+(-p utils.benchmark), it is active only when BENCHMARK_RESULTS is set.
+"""
+
+import argparse
+import datetime
+import json
+import logging as log
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import allure_commons
+import coloredlogs
+import pytest
+
+from utils.file_manager import load_config_from_json
+from utils.simulated_app import PASSWORD
+from utils.stand_in_server import StandInAppiumServer
+
+ROOT_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_LATENCIES_MS = [5, 50, 150]
+RESULTS_ENV = "BENCHMARK_RESULTS"
+LATENCY_ENV = "BENCHMARK_LATENCY_MS"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Gets the value below which the given fraction of values falls, nearest rank method.
+
+    :param values: measured values
+    :param fraction: eg. 0.9 for the 90th percentile
+    :return: the percentile, 0 for no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BenchmarkPlugin:
+    """
+    Collects command counts and durations of tests and allure steps in the measured pytest
+    process. Commands are counted by the stand-in server the plugin starts.
+    """
+
+    def __init__(self, server: StandInAppiumServer, results_path: str) -> None:
+        self.server = server
+        self.results_path = results_path
+        self.tests: Dict[str, dict] = {}
+        self.steps: Dict[str, List[Tuple[float, int]]] = {}
+        self._open_steps: Dict[str, Tuple[str, float, int]] = {}
+        self._started = time.perf_counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        commands, started = self.server.commands, time.perf_counter()
+        yield
+        self.tests.setdefault(item.nodeid, {"outcome": "passed"}).update(
+            {
+                "seconds": round(time.perf_counter() - started, 3),
+                "commands": self.server.commands - commands,
+            }
+        )
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if report.failed:
+            self.tests.setdefault(report.nodeid, {})["outcome"] = "failed"
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid: str, title: str, params: dict) -> None:
+        self._open_steps[uuid] = (title, time.perf_counter(), self.server.commands)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid: str, exc_type, exc_val, exc_tb) -> None:
+        title, started, commands = self._open_steps.pop(uuid)
+        self.steps.setdefault(title, []).append(
+            (time.perf_counter() - started, self.server.commands - commands)
+        )
+
+    def results(self) -> dict:
+        """
+        Summarises the run.
+
+        :return: dictionary with the run totals, tests and step statistics
+        """
+        return {
+            "latency_ms": round(self.server.latency * 1000, 3),
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "commands": self.server.commands,
+            "commands_by_route": dict(
+                sorted(self.server.command_counts.items(), key=lambda item: -item[1])
+            ),
+            "tests": self.tests,
+            "steps": {
+                title: {
+                    "count": len(runs),
+                    "p50_ms": round(percentile([s for s, _ in runs], 0.5) * 1000, 1),
+                    "p90_ms": round(percentile([s for s, _ in runs], 0.9) * 1000, 1),
+                    "max_ms": round(max(s for s, _ in runs) * 1000, 1),
+                    "mean_commands": round(statistics.mean(c for _, c in runs), 1),
+                }
+                for title, runs in self.steps.items()
+            },
+        }
+
+    def write_results(self) -> None:
+        with open(self.results_path, "w") as f:
+            json.dump(self.results(), f, indent=2)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    results_path = os.getenv(RESULTS_ENV)
+    if not results_path:
+        return
+    server = StandInAppiumServer(latency=float(os.getenv(LATENCY_ENV, "0")) / 1000).start()
+    # The tests read CONFIG_FILE when tests.baseTest is imported, which happens later during
+    # collection, so the configuration can still be pointed at the stand-in server here.
+    base_config = load_config_from_json(os.getenv("CONFIG_FILE", "android_config.json"))
+    config_path = os.path.join(os.path.dirname(results_path), "stand_in_config.json")
+    with open(config_path, "w") as f:
+        json.dump({**base_config, "remote": server.url}, f, indent=2)
+    os.environ["CONFIG_FILE"] = config_path
+    plugin = BenchmarkPlugin(server, results_path)
+    config.pluginmanager.register(plugin, "benchmark")
+    allure_commons.plugin_manager.register(plugin)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    plugin = config.pluginmanager.get_plugin("benchmark")
+    if plugin is not None:
+        plugin.write_results()
+        allure_commons.plugin_manager.unregister(plugin)
+
+
+def run_benchmark(latency_ms: float, pytest_args: List[str]) -> dict:
+    """
+    Runs the suite in a separate pytest process against a stand-in server with the latency.
+
+    :param latency_ms: round-trip time injected into every command
+    :param pytest_args: additional pytest arguments, eg. test paths or -k
+    :return: results of the run
+    """
+    work_directory = tempfile.mkdtemp(prefix="benchmark_")
+    results_path = os.path.join(work_directory, "results.json")
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "utils.benchmark"]
+    command += pytest_args or ["tests"]
+    env = {**os.environ, RESULTS_ENV: results_path, LATENCY_ENV: str(latency_ms)}
+    env.setdefault("PASSWORD", PASSWORD)
+    log.info(f"Running benchmark at {latency_ms:g} ms round-trip time")
+    process = subprocess.run(command, cwd=ROOT_PATH, env=env, capture_output=True, text=True)
+    try:
+        with open(results_path, "r") as f:
+            results = json.load(f)
+    except FileNotFoundError:
+        raise RuntimeError(f"Benchmark run produced no results:\n{process.stdout[-2000:]}")
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+    results["exit_code"] = process.returncode
+    return results
+
+
+def format_report(runs: List[dict], baseline: Optional[dict] = None) -> str:
+    """
+    Formats results as text tables: totals per latency, commands and time per test and the
+    slowest steps of the run with the highest latency. Differences to the baseline run with the
+    same latency are added when a baseline is given.
+
+    :param runs: results of run_benchmark
+    :param baseline: previously saved benchmark
+    :return: report text
+    """
+    baseline_runs = {run["latency_ms"]: run for run in (baseline or {}).get("runs", [])}
+
+    def delta(value: float, previous: Optional[float]) -> str:
+        return "" if previous is None else f" ({value - previous:+g})"
+
+    lines = ["RTT ms | total s | commands | exit code"]
+    for run in runs:
+        previous = baseline_runs.get(run["latency_ms"], {})
+        lines.append(
+            f"{run['latency_ms']:>6g} | {run['seconds']:>7.2f}{delta(run['seconds'], previous.get('seconds'))}"  # noqa E501
+            f" | {run['commands']:>8}{delta(run['commands'], previous.get('commands'))}"
+            f" | {run['exit_code']}"
+        )
+    lines += ["", "Test | commands | " + " | ".join(f"{r['latency_ms']:g} ms s" for r in runs)]
+    for nodeid, test in runs[0]["tests"].items():
+        previous = baseline_runs.get(runs[0]["latency_ms"], {}).get("tests", {}).get(nodeid, {})
+        seconds = " | ".join(f"{r['tests'].get(nodeid, {}).get('seconds', 0):.2f}" for r in runs)
+        lines.append(
+            f"{nodeid.split('::')[-1]} [{test['outcome']}] | "
+            f"{test['commands']}{delta(test['commands'], previous.get('commands'))} | {seconds}"
+        )
+    slowest = runs[-1]
+    lines += [
+        "",
+        f"Step at {slowest['latency_ms']:g} ms | n | p50 ms | p90 ms | max ms | commands",
+    ]
+    steps = sorted(
+        slowest["steps"].items(), key=lambda item: -item[1]["p50_ms"] * item[1]["count"]
+    )
+    for title, step in steps[:25]:
+        lines.append(
+            f"{title} | {step['count']} | {step['p50_ms']} | {step['p90_ms']} | "
+            f"{step['max_ms']} | {step['mean_commands']}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    coloredlogs.install()
+    parser = argparse.ArgumentParser(description="Benchmark the suite against injected latency")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        action="append",
+        help=f"Round-trip time per command, can be repeated, default {DEFAULT_LATENCIES_MS}",
+    )
+    parser.add_argument("--save", help="Save the results as a baseline to the json file")
+    parser.add_argument("--compare", help="Baseline json file to compare the results with")
+    args, pytest_args = parser.parse_known_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    runs = [
+        run_benchmark(latency, pytest_args) for latency in args.latency_ms or DEFAULT_LATENCIES_MS
+    ]
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(
+                {"created": datetime.datetime.now().isoformat(timespec="seconds"), "runs": runs},
+                f,
+                indent=2,
+            )
+        log.info(f"Benchmark saved to {args.save}")
+    print(format_report(runs, baseline))
+    sys.exit(max(run["exit_code"] for run in runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Record/replay of the HTTP traffic between the framework and the Appium server.
+
+With HTTP_CASSETTE_MODE=record every request sent by TunedAppiumConnection is saved together
+with its response to the HTTP_CASSETTE file when the process exits. With
+HTTP_CASSETTE_MODE=replay the responses are served from the cassette and nothing is sent, so the
+suite runs without a device. HTTP_CASSETTE_MATCH selects how requests are matched:
+
+    sequence (default) the next recorded interaction with the same request, recorded requests
+                       which are skipped are reported as removed
+    request            any recorded interaction with the same request, in the recorded order;
+                       the last response is repeated once they are used up
+
+After a replay the commands the run added or removed compared with the cassette are logged and
+written to "<cassette>.diff". Two cassettes can be compared with:
+
+    python -m utils.cassette diff old.json.gz new.json.gz
+"""
+
+import argparse
+import atexit
+import difflib
+import gzip
+import hashlib
+import json
+import logging as log
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import coloredlogs
+from selenium.webdriver.remote.command import Command
+
+RECORD = "record"
+REPLAY = "replay"
+MATCH_SEQUENCE = "sequence"
+MATCH_REQUEST = "request"
+# Response strings longer than this, mostly page sources, are stored once per distinct content.
+PAYLOAD_MIN_LENGTH = 1024
+RequestKey = Tuple[str, str, str]
+
+
+def describe(interaction: dict) -> str:
+    """
+    Describes an interaction as one diff line: command, method, path and request body. Typed
+    text is left out, test data is generated randomly and would show up in every diff.
+
+    :param interaction: recorded or replayed interaction
+    :return: description
+    """
+    typed = interaction["command"] == Command.SEND_KEYS_TO_ELEMENT
+    body = f" {interaction['body']}" if interaction.get("body") and not typed else ""
+    return f"{interaction['command']} {interaction['method']} {interaction['path']}{body}"
+
+
+def read_cassette(path: str) -> dict:
+    """
+    Reads a cassette file and restores the payloads stored apart from the responses.
+
+    :param path: cassette file, gzip compressed json
+    :return: dictionary with the interactions
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        cassette = json.load(f)
+    payloads = cassette.pop("payloads", {})
+
+    def restore(value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {"$payload"}:
+                return payloads[value["$payload"]]
+            return {key: restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore(item) for item in value]
+        return value
+
+    for interaction in cassette["interactions"]:
+        interaction["response"] = restore(interaction["response"])
+    return cassette
+
+
+def write_cassette(path: str, interactions: List[dict]) -> None:
+    """
+    Writes interactions to a cassette file, long response strings are stored once by their hash.
+
+    :param path: cassette file, gzip compressed json
+    :param interactions: recorded interactions
+    """
+    payloads: Dict[str, str] = {}
+
+    def extract(value: Any) -> Any:
+        if isinstance(value, str) and len(value) >= PAYLOAD_MIN_LENGTH:
+            digest = hashlib.sha1(value.encode("utf-8")).hexdigest()
+            payloads[digest] = value
+            return {"$payload": digest}
+        if isinstance(value, dict):
+            return {key: extract(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [extract(item) for item in value]
+        return value
+
+    compact = [{**i, "response": extract(i["response"])} for i in interactions]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as f:
+        json.dump({"interactions": compact, "payloads": payloads}, f, separators=(",", ":"))
+    os.replace(f"{path}.tmp", path)
+
+
+def diff_interactions(recorded: List[dict], replayed: List[dict]) -> List[str]:
+    """
+    Compares two command sequences.
+
+    :param recorded: interactions of the baseline
+    :param replayed: interactions of the new run
+    :return: diff lines with one line of context, "-" for removed and "+" for added commands
+    """
+    old, new = [describe(i) for i in recorded], [describe(i) for i in replayed]
+    # Without autojunk, frequent commands like setTimeouts would not be used to align the runs.
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    lines = []
+    for group in matcher.get_grouped_opcodes(1):
+        first, last = group[0], group[-1]
+        lines.append(
+            f"@@ -{first[1] + 1},{last[2] - first[1]} +{first[3] + 1},{last[4] - first[3]} @@"
+        )
+        for tag, old_start, old_end, new_start, new_end in group:
+            if tag == "equal":
+                lines += [f" {line}" for line in old[old_start:old_end]]
+                continue
+            lines += [f"-{line}" for line in old[old_start:old_end]]
+            lines += [f"+{line}" for line in new[new_start:new_end]]
+    return lines
+
+
+class Cassette:
+    """
+    Recorder and player of Appium HTTP interactions, shared by all connections of the process.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, mode: Optional[str] = None, match: str = MATCH_SEQUENCE
+    ) -> None:
+        self.path = path
+        self.mode = mode if path else None
+        self.match = match
+        self.interactions: List[dict] = []
+        self._recorded: List[dict] = []
+        self._cursor = 0
+        self._lock = threading.Lock()
+        if self.mode == REPLAY:
+            self._recorded = read_cassette(path)["interactions"]
+            log.info(f"Replaying {len(self._recorded)} HTTP interactions from {path}")
+        elif self.mode == RECORD:
+            log.info(f"Recording HTTP interactions to {path}")
+
+    @classmethod
+    def from_env(cls) -> "Cassette":
+        mode = os.getenv("HTTP_CASSETTE_MODE", "").lower() or None
+        assert mode in (None, RECORD, REPLAY), f"Unknown HTTP_CASSETTE_MODE {mode}"
+        return cls(
+            os.getenv("HTTP_CASSETTE"), mode, os.getenv("HTTP_CASSETTE_MATCH", MATCH_SEQUENCE)
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(
+        self, command: str, method: str, path: str, body: Optional[str], response: dict
+    ) -> None:
+        """
+        Adds an interaction sent to the server.
+
+        :param command: selenium command name
+        :param method: HTTP method
+        :param path: url path relative to the server address
+        :param body: JSON request body
+        :param response: parsed response returned by the connection
+        """
+        # The driver unwraps element references in the response in place, a copy is kept.
+        response = json.loads(json.dumps(response))
+        with self._lock:
+            self.interactions.append(self._interaction(command, method, path, body, response))
+
+    def replay(self, command: str, method: str, path: str, body: Optional[str]) -> dict:
+        """
+        Finds the recorded response for the request.
+
+        :param command: selenium command name
+        :param method: HTTP method
+        :param path: url path relative to the server address
+        :param body: JSON request body
+        :return: recorded response, a 404 "unknown command" response when nothing matches
+        """
+        key = (method, path, body or "")
+        with self._lock:
+            found = self._find(key)
+            response = (
+                found["response"]
+                if found
+                else {
+                    "status": 404,
+                    "value": json.dumps(
+                        {
+                            "value": {
+                                "error": "unknown command",
+                                "message": f"{method} {path} is not in cassette {self.path}",
+                                "stacktrace": "",
+                            }
+                        }
+                    ),
+                }
+            )
+            self.interactions.append(self._interaction(command, method, path, body, response))
+        if not found:
+            log.warning(f"No recorded response for {command} {method} {path} {body or ''}")
+        return json.loads(json.dumps(response))
+
+    def save(self) -> None:
+        """
+        Writes the recording, or after a replay the difference to the recording, to disk.
+        """
+        if self.recording and self.interactions:
+            write_cassette(self.path, self.interactions)
+            log.info(f"{len(self.interactions)} HTTP interactions recorded to {self.path}")
+        elif self.replaying:
+            lines = diff_interactions(self._recorded, self.interactions)
+            added = sum(1 for line in lines if line.startswith("+"))
+            removed = sum(1 for line in lines if line.startswith("-"))
+            with open(f"{self.path}.diff", "w") as f:
+                f.write("\n".join(lines) + "\n" if lines else "")
+            log.info(
+                f"Replay sent {added} commands more and {removed} fewer than {self.path}, "
+                f"see {self.path}.diff"
+            )
+
+    def _find(self, key: RequestKey) -> Optional[dict]:
+        if self.match == MATCH_SEQUENCE:
+            for index in range(self._cursor, len(self._recorded)):
+                if self._key(self._recorded[index]) == key:
+                    self._cursor = index + 1
+                    return self._recorded[index]
+            # Same command with another body, eg. text generated by Faker, at the current position.
+            if (
+                self._cursor < len(self._recorded)
+                and self._key(self._recorded[self._cursor])[:2] == key[:2]
+            ):
+                self._cursor += 1
+                return self._recorded[self._cursor - 1]
+            return None
+        matching = [i for i in self._recorded if self._key(i) == key] or [
+            i for i in self._recorded if self._key(i)[:2] == key[:2]
+        ]
+        if not matching:
+            return None
+        used = sum(1 for i in self.interactions if self._key(i) == key)
+        return matching[min(used, len(matching) - 1)]
+
+    @staticmethod
+    def _key(interaction: dict) -> RequestKey:
+        return interaction["method"], interaction["path"], interaction.get("body") or ""
+
+    @staticmethod
+    def _interaction(
+        command: str, method: str, path: str, body: Optional[str], response: dict
+    ) -> dict:
+        return {
+            "command": command,
+            "method": method,
+            "path": path,
+            "body": body or "",
+            "response": response,
+        }
+
+
+CASSETTE = Cassette.from_env()
+# Registered on import, before the session pool, so sessions quit at exit are recorded too.
+atexit.register(CASSETTE.save)
+
+
+def main() -> None:
+    coloredlogs.install()
+    parser = argparse.ArgumentParser(description="Inspect HTTP cassettes")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    show = subparsers.add_parser("show", help="List the commands of a cassette")
+    show.add_argument("cassette")
+    diff = subparsers.add_parser("diff", help="Show commands added or removed between cassettes")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    args = parser.parse_args()
+    if args.action == "show":
+        for interaction in read_cassette(args.cassette)["interactions"]:
+            print(describe(interaction))
+        return
+    lines = diff_interactions(
+        read_cassette(args.old)["interactions"], read_cassette(args.new)["interactions"]
+    )
+    print("\n".join(lines))
+    sys.exit(1 if lines else 0)
+
+
+if __name__ == "__main__":
+    main()
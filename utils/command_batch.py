@@ -0,0 +1,292 @@
+import json
+import logging as log
+import os
+import re
+import weakref
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from appium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    UnknownMethodException,
+    WebDriverException,
+)
+from selenium.webdriver.remote.webelement import WebElement
+
+if TYPE_CHECKING:
+    from utils.driver_commands import DriverCommands
+
+BATCH_COMMANDS: bool = os.getenv("BATCH_COMMANDS", "true").lower() == "true"
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+# The operations are embedded as json on this line, the rest of the script interprets them.
+OPS_LINE = re.compile(r"^const ops = (.*);$", re.MULTILINE)
+SCRIPT = """const ops = %s;
+const KEY = "%s";
+const results = [];
+for (const op of ops) {
+  const found = await driver.findElements(op.using, op.value);
+  if (found.length <= op.index) {
+    if (op.optional) { results.push(null); continue; }
+    throw new Error(`No element ${op.index} found by ${op.using} ${op.value}`);
+  }
+  let id = found[op.index][KEY];
+  if (op.child) {
+    id = (await driver.findElementFromElement(id, op.child[0], op.child[1]))[KEY];
+  }
+  if (op.action === "find") {
+    results.push({[KEY]: id});
+  } else if (op.action === "click") {
+    await driver.elementClick(id);
+    results.push(null);
+  } else if (op.action === "type") {
+    await driver.elementClear(id);
+    if (op.text.length > 0) { await driver.elementSendKeys(id, op.text); }
+    results.push(null);
+  } else if (op.action === "text") {
+    results.push(await driver.getElementText(id));
+  }
+}
+return results;
+"""
+# Messages of servers without the execute-driver plugin which report an unknown endpoint as a
+# plain WebDriver error.
+UNSUPPORTED_MESSAGES = (
+    "unknown command",
+    "method has not yet been implemented",
+    "requested resource could not be found",
+)
+_EXECUTE_DRIVER_SUPPORT: "weakref.WeakKeyDictionary[webdriver, bool]" = weakref.WeakKeyDictionary()
+
+
+def ops_from_script(script: str) -> List[dict]:
+    """
+    Reads the operations back from a batch script.
+
+    :param script: script built by CommandBatch
+    :return: list of operations
+    """
+    found = OPS_LINE.search(script)
+    assert found is not None, "Script was not built by CommandBatch"
+    return json.loads(found.group(1))
+
+
+def run_ops(driver: webdriver, ops: List[dict]) -> List[Any]:
+    """
+    Runs the operations with plain driver commands, the way the batch script runs them on the
+    Appium server. Used by the simulated driver to serve execute driver requests.
+
+    :param driver: driver to run the operations with
+    :param ops: list of operations
+    :return: result of every operation
+    """
+    results: List[Any] = []
+    for op in ops:
+        found = driver.find_elements(op["using"], op["value"])
+        if len(found) <= op["index"]:
+            if op["optional"]:
+                results.append(None)
+                continue
+            raise NoSuchElementException(
+                f"No element {op['index']} found by {op['using']} {op['value']}"
+            )
+        element = found[op["index"]]
+        if op["child"]:
+            element = element.find_element(*op["child"])
+        if op["action"] == "find":
+            results.append(element)
+        elif op["action"] == "click":
+            element.click()
+            results.append(None)
+        elif op["action"] == "type":
+            element.clear()
+            if op["text"]:
+                element.send_keys(op["text"])
+            results.append(None)
+        elif op["action"] == "text":
+            results.append(element.text)
+    return results
+
+
+class CommandBatch:
+    """
+    Sequence of find, click, type and read operations sent to the Appium server in one request
+    through the execute driver endpoint (a WebdriverIO script run by the execute-driver plugin),
+    instead of a round trip per command. Every operation looks its element up by selector, item
+    index and optional child selector, so operations do not depend on element handles found
+    before.
+
+    When the server does not support execute driver scripts, or BATCH_COMMANDS is false, the
+    operations run one by one through DriverCommands; the support is checked once per session.
+    """
+
+    def __init__(self, commands: "DriverCommands") -> None:
+        self.commands = commands
+        self.driver = commands.driver
+        self.ops: List[dict] = []
+
+    def find(
+        self,
+        selector: Tuple[str, str],
+        index: int = 0,
+        child: Optional[Tuple[str, str]] = None,
+        optional: bool = False,
+    ) -> "CommandBatch":
+        """
+        Adds an element lookup, its result is the element.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param index: index of the element among all elements found with the selector
+        :param child: selector of the child element to find in the element
+        :param optional: True to return None instead of failing when nothing is found, eg. for
+            UiScrollable lookups which only scroll the element into view
+        :return: the batch
+        """
+        return self._add("find", selector, index, child, optional=optional)
+
+    def click(
+        self, selector: Tuple[str, str], index: int = 0, child: Optional[Tuple[str, str]] = None
+    ) -> "CommandBatch":
+        """
+        Adds a click on the element.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param index: index of the element among all elements found with the selector
+        :param child: selector of the child element to click in the element
+        :return: the batch
+        """
+        return self._add("click", selector, index, child)
+
+    def type(
+        self,
+        selector: Tuple[str, str],
+        value: str,
+        index: int = 0,
+        child: Optional[Tuple[str, str]] = None,
+    ) -> "CommandBatch":
+        """
+        Adds clearing the field and entering the text, an empty text only clears it.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param value: text to enter
+        :param index: index of the element among all elements found with the selector
+        :param child: selector of the child element to type into
+        :return: the batch
+        """
+        return self._add("type", selector, index, child, text=value)
+
+    def text(
+        self, selector: Tuple[str, str], index: int = 0, child: Optional[Tuple[str, str]] = None
+    ) -> "CommandBatch":
+        """
+        Adds reading the element text, its result is the text.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param index: index of the element among all elements found with the selector
+        :param child: selector of the child element to read
+        :return: the batch
+        """
+        return self._add("text", selector, index, child)
+
+    def script(self) -> str:
+        """
+        Builds the WebdriverIO script running the operations.
+
+        :return: script source
+        """
+        return SCRIPT % (json.dumps(self.ops), ELEMENT_KEY)
+
+    def run(self) -> List[Any]:
+        """
+        Runs the operations, in one request when the server supports it.
+
+        :return: result of every operation: element for find, text for text, None otherwise
+        """
+        if not self.ops:
+            return []
+        try:
+            if BATCH_COMMANDS and _EXECUTE_DRIVER_SUPPORT.get(self.driver, True):
+                try:
+                    results = self.driver.execute_driver(self.script()).result
+                    _EXECUTE_DRIVER_SUPPORT[self.driver] = True
+                    log.info("Batch of %s commands sent in one request", len(self.ops))
+                    return [self._to_element(result) for result in results]
+                except WebDriverException as e:
+                    if not self._is_unsupported(e):
+                        raise
+                    _EXECUTE_DRIVER_SUPPORT[self.driver] = False
+                    log.info(
+                        "Execute driver scripts are not supported, running commands: %s", e.msg
+                    )
+            return self._run_sequentially()
+        finally:
+            self.commands.element_cache.next_generation()
+
+    def _add(
+        self,
+        action: str,
+        selector: Tuple[str, str],
+        index: int,
+        child: Optional[Tuple[str, str]],
+        optional: bool = False,
+        text: Optional[str] = None,
+    ) -> "CommandBatch":
+        using, value = selector
+        self.ops.append(
+            {
+                "action": action,
+                "using": using,
+                "value": value,
+                "index": index,
+                "child": list(child) if child else None,
+                "optional": optional,
+                "text": text,
+            }
+        )
+        return self
+
+    def _run_sequentially(self) -> List[Any]:
+        results: List[Any] = []
+        for op in self.ops:
+            element = self._locate(op)
+            if element is None:
+                results.append(None)
+            elif op["action"] == "find":
+                results.append(element)
+            elif op["action"] == "click":
+                self.commands.click_element(element)
+                results.append(None)
+            elif op["action"] == "type":
+                self.commands.type_text(element, op["text"])
+                results.append(None)
+            elif op["action"] == "text":
+                results.append(self.commands.get_text_from_element(element))
+        return results
+
+    def _locate(self, op: dict) -> Optional[WebElement]:
+        selector = (op["using"], op["value"])
+        if op["optional"]:
+            found = self.commands.find_elements(selector)
+            element = found[op["index"]] if len(found) > op["index"] else None
+        elif op["index"] == 0:
+            element = self.commands.find_element(selector, cached=op["action"] != "find")
+        else:
+            element = self.commands.find_elements(selector)[op["index"]]
+        if element is not None and op["child"]:
+            element = self.commands.find_child_element_in_parent_element(
+                element, tuple(op["child"])
+            )
+        return element
+
+    def _to_element(self, result: Any) -> Any:
+        # Found elements come back as element references, the sequential run returns elements.
+        if isinstance(result, dict) and ELEMENT_KEY in result:
+            return self.driver.create_web_element(result[ELEMENT_KEY])
+        return result
+
+    @staticmethod
+    def _is_unsupported(error: WebDriverException) -> bool:
+        # Only a missing endpoint means no support, errors of the script itself are raised.
+        message = (error.msg or "").lower()
+        return isinstance(error, UnknownMethodException) or any(
+            reason in message for reason in UNSUPPORTED_MESSAGES
+        )
@@ -0,0 +1,221 @@
+import json
+import logging as log
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import allure
+import allure_commons
+from appium.webdriver.mobilecommand import MobileCommand
+from selenium.webdriver.remote.command import Command
+
+NO_STEP = "(no step)"
+BACKGROUND = "(background)"
+FIND_COMMANDS = {
+    Command.FIND_ELEMENT,
+    Command.FIND_ELEMENTS,
+    Command.FIND_CHILD_ELEMENT,
+    Command.FIND_CHILD_ELEMENTS,
+}
+# Commands which only read the screen, a repeated lookup is redundant unless a command outside
+# this set changed the UI in between.
+READ_ONLY_COMMANDS = FIND_COMMANDS | {
+    Command.GET_ELEMENT_TEXT,
+    Command.GET_ELEMENT_ATTRIBUTE,
+    Command.GET_ELEMENT_RECT,
+    Command.IS_ELEMENT_ENABLED,
+    MobileCommand.IS_ELEMENT_DISPLAYED,
+    Command.GET_PAGE_SOURCE,
+    Command.GET_WINDOW_RECT,
+    Command.GET_TIMEOUTS,
+    Command.SET_TIMEOUTS,
+}
+
+
+class _StepRun:
+    """
+    One execution of an allure step and the commands sent while it was the innermost step.
+    """
+
+    def __init__(self, title: str) -> None:
+        self.title = title
+        self.started = time.perf_counter()
+        self.seen_lookups: set = set()
+
+
+class _StepTotals:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.commands = 0
+        self.wire_seconds = 0.0
+        self.redundant_lookups = 0
+        self.by_command: Dict[str, int] = {}
+
+    def as_dict(self, title: str) -> dict:
+        return {
+            "step": title,
+            "calls": self.calls,
+            "seconds": round(self.seconds, 4),
+            "commands": self.commands,
+            "wire_seconds": round(self.wire_seconds, 4),
+            "redundant_lookups": self.redundant_lookups,
+            "by_command": self.by_command,
+        }
+
+
+class CommandMetrics:
+    """
+    Times and counts every command sent by TunedAppiumConnection, by command type, by selector
+    strategy and by the innermost allure step the command was sent from. A lookup repeated
+    within one step run without a UI changing command in between is counted as redundant.
+
+    The metrics are collected for the whole process and reset after every test, see
+    BaseTest.tearDown. Commands sent from threads without an open step, eg. by session
+    pre-warming, are attributed to "(background)".
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._main_thread = threading.main_thread()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Starts a new collection period.
+        """
+        with self._lock:
+            self._started = time.perf_counter()
+            self._cpu_started = time.process_time()
+            self._wire_seconds = 0.0
+            self._by_command: Dict[str, List[float]] = {}
+            self._by_strategy: Dict[str, int] = {}
+            self._steps: Dict[str, _StepTotals] = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid: str, title: str, params: dict) -> None:
+        self._step_stack().append(_StepRun(title))
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid: str, exc_type, exc_val, exc_tb) -> None:
+        stack = self._step_stack()
+        if not stack:
+            return
+        step = stack.pop()
+        with self._lock:
+            totals = self._steps.setdefault(step.title, _StepTotals())
+            totals.calls += 1
+            totals.seconds += time.perf_counter() - step.started
+
+    def lookup_key(self, command: str, params: dict) -> Optional[Tuple[str, ...]]:
+        """
+        Builds the key of a lookup command, it has to be taken before the command is sent as the
+        connection removes url parameters like the parent element id from params.
+
+        :param command: selenium command name
+        :param params: command parameters
+        :return: tuple identifying the lookup, None for other commands
+        """
+        if command not in FIND_COMMANDS:
+            return None
+        return command, str(params.get("id", "")), params.get("using"), str(params.get("value"))
+
+    def record(self, command: str, lookup_key: Optional[Tuple[str, ...]], seconds: float) -> None:
+        """
+        Records a sent command.
+
+        :param command: selenium command name
+        :param lookup_key: result of lookup_key taken before the command was sent
+        :param seconds: time from sending the request to receiving the response
+        """
+        stack = self._step_stack()
+        step = stack[-1] if stack else None
+        title = step.title if step else self._no_step_title()
+        redundant = False
+        if step is not None:
+            if lookup_key is None and command not in READ_ONLY_COMMANDS:
+                step.seen_lookups.clear()
+            elif lookup_key is not None:
+                redundant = lookup_key in step.seen_lookups
+                step.seen_lookups.add(lookup_key)
+        with self._lock:
+            self._wire_seconds += seconds
+            self._by_command.setdefault(command, []).append(seconds)
+            if lookup_key is not None:
+                self._by_strategy[lookup_key[2]] = self._by_strategy.get(lookup_key[2], 0) + 1
+            totals = self._steps.setdefault(title, _StepTotals())
+            totals.commands += 1
+            totals.wire_seconds += seconds
+            totals.redundant_lookups += redundant
+            totals.by_command[command] = totals.by_command.get(command, 0) + 1
+
+    def report(self, test_name: str, slowest_steps: int = 10) -> dict:
+        """
+        Summarises the commands of the current collection period.
+
+        :param test_name: name of the test the period belongs to
+        :param slowest_steps: number of steps listed by their total time
+        :return: dictionary with time split, command, strategy and step breakdowns
+        """
+        with self._lock:
+            wall_seconds = time.perf_counter() - self._started
+            steps = [totals.as_dict(title) for title, totals in self._steps.items()]
+            return {
+                "test": test_name,
+                "commands": sum(len(times) for times in self._by_command.values()),
+                "wall_seconds": round(wall_seconds, 4),
+                "wire_seconds": round(self._wire_seconds, 4),
+                "client_seconds": round(wall_seconds - self._wire_seconds, 4),
+                "client_cpu_seconds": round(time.process_time() - self._cpu_started, 4),
+                "redundant_lookups": sum(step["redundant_lookups"] for step in steps),
+                "by_command": {
+                    command: {"count": len(times), "seconds": round(sum(times), 4)}
+                    for command, times in sorted(
+                        self._by_command.items(), key=lambda item: -sum(item[1])
+                    )
+                },
+                "by_strategy": dict(sorted(self._by_strategy.items(), key=lambda i: -i[1])),
+                "slowest_steps": sorted(steps, key=lambda step: -step["seconds"])[:slowest_steps],
+                "steps": sorted(steps, key=lambda step: -step["commands"]),
+            }
+
+    def attach_and_export(self, test_name: str, directory: Optional[str]) -> dict:
+        """
+        Attaches the report of the current period to the allure result of the running test and
+        writes it to the directory as json, then starts a new period.
+
+        :param test_name: name of the test, used in the file name
+        :param directory: directory for json reports, None to skip the export
+        :return: the report
+        """
+        report = self.report(test_name)
+        content = json.dumps(report, indent=2)
+        allure.attach(content, "Command metrics", allure.attachment_type.JSON)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"{test_name}.json"), "w") as f:
+                f.write(content)
+        log.info(
+            "%s sent %s commands: wire %.2f s, client %.2f s, %s redundant lookups",
+            test_name,
+            report["commands"],
+            report["wire_seconds"],
+            report["client_seconds"],
+            report["redundant_lookups"],
+        )
+        self.reset()
+        return report
+
+    def _step_stack(self) -> List[_StepRun]:
+        if not hasattr(self._local, "steps"):
+            self._local.steps = []
+        return self._local.steps
+
+    def _no_step_title(self) -> str:
+        return NO_STEP if threading.current_thread() is self._main_thread else BACKGROUND
+
+
+COMMAND_METRICS = CommandMetrics()
+allure_commons.plugin_manager.register(COMMAND_METRICS)
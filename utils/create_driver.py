@@ -1,29 +1,163 @@
 import logging as log
 import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
 
 import allure
+import urllib3
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.options.ios import XCUITestOptions
+from appium.webdriver.appium_connection import AppiumConnection
+from appium.webdriver.mobilecommand import MobileCommand
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
 
+from utils.adb_commands import AdbCommands
+from utils.cassette import CASSETTE
+from utils.command_metrics import COMMAND_METRICS
+from utils.install_cache import INSTALL_CACHE, configured_app_id
 
-def get_common_capabilities(config_file: dict, app_dir: str) -> dict:
+DEFAULT_COMMAND_TIMEOUT = 120
+COMMAND_TIMEOUTS: Dict[str, float] = {
+    Command.NEW_SESSION: 600,
+    Command.QUIT: 60,
+    Command.GET_PAGE_SOURCE: 60,
+    Command.W3C_EXECUTE_SCRIPT: 300,
+    MobileCommand.EXECUTE_DRIVER: 300,
+}
+CONNECT_TIMEOUT = 5
+SIMULATOR_REMOTE = "simulator"
+
+
+class _CommandPoolManager(urllib3.PoolManager):
+    """
+    Pool manager which applies the timeout of the command being sent and asks for compressed
+    responses.
+    """
+
+    def __init__(
+        self, timeout_provider: Callable[[], urllib3.Timeout], compression: bool, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self._timeout_provider = timeout_provider
+        self._compression = compression
+
+    def urlopen(  # type: ignore[override]
+        self, method: str, url: str, redirect: bool = True, **kw: Any
+    ) -> urllib3.BaseHTTPResponse:
+        # Same signature as urllib3.PoolManager.urlopen, which narrows the one of RequestMethods.
+        kw.setdefault("timeout", self._timeout_provider())
+        if self._compression and kw.get("headers") is not None:
+            kw["headers"] = {**kw["headers"], "Accept-Encoding": "gzip, deflate"}
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+
+class TunedAppiumConnection(AppiumConnection):
+    """
+    Appium command executor with a keep-alive connection pool, per-command read timeouts,
+    optional response compression and retries of connection-level failures. Requests which
+    already reached the server are never retried. Every command is timed in COMMAND_METRICS
+    and recorded to or replayed from the HTTP cassette when one is configured.
+    """
+
+    def __init__(
+        self,
+        remote_server_addr: str,
+        pool_size: int = 4,
+        connect_retries: int = 3,
+        compression: bool = True,
+        command_timeouts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self._command_timeouts = {**COMMAND_TIMEOUTS, **(command_timeouts or {})}
+        self._compression = compression
+        self._local = threading.local()
+        retries = urllib3.Retry(
+            total=connect_retries,
+            connect=connect_retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.2,
+        )
+        super().__init__(
+            remote_server_addr,
+            keep_alive=True,
+            init_args_for_pool_manager={"maxsize": pool_size, "block": False, "retries": retries},
+        )
+
+    def execute(self, command: str, params: dict) -> dict:
+        self._local.command = command
+        lookup_key = COMMAND_METRICS.lookup_key(command, params)
+        started = time.perf_counter()
+        try:
+            return super().execute(command, params)
+        finally:
+            COMMAND_METRICS.record(command, lookup_key, time.perf_counter() - started)
+
+    def _request(self, method: str, url: str, body: Optional[str] = None) -> dict:
+        command = getattr(self._local, "command", None)
+        path = url.removeprefix(self._url)
+        if CASSETTE.replaying:
+            return CASSETTE.replay(command, method, path, body)
+        response = super()._request(method, url, body=body)
+        if CASSETTE.recording:
+            CASSETTE.record(command, method, path, body, response)
+        return response
+
+    def _command_timeout(self) -> urllib3.Timeout:
+        command = getattr(self._local, "command", None)
+        read_timeout = self._command_timeouts.get(command, DEFAULT_COMMAND_TIMEOUT)
+        return urllib3.Timeout(connect=CONNECT_TIMEOUT, read=read_timeout)
+
+    def _get_connection_manager(self) -> urllib3.PoolManager:
+        manager = super()._get_connection_manager()
+        if type(manager) is not urllib3.PoolManager:
+            log.info("Proxy is used, per-command timeouts and compression are disabled")
+            return manager
+        return _CommandPoolManager(
+            self._command_timeout, self._compression, **manager.connection_pool_kw
+        )
+
+
+def get_common_capabilities(config_file: dict, app_dir: str, installed: bool = False) -> dict:
     """
     Get common desired capabilities for both iOS and Android platforms.
 
     :param config_file: Dictionary with test configuration.
     :param app_dir: Path to directory with test applications.
+    :param installed: True when the app is already installed on the device, the session is then
+        started against the installed app without the app capability.
     :return: Dictionary with common desired capabilities.
     """
-    return {
+    common_caps = {
         "appiumVersion": config_file["appiumVersion"],
         "deviceOrientation": config_file["deviceOrientation"],
-        "app": os.path.join(app_dir, config_file["app"]),
         "deviceName": config_file["deviceName"],
         "platformName": config_file["platformName"],
         "platformVersion": config_file["platformVersion"],
         "newCommandTimeout": 600,
     }
+    if not installed:
+        common_caps["app"] = os.path.join(app_dir, config_file["app"])
+    return common_caps
+
+
+def get_installed_app_capabilities(config_file: dict) -> dict:
+    """
+    Get capabilities starting the session against the app already installed on the Android
+    device.
+
+    :param config_file: Dictionary with test configuration.
+    :return: Dictionary with the app package capabilities, full reset is disabled as it would
+        uninstall the app.
+    """
+    return {
+        "appPackage": config_file["appPackage"],
+        "appActivity": config_file.get("appActivity") or config_file["appWaitActivity"],
+        "fullReset": False,
+    }
 
 
 def get_ios_capabilities(config_file: dict) -> dict:
@@ -37,8 +171,7 @@ def get_ios_capabilities(config_file: dict) -> dict:
         "xcodeOrgId": config_file["xcodeOrgId"],
         "automationName": config_file["automationName"],
         "testFramework": config_file["automationName"].lower(),
-        "noReset": False,
-        "fullReset": True,
+        **get_reset_capabilities(config_file, no_reset=False, full_reset=True),
     }
     if config_file.get("udid"):
         ios_caps.update(
@@ -48,6 +181,7 @@ def get_ios_capabilities(config_file: dict) -> dict:
                 "xcodeSigningId": config_file["xcodeSigningId"],
             }
         )
+    ios_caps.update(get_parallel_capabilities(config_file, ("wdaLocalPort", "mjpegServerPort")))
     return ios_caps
 
 
@@ -65,12 +199,59 @@ def get_android_capabilities(config_file: dict) -> dict:
         "unicodeKeyboard": config_file["unicodeKeyboard"],
         "resetKeyboard": config_file["resetKeyboard"],
         "automationName": "UiAutomator2",
+        **get_reset_capabilities(config_file, no_reset=False, full_reset=False),
     }
     if config_file["platformVersion"] == "6.0":
         android_caps["browserName"] = config_file["browserName"]
+    android_caps.update(
+        get_parallel_capabilities(config_file, ("udid", "systemPort", "mjpegServerPort"))
+    )
     return android_caps
 
 
+def get_reset_capabilities(config_file: dict, no_reset: bool, full_reset: bool) -> dict:
+    """
+    Get capabilities deciding how the app is reset when a session starts, resets between classes
+    and tests on a live session are done by utils.reset_strategies.
+
+    :param config_file: Dictionary with test configuration.
+    :param no_reset: Default of the noReset capability, used when not configured.
+    :param full_reset: Default of the fullReset capability, used when not configured.
+    :return: Dictionary with noReset and fullReset capabilities.
+    """
+    return {
+        "noReset": config_file.get("noReset", no_reset),
+        "fullReset": config_file.get("fullReset", full_reset),
+    }
+
+
+def get_parallel_capabilities(config_file: dict, keys: tuple) -> dict:
+    """
+    Get device and port capabilities which have to be unique for every parallel worker.
+
+    :param config_file: Dictionary with test configuration.
+    :param keys: Names of the capabilities supported by the platform driver.
+    :return: Dictionary with the capabilities set in the configuration.
+    """
+    return {key: config_file[key] for key in keys if config_file.get(key)}
+
+
+def get_command_executor(config_file: dict) -> TunedAppiumConnection:
+    """
+    Get command executor for the Appium server from the configuration.
+
+    :param config_file: Dictionary with test configuration.
+    :return: Connection to the Appium server.
+    """
+    return TunedAppiumConnection(
+        config_file["remote"],
+        pool_size=config_file.get("httpPoolSize", 4),
+        connect_retries=config_file.get("httpConnectRetries", 3),
+        compression=config_file.get("httpCompression", True),
+        command_timeouts=config_file.get("commandTimeouts"),
+    )
+
+
 @allure.step("Create appium driver")
 def create_driver(config_file: dict, app_dir: str) -> webdriver:
     """
@@ -80,18 +261,111 @@ def create_driver(config_file: dict, app_dir: str) -> webdriver:
     :param app_dir: Path to directory with test applications.
     :return: Appium driver.
     """
-    desired_caps = get_common_capabilities(config_file, app_dir)
-    platform = config_file["platformName"].lower()
+    return start_driver(config_file, app_dir)
+
+
+def start_driver(config_file: dict, app_dir: str) -> webdriver:
+    """
+    Create Appium driver without reporting an allure step, safe to call from background threads.
+
+    :param config_file: Dictionary with test configuration.
+    :param app_dir: Path to directory with test applications.
+    :return: Appium driver.
+    """
+    if config_file.get("remote") == SIMULATOR_REMOTE:
+        from utils.simulated_driver import SimulatedDriver
+
+        return SimulatedDriver(config_file)
+    app_path = os.path.join(app_dir, config_file["app"])
+    # Android only: the iOS configuration has no bundle id to record before the session and
+    # full reset, the iOS default, uninstalls the app anyway. A replayed session never reaches a
+    # device, the record must not change.
+    install_cache = (
+        config_file["platformName"].lower() == "android"
+        and config_file.get("installCache", True)
+        and not CASSETTE.replaying
+    )
+    installed = install_cache and INSTALL_CACHE.is_installed(config_file, app_path)
+    if config_file["platformName"].lower() == "android" and config_file.get("udid"):
+        adb = AdbCommands(serial=config_file["udid"])
+        adb.wait_until_ready(config_file.get("deviceReadyTimeout", 60))
+        if installed and adb.available and not adb.is_package_installed(config_file["appPackage"]):
+            log.warning(
+                f"{config_file['appPackage']} recorded as installed is missing, installing it"
+            )
+            INSTALL_CACHE.forget(config_file)
+            installed = False
+
+    desired_caps = get_desired_capabilities(config_file, app_dir, installed)
+    try:
+        driver = new_session(config_file, desired_caps)
+    except WebDriverException as e:
+        if not installed:
+            raise
+        # Without adb the recorded app can not be checked before, eg. removed by hand.
+        log.warning(f"Session against the installed app failed, installing it: {e.msg}")
+        INSTALL_CACHE.forget(config_file)
+        installed = False
+        desired_caps = get_desired_capabilities(config_file, app_dir, installed)
+        driver = new_session(config_file, desired_caps)
+    if install_cache:
+        update_install_cache(config_file, app_path, installed, desired_caps["fullReset"])
+    return driver
 
-    if platform == "ios":
+
+def get_desired_capabilities(config_file: dict, app_dir: str, installed: bool) -> dict:
+    """
+    Get desired capabilities of a new session for the configured platform.
+
+    :param config_file: Dictionary with test configuration.
+    :param app_dir: Path to directory with test applications.
+    :param installed: True to start the session against the installed app.
+    :return: Dictionary with desired capabilities.
+    """
+    desired_caps = get_common_capabilities(config_file, app_dir, installed)
+    if config_file["platformName"].lower() == "ios":
         desired_caps.update(get_ios_capabilities(config_file))
-        automator_options = XCUITestOptions()
-    elif platform == "android":
+    else:
         desired_caps.update(get_android_capabilities(config_file))
-        automator_options = UiAutomator2Options()
+    if installed:
+        desired_caps.update(get_installed_app_capabilities(config_file))
+    return desired_caps
+
+
+def new_session(config_file: dict, desired_caps: dict) -> webdriver:
+    """
+    Start Appium session with the desired capabilities.
 
+    :param config_file: Dictionary with test configuration.
+    :param desired_caps: Dictionary with desired capabilities.
+    :return: Appium driver.
+    """
+    if config_file["platformName"].lower() == "ios":
+        automator_options: Union[XCUITestOptions, UiAutomator2Options] = XCUITestOptions()
+    else:
+        automator_options = UiAutomator2Options()
     automator_options.load_capabilities(desired_caps)
-    environment = config_file["remote"]
     log.info(f"Starting appium driver with caps: \n{desired_caps}")
+    return webdriver.Remote(
+        command_executor=get_command_executor(config_file), options=automator_options
+    )
+
 
-    return webdriver.Remote(command_executor=environment, options=automator_options)
+def update_install_cache(
+    config_file: dict, app_path: str, installed: bool, full_reset: bool
+) -> None:
+    """
+    Keeps the install cache in line with the device after the session started: an app installed
+    by Appium is recorded unless full reset uninstalls it when the session ends.
+
+    :param config_file: Dictionary with test configuration.
+    :param app_path: Path to the application file.
+    :param installed: True when the session was started without the app capability.
+    :param full_reset: fullReset capability of the session.
+    """
+    if installed:
+        log.info(f"Session started against installed {configured_app_id(config_file)}")
+    elif full_reset:
+        INSTALL_CACHE.forget(config_file)
+    else:
+        INSTALL_CACHE.mark_installed(config_file, app_path)
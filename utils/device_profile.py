@@ -0,0 +1,56 @@
+import logging as log
+import weakref
+from typing import Dict, Optional
+
+from appium import webdriver
+
+
+class DeviceProfile:
+    """
+    Properties of the device behind a driver session. Every property is fetched from the device
+    once, on first use, and shared by all helpers and page objects using the session.
+    """
+
+    def __init__(self, driver: webdriver) -> None:
+        self.driver = driver
+        self._window_size: Optional[Dict[str, int]] = None
+
+    @property
+    def platform(self) -> str:
+        """
+        Platform name in lowercase, read from the session capabilities without a request.
+        """
+        return self.driver.capabilities.get("platformName").lower()
+
+    @property
+    def window_size(self) -> Dict[str, int]:
+        """
+        Window size as a dictionary with width and height.
+        """
+        if self._window_size is None:
+            self._window_size = self.driver.get_window_size()
+            log.info(f"Window size: {self._window_size}")
+        return self._window_size
+
+    def invalidate(self) -> None:
+        """
+        Drops fetched properties, e.g. after the device orientation changed.
+        """
+        self._window_size = None
+
+
+_DEVICE_PROFILES: "weakref.WeakKeyDictionary[webdriver, DeviceProfile]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def device_profile_for(driver: webdriver) -> DeviceProfile:
+    """
+    Gets the device profile of the driver session, creating it on first use.
+
+    :param driver: Appium driver
+    :return: DeviceProfile shared by all helpers using the driver
+    """
+    if driver not in _DEVICE_PROFILES:
+        _DEVICE_PROFILES[driver] = DeviceProfile(driver)
+    return _DEVICE_PROFILES[driver]
@@ -1,36 +1,75 @@
 import logging as log
-from typing import List, Optional, Tuple, Union
+import os
+from typing import Callable, List, Optional, Tuple, TypeVar, Union
 
 from appium import webdriver
 from appium.webdriver.common.appiumby import AppiumBy
-from appium.webdriver.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
 
 from utils import ELEMENT, is_webelement
+from utils.adb_commands import adb_commands_for
+from utils.command_batch import CommandBatch
+from utils.device_profile import device_profile_for
+from utils.element_cache import element_cache_for
+from utils.page_snapshot import PageSnapshot
 from utils.wait_commands import WaitCommands
 
+T = TypeVar("T")
+LOG_ELEMENT_TEXT: bool = os.getenv("LOG_ELEMENT_TEXT", "true").lower() == "true"
+
+
+class ElementDescription:
+    """
+    Description of an element for log messages, built only when the message is emitted. The
+    element text is fetched at most once and never when LOG_ELEMENT_TEXT is disabled; text which
+    was already read can be passed in to skip the request.
+    """
+
+    def __init__(self, element: WebElement, text: Optional[str] = None) -> None:
+        self.element = element
+        self.text = text
+
+    def __str__(self) -> str:
+        if self.text is None and LOG_ELEMENT_TEXT:
+            try:
+                self.text = self.element.text
+            except WebDriverException:
+                self.text = ""
+        return f"Text: {self.text}" if self.text else f"ID: {self.element.id}"
+
 
 class DriverCommands:
 
     def __init__(self, driver: webdriver) -> None:
         self.driver: webdriver = driver
         self.wait = WaitCommands(self.driver)
+        self.element_cache = element_cache_for(self.driver)
+        self.device = device_profile_for(self.driver)
+        self.adb = adb_commands_for(self.driver)
 
-    def find_element(self, selector: ELEMENT, wait: Optional[float] = None) -> WebElement:
+    def find_element(
+        self, selector: ELEMENT, wait: Optional[float] = None, cached: bool = False
+    ) -> WebElement:
         """
         Finds element on the application view.
 
         :param selector: tuple (eg. By.ID, 'element/id') or WebElement
         :param wait: float, wait time to element visibility
+        :param cached: True to reuse the handle found in the current screen generation, only for
+            finding the element of an action; presence checks always ask the server
         :return: WebElement, the found element
         """
         if is_webelement(selector):
             return selector
-        if isinstance(selector, str):
-            selector = (AppiumBy.XPATH, selector)
-        element = self.wait.wait_for_presence_of_element(selector, wait)
-        log.info(f"Found element with by: {selector}. {self.__get_text_or_id(element)}")
+        locator = self.convert_selector(selector)
+        element = self.element_cache.get(locator) if cached else None
+        if element is not None:
+            log.debug("Element by %s taken from cache. (ID: %s)", locator, element.id)
+            return element
+        element = self.wait.wait_for_presence_of_element(locator, wait)
+        self.element_cache.put(locator, element)
+        log.info("Found element with by: %s. %s", locator, ElementDescription(element))
         return element
 
     def find_elements(self, selector: Tuple[str, str]) -> List[WebElement]:
@@ -40,8 +79,9 @@ class DriverCommands:
         :param selector: tuple (eg. By.ID, 'element/id')
         :return: List[WebElement], list of found elements
         """
+        self.wait.strategy.probe(self.driver)
         elements = self.driver.find_elements(*selector)
-        log.info(f"Found {len(elements)} elements by {selector}")
+        log.info("Found %s elements by %s", len(elements), selector)
         return elements
 
     def click_element(self, element: ELEMENT) -> None:
@@ -52,10 +92,35 @@ class DriverCommands:
         :type element: ELEMENT
         :return: None
         """
-        element = self.find_element(element)
-        text = self.__get_text_or_id(element)
-        element.click()
-        log.info(f"Element clicked. {text}")
+        self._on_fresh_element(element, self.__click)
+        self.element_cache.next_generation()
+
+    def tap_bounds(self, bounds: Tuple[int, int, int, int]) -> None:
+        """
+        Taps the center of the bounds, eg. of a node read from a page snapshot, without looking
+        the element up first.
+
+        :param bounds: tuple (left, top, right, bottom)
+        """
+        left, top, right, bottom = bounds
+        center = ((left + right) // 2, (top + bottom) // 2)
+        log.info("Tapping at %s", center)
+        self.driver.tap([center])
+        self.element_cache.next_generation()
+
+    def is_on_screen(self, bounds: Tuple[int, int, int, int]) -> bool:
+        """
+        Checks whether the center of the bounds, where tap_bounds taps, lies inside the window.
+
+        :param bounds: tuple (left, top, right, bottom)
+        :return: True if the center is on the screen
+        """
+        left, top, right, bottom = bounds
+        window_size = self.device.window_size
+        return (
+            0 <= (left + right) // 2 < window_size["width"]
+            and 0 <= (top + bottom) // 2 < window_size["height"]
+        )
 
     def type_text(self, selector: ELEMENT, value: str) -> None:
         """
@@ -65,11 +130,37 @@ class DriverCommands:
         :param value: str, text to enter; if value is an empty string '', the input will only be
             cleared
         """
-        element = self.find_element(selector)
-        element.clear()
-        if len(value) > 0:
-            element.send_keys(value)
-        log.info(f'"{value}" text send to input field. (ID: {element.id})')
+        element = self._on_fresh_element(selector, lambda found: self.__enter_text(found, value))
+        self.element_cache.next_generation()
+        log.info('"%s" text send to input field. (ID: %s)', value, element.id)
+
+    def input_text(self, value: str) -> None:
+        """
+        Types text into the focused input field, over a direct adb connection on Android when
+        the device is reachable, otherwise through Appium.
+
+        :param value: str, text to type
+        """
+        self.adb.input_text(value)
+        self.element_cache.next_generation()
+        log.info('"%s" text typed into the focused field', value)
+
+    def batch(self) -> CommandBatch:
+        """
+        Starts a batch of operations sent to the server in one request, see CommandBatch, eg.
+        self.batch().type(first_name, "John").click(continue_button).run()
+
+        :return: empty CommandBatch
+        """
+        return CommandBatch(self)
+
+    def take_screenshot(self) -> bytes:
+        """
+        Captures the screen, with adb screencap on Android when the device is reachable.
+
+        :return: PNG image
+        """
+        return self.adb.screenshot()
 
     def get_text_from_element(self, element: ELEMENT) -> str:
         """
@@ -78,8 +169,7 @@ class DriverCommands:
         :param element: touple (eg. By.ID, 'element/id') or WebElement
         :return: text from element
         """
-        element = self.find_element(element)
-        return element.text.rstrip()
+        return self._on_fresh_element(element, lambda found: found.text).rstrip()
 
     def check_elements_text(self, element: ELEMENT, expected_text: str) -> None:
         """
@@ -93,7 +183,7 @@ class DriverCommands:
             expected_text,
             element_text,
         )
-        log.info(f"Text: {expected_text} is correct!")
+        log.info("Text: %s is correct!", expected_text)
 
     def find_child_element_in_parent_element(
         self,
@@ -109,12 +199,12 @@ class DriverCommands:
         :param wait: float, wait time for child element, default 10
         :return: WebElement, the found child element
         """
-        module = self.find_element(selector=parent)
         wait_time = wait or 10
-        element = WebDriverWait(module, wait_time).until(
-            EC.presence_of_element_located(locator=child)
+        element = self._on_fresh_element(
+            parent,
+            lambda module: self.wait.strategy.presence(self.driver, child, wait_time, module),
         )
-        log.info(f"Found child element by selector: {child}. {self.__get_text_or_id(element)}")
+        log.info("Found child element by selector: %s. %s", child, ElementDescription(element))
         return element
 
     def find_all_child_elements_in_parent_element(
@@ -128,18 +218,30 @@ class DriverCommands:
         :return: List[WebElement], list of found child elements
         """
         if not isinstance(parent, WebElement):
-            parent = WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(parent))
+            parent = self.wait.strategy.presence(self.driver, self.convert_selector(parent), 10)
+        self.wait.strategy.probe(self.driver)
         elements = parent.find_elements(child[0], child[1])
-        log.debug(f"Found {len(elements)} elements")
+        log.debug("Found %s elements", len(elements))
         return elements
 
+    def snapshot(self) -> PageSnapshot:
+        """
+        Fetches the page source of the current screen once and parses it, selectors can then be
+        evaluated against the snapshot locally without further requests.
+
+        :return: PageSnapshot, parsed current screen
+        """
+        snapshot = PageSnapshot(self.driver.page_source, self.platform_name())
+        log.info("Page snapshot taken. Nodes: %s", len(snapshot.nodes))
+        return snapshot
+
     def platform_name(self) -> str:
         """
         Gets the platform name of the driver.
 
         :return: the platform name in lowercase
         """
-        return self.driver.capabilities.get("platformName").lower()
+        return self.device.platform
 
     def driver_is_android(self) -> bool:
         """
@@ -160,7 +262,7 @@ class DriverCommands:
     @staticmethod
     def convert_selector(
         my_object: Union[WebElement, str, tuple], by=AppiumBy.XPATH
-    ) -> Union[WebElement, tuple]:
+    ) -> Tuple[str, str]:
         """
         Converts a given object to a selector tuple, this method takes an object that can be
         a WebElement, a string, or a tuple, and converts it to a selector tuple.
@@ -176,12 +278,34 @@ class DriverCommands:
         else:
             raise ValueError("my_object must be a string or tuple")
 
-    @staticmethod
-    def __get_text_or_id(element: WebElement) -> str:
+    def _on_fresh_element(self, selector: ELEMENT, action: Callable[[WebElement], T]) -> T:
         """
-        Gets the text or ID of the element.
+        Finds element and performs the action on it. When the element handle taken from the cache
+        turns out to be stale, the element is found again and the action is repeated once.
 
-        :param element: WebElement
-        :return: str, text or ID of the element
+        :param selector: tuple (eg. By.ID, 'element/id') or WebElement
+        :param action: function called with the found element
+        :return: result of the action
         """
-        return f"Text: {element.text}" if element.text else f"ID: {element.id}"
+        element = self.find_element(selector, cached=True)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            if is_webelement(selector):
+                raise
+            locator = self.convert_selector(selector)
+            log.info("Element by %s is stale, finding it again", locator)
+            self.element_cache.invalidate(locator)
+            return action(self.find_element(locator, cached=True))
+
+    @staticmethod
+    def __click(element: WebElement) -> None:
+        log.info("Clicking element. %s", ElementDescription(element))
+        element.click()
+
+    @staticmethod
+    def __enter_text(element: WebElement, value: str) -> WebElement:
+        element.clear()
+        if len(value) > 0:
+            element.send_keys(value)
+        return element
@@ -0,0 +1,68 @@
+import logging as log
+import weakref
+from typing import Dict, Optional, Tuple
+
+from appium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class ElementCache:
+    """
+    Element handles found on the current screen, shared by all helpers of one driver session.
+    Every action which may change the UI starts a new screen generation, which drops all cached
+    handles found in the previous one. Handles are only reused to act on an element, presence and
+    visibility checks always ask the server.
+    """
+
+    def __init__(self) -> None:
+        self.generation: int = 0
+        self._elements: Dict[Tuple[str, str], WebElement] = {}
+
+    def get(self, selector: Tuple[str, str]) -> Optional[WebElement]:
+        """
+        Gets element handle found with the selector in the current screen generation.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :return: WebElement or None if the element was not found in this generation yet
+        """
+        return self._elements.get(selector)
+
+    def put(self, selector: Tuple[str, str], element: WebElement) -> None:
+        """
+        Stores element handle found with the selector.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param element: found element
+        """
+        self._elements[selector] = element
+
+    def invalidate(self, selector: Tuple[str, str]) -> None:
+        """
+        Drops the handle cached for the selector, e.g. when it turned out to be stale.
+
+        :param selector: tuple (eg. By.ID, 'element/id')
+        """
+        self._elements.pop(selector, None)
+
+    def next_generation(self) -> None:
+        """
+        Starts a new screen generation, call it after every action which may change the UI.
+        """
+        self.generation += 1
+        self._elements.clear()
+        log.debug(f"Screen generation {self.generation}")
+
+
+_ELEMENT_CACHES: "weakref.WeakKeyDictionary[webdriver, ElementCache]" = weakref.WeakKeyDictionary()
+
+
+def element_cache_for(driver: webdriver) -> ElementCache:
+    """
+    Gets the element cache of the driver session, creating it on first use.
+
+    :param driver: Appium driver
+    :return: ElementCache shared by all helpers using the driver
+    """
+    if driver not in _ELEMENT_CACHES:
+        _ELEMENT_CACHES[driver] = ElementCache()
+    return _ELEMENT_CACHES[driver]
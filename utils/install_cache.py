@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging as log
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+ROOT_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+_VERSION_RE = re.compile(r"\d+(?:\.\d+)+")
+_HASH_CHUNK = 1024 * 1024
+
+
+def app_version(config_file: dict) -> str:
+    """
+    Gets the version of the application under test: "appVersion" from the configuration,
+    otherwise the version in the application file name, eg. 2.7.1 for
+    Android.SauceLabs.Mobile.Sample.app.2.7.1.apk.
+
+    :param config_file: Dictionary with test configuration.
+    :return: version, empty when unknown
+    """
+    if config_file.get("appVersion"):
+        return str(config_file["appVersion"])
+    found = _VERSION_RE.findall(os.path.basename(config_file["app"]))
+    return found[-1] if found else ""
+
+
+def configured_app_id(config_file: dict) -> Optional[str]:
+    """
+    Gets the package from the configuration, without a session. Only Android apps are cached.
+
+    :param config_file: Dictionary with test configuration.
+    :return: application id, None when not configured or not on Android
+    """
+    if config_file["platformName"].lower() == "android":
+        return config_file.get("appPackage") or None
+    return None
+
+
+class InstallCache:
+    """
+    Per-device record of the Android application installed by the framework: version and sha256
+    of the installed file. A session on a device with the same application installed is started
+    against the installed package instead of letting Appium push and reinstall the file. The
+    record is a json file shared by all processes, devices are identified by the Appium server
+    and udid, or device name when no udid is configured.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._hashes: Dict[Tuple[str, float, int], str] = {}
+
+    @classmethod
+    def from_env(cls) -> "InstallCache":
+        return cls(
+            os.getenv("APP_INSTALL_CACHE", os.path.join(ROOT_PATH, ".app_install_cache.json"))
+        )
+
+    @staticmethod
+    def device_key(config_file: dict) -> str:
+        return f"{config_file['remote']}|{config_file.get('udid') or config_file['deviceName']}"
+
+    def file_hash(self, app_path: str) -> str:
+        """
+        Gets sha256 of the application file, computed once per file modification.
+
+        :param app_path: path to the application file
+        :return: hex digest
+        """
+        stat = os.stat(app_path)
+        key = (app_path, stat.st_mtime, stat.st_size)
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+        digest = hashlib.sha256()
+        with open(app_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._hashes[key] = digest.hexdigest()
+        return self._hashes[key]
+
+    def entry(self, config_file: dict, app_path: str) -> Optional[dict]:
+        """
+        Builds the record of the application file, None when it can not be cached: the file is
+        missing or the application id is not configured.
+
+        :param config_file: Dictionary with test configuration.
+        :param app_path: path to the application file
+        :return: dictionary with application id, version, file name and sha256
+        """
+        app_id = configured_app_id(config_file)
+        if not app_id or not os.path.isfile(app_path):
+            return None
+        return {
+            "appId": app_id,
+            "version": app_version(config_file),
+            "file": os.path.basename(app_path),
+            "sha256": self.file_hash(app_path),
+        }
+
+    def is_installed(self, config_file: dict, app_path: str) -> bool:
+        """
+        Checks whether the application file was installed on the configured device.
+
+        :param config_file: Dictionary with test configuration.
+        :param app_path: path to the application file
+        :return: True when version and hash of the installed application match the file
+        """
+        entry = self.entry(config_file, app_path)
+        if entry is None:
+            return False
+        installed = self._read().get(self.device_key(config_file), {}).get(entry["appId"])
+        return installed is not None and all(
+            installed.get(key) == entry[key] for key in ("version", "sha256")
+        )
+
+    def mark_installed(self, config_file: dict, app_path: str) -> None:
+        """
+        Records the application file as installed on the configured device.
+
+        :param config_file: Dictionary with test configuration.
+        :param app_path: path to the application file
+        """
+        entry = self.entry(config_file, app_path)
+        if entry is None:
+            return
+        self._update(config_file, entry["appId"], entry)
+        log.info(f"Recorded {entry['file']} as installed on {self.device_key(config_file)}")
+
+    def forget(self, config_file: dict) -> None:
+        """
+        Drops the record of the configured application on the configured device, the next
+        session installs it again.
+
+        :param config_file: Dictionary with test configuration.
+        """
+        app_id = configured_app_id(config_file)
+        if app_id:
+            self._update(config_file, app_id, None)
+
+    def _update(self, config_file: dict, app_id: str, entry: Optional[dict]) -> None:
+        with self._lock:
+            # Re-read under the lock, other workers may have recorded their devices meanwhile.
+            records = self._read()
+            device = records.setdefault(self.device_key(config_file), {})
+            if entry is None:
+                device.pop(app_id, None)
+            else:
+                device[app_id] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(records, f, indent=2)
+            os.replace(temporary, self.path)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            log.warning(f"Install cache {self.path} is not valid json, it is ignored")
+            return {}
+
+
+INSTALL_CACHE = InstallCache.from_env()
@@ -0,0 +1,324 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple, Union
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+UiSelectorArgument = Union[str, int, bool]
+
+ANDROID_ATTRIBUTES = {
+    "text": "text",
+    "content_desc": "content-desc",
+    "resource_id": "resource-id",
+    "class_name": "class",
+}
+IOS_ATTRIBUTES = {
+    "text": "value",
+    "content_desc": "name",
+    "resource_id": "name",
+    "class_name": "type",
+}
+UI_SELECTOR_BOOLEAN_ATTRIBUTES = {
+    "checkable": "checkable",
+    "checked": "checked",
+    "clickable": "clickable",
+    "enabled": "enabled",
+    "focusable": "focusable",
+    "focused": "focused",
+    "longClickable": "long-clickable",
+    "scrollable": "scrollable",
+    "selected": "selected",
+}
+
+
+class UiSelector:
+    """
+    Parsed UiSelector expression: attribute criteria, the selected instance and the selector of
+    the child to find in every match.
+    """
+
+    def __init__(self) -> None:
+        self.criteria: List[Tuple[str, UiSelectorArgument]] = []
+        self.instance: Optional[int] = None
+        self.child: Optional["UiSelector"] = None
+
+
+class SnapshotNode:
+    """
+    Single element of the page source snapshot.
+    """
+
+    def __init__(self, element: ET.Element, position: int, attributes: Dict[str, str]) -> None:
+        self.element = element
+        self.position = position
+        self.last_descendant_position = position
+        self.parent: Optional["SnapshotNode"] = None
+        self.children: List["SnapshotNode"] = []
+        self._attributes = attributes
+
+    def get_attribute(self, name: str) -> str:
+        return self.element.attrib.get(name, "")
+
+    @property
+    def text(self) -> str:
+        text = self.get_attribute(self._attributes["text"])
+        if not text and self._attributes is IOS_ATTRIBUTES:
+            text = self.get_attribute("label")
+        return text
+
+    @property
+    def content_desc(self) -> str:
+        return self.get_attribute(self._attributes["content_desc"])
+
+    @property
+    def resource_id(self) -> str:
+        return self.get_attribute(self._attributes["resource_id"])
+
+    @property
+    def class_name(self) -> str:
+        return self.get_attribute(self._attributes["class_name"]) or self.element.tag
+
+    @property
+    def displayed(self) -> bool:
+        attributes = self.element.attrib
+        return attributes.get("displayed", attributes.get("visible", "true")) == "true"
+
+    @property
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """
+        Bounds of the element as (left, top, right, bottom).
+        """
+        if "bounds" in self.element.attrib:
+            left, top, right, bottom = map(int, re.findall(r"-?\d+", self.get_attribute("bounds")))
+            return left, top, right, bottom
+        left, top = int(self.get_attribute("x") or 0), int(self.get_attribute("y") or 0)
+        return (
+            left,
+            top,
+            left + int(self.get_attribute("width") or 0),
+            top + int(self.get_attribute("height") or 0),
+        )
+
+    def contains(self, node: "SnapshotNode") -> bool:
+        return self.position < node.position <= self.last_descendant_position
+
+    def __repr__(self) -> str:
+        return f"<{self.class_name} desc={self.content_desc!r} text={self.text!r}>"
+
+
+class PageSnapshot:
+    """
+    Parsed page source of the current screen. Selectors are evaluated locally against the
+    snapshot, so many element reads cost a single page source request.
+
+    Supported strategies: accessibility id, id, class name, a subset of XPath and UiSelector
+    chains built from description, text, className, resourceId, boolean properties, index,
+    instance and childSelector.
+    """
+
+    def __init__(self, page_source: str, platform: str) -> None:
+        self.platform = platform
+        self._attributes = ANDROID_ATTRIBUTES if platform == "android" else IOS_ATTRIBUTES
+        self.root = ET.fromstring(page_source.encode("utf-8"))
+        self.nodes: List[SnapshotNode] = []
+        self._nodes_by_element: Dict[int, SnapshotNode] = {}
+        self.by_content_desc: Dict[str, List[SnapshotNode]] = {}
+        self.by_resource_id: Dict[str, List[SnapshotNode]] = {}
+        self.by_text: Dict[str, List[SnapshotNode]] = {}
+        self.by_class: Dict[str, List[SnapshotNode]] = {}
+        self._index(self.root, None)
+
+    def find_all(
+        self, selector: Tuple[str, str], parent: Optional[SnapshotNode] = None
+    ) -> List[SnapshotNode]:
+        """
+        Finds all nodes matching the selector.
+
+        :param selector: tuple (eg. AppiumBy.ACCESSIBILITY_ID, 'test-Item')
+        :param parent: node to search in, by default the whole screen
+        :return: list of matching nodes in document order
+        """
+        by, value = selector
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            return self._within(self.by_content_desc.get(value, []), parent)
+        if by == AppiumBy.ID:
+            return [
+                node
+                for node in self._within(self.nodes, parent)
+                if node.resource_id == value or node.resource_id.endswith(f":id/{value}")
+            ]
+        if by == AppiumBy.CLASS_NAME:
+            return self._within(self.by_class.get(value, []), parent)
+        if by == AppiumBy.XPATH:
+            return self._find_by_xpath(value, parent)
+        if by == AppiumBy.ANDROID_UIAUTOMATOR:
+            return self._find_by_ui_selector(parse_ui_selector(value), parent)
+        raise ValueError(f"Selector strategy {by} is not supported by page snapshot")
+
+    def find(
+        self, selector: Tuple[str, str], parent: Optional[SnapshotNode] = None
+    ) -> Optional[SnapshotNode]:
+        """
+        Finds the first node matching the selector.
+
+        :param selector: tuple (eg. AppiumBy.ACCESSIBILITY_ID, 'test-Item')
+        :param parent: node to search in, by default the whole screen
+        :return: the first matching node or None
+        """
+        nodes = self.find_all(selector, parent)
+        return nodes[0] if nodes else None
+
+    def _index(self, element: ET.Element, parent: Optional[SnapshotNode]) -> SnapshotNode:
+        node = SnapshotNode(element, len(self.nodes), self._attributes)
+        node.parent = parent
+        self.nodes.append(node)
+        self._nodes_by_element[id(element)] = node
+        for index, key in (
+            (self.by_content_desc, node.content_desc),
+            (self.by_resource_id, node.resource_id),
+            (self.by_text, node.text),
+            (self.by_class, node.class_name),
+        ):
+            if key:
+                index.setdefault(key, []).append(node)
+        for child in element:
+            node.children.append(self._index(child, node))
+        node.last_descendant_position = len(self.nodes) - 1
+        return node
+
+    @staticmethod
+    def _within(nodes: List[SnapshotNode], parent: Optional[SnapshotNode]) -> List[SnapshotNode]:
+        if parent is None:
+            return list(nodes)
+        return [node for node in nodes if parent.contains(node)]
+
+    def _find_by_xpath(self, xpath: str, parent: Optional[SnapshotNode]) -> List[SnapshotNode]:
+        context = parent.element if parent else self.root
+        if xpath.startswith("//"):
+            path = f".{xpath}"
+        elif xpath.startswith("/"):
+            context, path = self.root, f".{xpath[len(self.root.tag) + 1:]}"
+        else:
+            path = xpath
+        try:
+            elements = context.findall(path)
+        except SyntaxError as e:
+            raise ValueError(f"XPath {xpath} is not supported by page snapshot: {e}")
+        nodes = [self._nodes_by_element[id(element)] for element in elements]
+        return sorted(nodes, key=lambda node: node.position)
+
+    def _find_by_ui_selector(
+        self, ui_selector: UiSelector, parent: Optional[SnapshotNode]
+    ) -> List[SnapshotNode]:
+        criteria = ui_selector.criteria
+        matches = [
+            node
+            for node in self._candidates(criteria, parent)
+            if all(self._matches(node, method, argument) for method, argument in criteria)
+        ]
+        matches = self._select_instance(matches, ui_selector.instance)
+        if ui_selector.child is None:
+            return matches
+        found: List[SnapshotNode] = []
+        for match in matches:
+            for node in self._find_by_ui_selector(ui_selector.child, match):
+                if node not in found:
+                    found.append(node)
+        return found
+
+    def _candidates(
+        self, criteria: List[Tuple[str, UiSelectorArgument]], parent: Optional[SnapshotNode]
+    ) -> List[SnapshotNode]:
+        indexes = {
+            "description": self.by_content_desc,
+            "text": self.by_text,
+            "className": self.by_class,
+            "resourceId": self.by_resource_id,
+        }
+        for method, argument in criteria:
+            if method in indexes:
+                return self._within(indexes[method].get(str(argument), []), parent)
+        return self._within(self.nodes[1:], parent)
+
+    @staticmethod
+    def _select_instance(nodes: List[SnapshotNode], instance: Optional[int]) -> List[SnapshotNode]:
+        if instance is None:
+            return nodes
+        return nodes[instance:][:1]
+
+    @staticmethod
+    def _matches(node: SnapshotNode, method: str, argument: UiSelectorArgument) -> bool:
+        value = {
+            "description": node.content_desc,
+            "text": node.text,
+            "className": node.class_name,
+            "resourceId": node.resource_id,
+        }
+        if method in value:
+            return value[method] == argument
+        if method.endswith("Contains") and method[: -len("Contains")] in value:
+            return str(argument) in value[method[: -len("Contains")]]
+        if method.endswith("StartsWith") and method[: -len("StartsWith")] in value:
+            return value[method[: -len("StartsWith")]].startswith(str(argument))
+        if method.endswith("Matches") and method[: -len("Matches")] in value:
+            return re.fullmatch(str(argument), value[method[: -len("Matches")]]) is not None
+        if method in UI_SELECTOR_BOOLEAN_ATTRIBUTES:
+            attribute = node.get_attribute(UI_SELECTOR_BOOLEAN_ATTRIBUTES[method])
+            return attribute == str(argument).lower()
+        if method == "index":
+            return node.get_attribute("index") == str(argument)
+        raise ValueError(f"UiSelector method {method} is not supported by page snapshot")
+
+
+def parse_ui_selector(expression: str) -> UiSelector:
+    """
+    Parses UiSelector expression, eg. 'new UiSelector().description("test-Item")'.
+
+    :param expression: UiSelector expression
+    :return: UiSelector with the criteria, instance and child selector
+    """
+    ui_selector, position = _parse_ui_selector(expression.strip(), 0)
+    if expression.strip()[position:].strip(" ;"):
+        raise ValueError(f"Unexpected content in UiSelector {expression}")
+    return ui_selector
+
+
+def _parse_ui_selector(expression: str, position: int) -> Tuple[UiSelector, int]:
+    prefix = re.compile(r"\s*new\s+UiSelector\s*\(\s*\)").match(expression, position)
+    if not prefix:
+        raise ValueError(f"Only UiSelector expressions are supported, got {expression}")
+    position = prefix.end()
+    ui_selector = UiSelector()
+    method_pattern = re.compile(r"\s*\.\s*(\w+)\s*\(")
+    while True:
+        method = method_pattern.match(expression, position)
+        if not method:
+            return ui_selector, position
+        name, position = method.group(1), method.end()
+        if name == "childSelector":
+            ui_selector.child, position = _parse_ui_selector(expression, position)
+        else:
+            argument, position = _parse_literal(expression, position)
+            if name == "instance":
+                if not isinstance(argument, int) or isinstance(argument, bool):
+                    raise ValueError(f"instance expects a number in {expression}")
+                ui_selector.instance = argument
+            else:
+                ui_selector.criteria.append((name, argument))
+        closing = re.compile(r"\s*\)").match(expression, position)
+        if not closing:
+            raise ValueError(f"Missing ')' after {name} in {expression}")
+        position = closing.end()
+
+
+def _parse_literal(expression: str, position: int) -> Tuple[UiSelectorArgument, int]:
+    string = re.compile(r'\s*"((?:[^"\\]|\\.)*)"').match(expression, position)
+    if string:
+        return re.sub(r"\\(.)", r"\1", string.group(1)), string.end()
+    number = re.compile(r"\s*(-?\d+)").match(expression, position)
+    if number:
+        return int(number.group(1)), number.end()
+    boolean = re.compile(r"\s*(true|false)").match(expression, position)
+    if boolean:
+        return boolean.group(1) == "true", boolean.end()
+    raise ValueError(f"Unsupported argument at position {position} in {expression}")
@@ -0,0 +1,192 @@
+"""
+Runs the test suite in parallel on several devices.
+
+Every worker gets its own copy of the configuration with a device udid, an Appium server url and
+unique driver ports, runs its shard of test modules in a separate pytest process and writes
+allure results to its own directory. When all workers finish the results are merged into one
+allure results directory.
+
+Usage: python -m utils.parallel_runner --workers 3 --remote http://localhost:4723 --alluredir out
+"""
+
+import argparse
+import json
+import logging as log
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import coloredlogs
+from adbutils import adb
+
+from utils.file_manager import load_config_from_json
+
+ROOT_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+TESTS_DIRECTORY = os.path.join(ROOT_PATH, "tests")
+SYSTEM_PORT_BASE = 8200
+WDA_LOCAL_PORT_BASE = 8100
+MJPEG_SERVER_PORT_BASE = 9100
+
+
+def discover_devices(platform: str) -> List[str]:
+    """
+    Finds udids of connected devices which are ready for testing.
+
+    :param platform: android or ios
+    :return: list of device udids
+    """
+    if platform == "android":
+        return [device.serial for device in adb.device_list()]
+    output = subprocess.run(
+        ["xcrun", "simctl", "list", "devices", "booted", "--json"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    runtimes = json.loads(output)["devices"].values()
+    return [device["udid"] for devices in runtimes for device in devices]
+
+
+def build_worker_config(base_config: dict, worker_index: int, udid: str, remote: str) -> dict:
+    """
+    Builds configuration for a single worker, ports are shifted by the worker index so sessions
+    on the same Appium server do not collide.
+
+    :param base_config: configuration loaded from CONFIG_FILE
+    :param worker_index: index of the worker
+    :param udid: udid of the device assigned to the worker
+    :param remote: url of the Appium server assigned to the worker
+    :return: worker configuration
+    """
+    worker_config = dict(base_config)
+    worker_config.update(
+        {
+            "udid": udid,
+            "remote": remote,
+            "systemPort": SYSTEM_PORT_BASE + worker_index,
+            "wdaLocalPort": WDA_LOCAL_PORT_BASE + worker_index,
+            "mjpegServerPort": MJPEG_SERVER_PORT_BASE + worker_index,
+        }
+    )
+    return worker_config
+
+
+def collect_test_modules(tests_directory: str = TESTS_DIRECTORY) -> Dict[str, int]:
+    """
+    Collects test modules with their estimated cost. The cost is the number of test methods plus
+    one for the class setup.
+
+    :param tests_directory: directory with test modules
+    :return: dictionary with module paths and their costs
+    """
+    modules = {}
+    for file_name in sorted(os.listdir(tests_directory)):
+        if file_name.startswith("test_") and file_name.endswith(".py"):
+            path = os.path.join(tests_directory, file_name)
+            with open(path, "r") as f:
+                modules[path] = len(re.findall(r"^\s+def test_", f.read(), re.MULTILINE)) + 1
+    return modules
+
+
+def shard_test_modules(modules: Dict[str, int], workers: int) -> List[List[str]]:
+    """
+    Spreads test modules across workers, the most expensive module always goes to the worker
+    with the lowest total cost so far.
+
+    :param modules: dictionary with module paths and their costs
+    :param workers: number of workers
+    :return: list of module paths for every worker
+    """
+    shards: List[List[str]] = [[] for _ in range(workers)]
+    costs = [0] * workers
+    for module, cost in sorted(modules.items(), key=lambda item: item[1], reverse=True):
+        worker_index = costs.index(min(costs))
+        shards[worker_index].append(module)
+        costs[worker_index] += cost
+    return shards
+
+
+def merge_allure_results(worker_directories: List[str], alluredir: str) -> None:
+    """
+    Copies allure results of all workers into one directory.
+
+    :param worker_directories: allure results directories of the workers
+    :param alluredir: target allure results directory
+    """
+    os.makedirs(alluredir, exist_ok=True)
+    for worker_directory in worker_directories:
+        if not os.path.isdir(worker_directory):
+            continue
+        for file_name in os.listdir(worker_directory):
+            shutil.copy2(os.path.join(worker_directory, file_name), alluredir)
+    log.info(f"Allure results merged into {alluredir}")
+
+
+def run_in_parallel(
+    workers: Optional[int],
+    remotes: List[str],
+    alluredir: str,
+    udids: Optional[List[str]] = None,
+    pytest_args: Optional[List[str]] = None,
+) -> int:
+    """
+    Runs the suite sharded across devices and merges allure results.
+
+    :param workers: maximum number of workers, by default one worker per available device
+    :param remotes: Appium server urls, assigned to workers in turn
+    :param alluredir: directory for merged allure results
+    :param udids: devices to use, discovered automatically when not provided
+    :param pytest_args: additional pytest arguments
+    :return: exit code, non-zero if any worker failed
+    """
+    base_config = load_config_from_json(os.getenv("CONFIG_FILE", "android_config.json"))
+    platform = os.getenv("PLATFORM", base_config["platformName"].lower())
+    udids = (udids or discover_devices(platform))[:workers]
+    assert udids, f"No {platform} devices found"
+    shards = [shard for shard in shard_test_modules(collect_test_modules(), len(udids)) if shard]
+    work_directory = tempfile.mkdtemp(prefix="parallel_run_")
+    processes, worker_directories = [], []
+    for worker_index, (udid, shard) in enumerate(zip(udids, shards)):
+        worker_config = build_worker_config(
+            base_config, worker_index, udid, remotes[worker_index % len(remotes)]
+        )
+        config_path = os.path.join(work_directory, f"worker_{worker_index}_config.json")
+        with open(config_path, "w") as f:
+            json.dump(worker_config, f, indent=2)
+        worker_alluredir = os.path.join(work_directory, f"worker_{worker_index}_allure")
+        worker_directories.append(worker_alluredir)
+        log.info(f"Worker {worker_index} on {udid}: {[os.path.basename(m) for m in shard]}")
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "pytest", *shard, f"--alluredir={worker_alluredir}"]
+                + (pytest_args or []),
+                cwd=ROOT_PATH,
+                env={**os.environ, "CONFIG_FILE": config_path},
+            )
+        )
+    exit_codes = [process.wait() for process in processes]
+    merge_allure_results(worker_directories, alluredir)
+    shutil.rmtree(work_directory, ignore_errors=True)
+    return max(exit_codes)
+
+
+def main() -> None:
+    coloredlogs.install()
+    parser = argparse.ArgumentParser(description="Run tests in parallel on several devices")
+    parser.add_argument("--workers", type=int, help="Maximum number of workers")
+    parser.add_argument("--remote", action="append", help="Appium server url, can be repeated")
+    parser.add_argument("--udid", action="append", help="Device udid, can be repeated")
+    parser.add_argument("--alluredir", default=os.path.join(ROOT_PATH, "allure-results"))
+    args, pytest_args = parser.parse_known_args()
+    remotes = args.remote or [
+        load_config_from_json(os.getenv("CONFIG_FILE", "android_config.json"))["remote"]
+    ]
+    sys.exit(run_in_parallel(args.workers, remotes, args.alluredir, args.udid, pytest_args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import logging as log
+import os
+import time
+from typing import Callable, Dict, Literal, Optional, cast
+
+import allure
+from appium import webdriver
+
+from utils.adb_commands import adb_commands_for
+from utils.element_cache import element_cache_for
+
+ResetStrategy = Literal["none", "terminate", "clear", "reinstall"]
+DEFAULT_STRATEGIES: Dict[str, ResetStrategy] = {"android": "clear", "ios": "terminate"}
+
+
+def app_id_for(driver: webdriver, config_file: dict) -> str:
+    """
+    Gets the package (Android) or bundle id (iOS) of the application under test.
+
+    :param driver: driver with the application under test
+    :param config_file: Dictionary with test configuration.
+    :return: application id
+    """
+    if config_file["platformName"].lower() == "android":
+        return config_file["appPackage"]
+    bundle_id = config_file.get("bundleId") or driver.capabilities.get("bundleId")
+    assert (
+        bundle_id
+    ), 'Bundle id of the application is unknown, set "bundleId" in the iOS configuration'
+    return bundle_id
+
+
+def default_strategy(config_file: dict) -> ResetStrategy:
+    """
+    Gets the reset strategy used between test classes unless the class chooses its own: the
+    RESET_STRATEGY environment variable, "resetStrategy" from the configuration, otherwise clear
+    on Android and terminate on iOS.
+
+    :param config_file: Dictionary with test configuration.
+    :return: name of the strategy
+    """
+    platform = config_file["platformName"].lower()
+    return parse_reset_strategy(
+        os.getenv("RESET_STRATEGY")
+        or config_file.get("resetStrategy")
+        or DEFAULT_STRATEGIES.get(platform, "terminate")
+    )
+
+
+def _terminate(driver: webdriver, config_file: dict, app_id: str, app_dir: Optional[str]) -> None:
+    driver.terminate_app(app_id)
+    driver.activate_app(app_id)
+
+
+def _clear(driver: webdriver, config_file: dict, app_id: str, app_dir: Optional[str]) -> None:
+    if config_file["platformName"].lower() != "android":
+        log.info("Clearing app data is not supported on iOS, the app is reinstalled instead")
+        _reinstall(driver, config_file, app_id, app_dir)
+        return
+    adb_commands_for(driver).clear_app(app_id)
+    driver.activate_app(app_id)
+
+
+def _reinstall(driver: webdriver, config_file: dict, app_id: str, app_dir: Optional[str]) -> None:
+    assert app_dir is not None, "Application directory is required to reinstall the app"
+    driver.remove_app(app_id)
+    driver.install_app(os.path.join(app_dir, config_file["app"]))
+    driver.activate_app(app_id)
+
+
+STRATEGIES: Dict[str, Callable[[webdriver, dict, str, Optional[str]], None]] = {
+    "terminate": _terminate,
+    "clear": _clear,
+    "reinstall": _reinstall,
+}
+
+
+def parse_reset_strategy(value: str) -> ResetStrategy:
+    """
+    Checks the name of a reset strategy read from the environment or the configuration.
+
+    :param value: name of the strategy
+    :return: name of the strategy
+    """
+    allowed = ["none", *STRATEGIES]
+    assert value in allowed, f"Unknown reset strategy {value!r}, use one of: {', '.join(allowed)}"
+    return cast(ResetStrategy, value)
+
+
+def reset_app(
+    driver: webdriver,
+    config_file: dict,
+    strategy: ResetStrategy,
+    app_dir: Optional[str] = None,
+    report_step: bool = True,
+) -> float:
+    """
+    Resets the application on a live session, strategies from the cheapest:
+    none - nothing is done, the next test continues where the previous one stopped,
+    terminate - the app is terminated and activated again, its data is kept,
+    clear - the app data is cleared and the app activated again (Android only, reinstall on iOS),
+    reinstall - the app is removed, installed from the application directory and activated.
+
+    :param driver: driver with the application under test
+    :param config_file: Dictionary with test configuration.
+    :param strategy: name of the strategy
+    :param app_dir: Path to directory with test applications, required to reinstall.
+    :param report_step: False to skip the allure step, eg. on the pre-warm thread
+    :return: time the reset took in seconds
+    """
+    if parse_reset_strategy(strategy) == "none":
+        return 0.0
+    if not report_step:
+        return _reset_app(driver, config_file, strategy, app_dir)
+    with allure.step(f"Reset application: {strategy}"):
+        return _reset_app(driver, config_file, strategy, app_dir)
+
+
+def _reset_app(
+    driver: webdriver, config_file: dict, strategy: ResetStrategy, app_dir: Optional[str]
+) -> float:
+    app_id = app_id_for(driver, config_file)
+    started = time.perf_counter()
+    STRATEGIES[strategy](driver, config_file, app_id, app_dir)
+    element_cache_for(driver).next_generation()
+    seconds = time.perf_counter() - started
+    log.info(f"Application {app_id} reset with {strategy} strategy in {seconds:.2f} s")
+    return seconds
@@ -0,0 +1,315 @@
+"""
+Audits SELECTORS tables of all page objects.
+
+Every selector is checked for slow strategies (XPath, chained UiSelector), empty or missing
+platform entries and templates. Selectors are timed against a live Appium session or against a
+recorded page source, and a faster equivalent is suggested when one can be derived. With a page
+source the suggestion is verified to match the same elements as the original selector.
+
+Usage:
+    python -m utils.selector_audit --platform android --page-source dashboard.xml
+    python -m utils.selector_audit --live --json audit.json
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import logging as log
+import os
+import pkgutil
+import re
+import statistics
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import coloredlogs
+from appium import webdriver
+from appium.webdriver.common.appiumby import AppiumBy
+
+import page_objects
+from utils.file_manager import load_config_from_json
+from utils.page_snapshot import PageSnapshot, parse_ui_selector
+
+PLATFORMS = ("android", "ios")
+STRATEGY_COSTS = {
+    AppiumBy.ACCESSIBILITY_ID: 0,
+    AppiumBy.ID: 0,
+    AppiumBy.CLASS_NAME: 1,
+    AppiumBy.ANDROID_UIAUTOMATOR: 1,
+    AppiumBy.IOS_PREDICATE: 1,
+    AppiumBy.IOS_CLASS_CHAIN: 1,
+    AppiumBy.XPATH: 3,
+}
+XPATH_SUGGESTIONS = [
+    (re.compile(r"^//([\w.]+)$"), lambda value: (AppiumBy.CLASS_NAME, value)),
+    (
+        re.compile(r"""^//\*\[@(?:content-desc|name)=["']([^"']+)["']\]$"""),
+        lambda value: (AppiumBy.ACCESSIBILITY_ID, value),
+    ),
+    (
+        re.compile(r"""^//\*\[@resource-id=["']([^"']+)["']\]$"""),
+        lambda value: (AppiumBy.ID, value),
+    ),
+    (
+        re.compile(r"""^//\*\[@text=["']([^"']+)["']\]$"""),
+        lambda value: (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{value}")'),
+    ),
+]
+
+
+class SelectorAuditEntry:
+    """
+    Audit result of a single selector of one page object on one platform.
+    """
+
+    def __init__(
+        self, page: str, name: str, platform: str, selector: Optional[Tuple[str, str]]
+    ) -> None:
+        self.page = page
+        self.name = name
+        self.platform = platform
+        self.selector = selector
+        self.findings: List[str] = []
+        self.suggestion: Optional[Tuple[str, str]] = None
+        self.suggestion_verified: Optional[bool] = None
+        self.lookup_ms: Optional[float] = None
+        self.suggestion_lookup_ms: Optional[float] = None
+        self.matches: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "page": self.page,
+            "name": self.name,
+            "platform": self.platform,
+            "selector": list(self.selector) if self.selector else None,
+            "findings": self.findings,
+            "suggestion": list(self.suggestion) if self.suggestion else None,
+            "suggestion_verified": self.suggestion_verified,
+            "lookup_ms": self.lookup_ms,
+            "suggestion_lookup_ms": self.suggestion_lookup_ms,
+            "matches": self.matches,
+        }
+
+    def __str__(self) -> str:
+        line = f"{self.page}.{self.name} [{self.platform}] {self.selector}"
+        if self.lookup_ms is not None:
+            line += f" {self.lookup_ms:.1f} ms, {self.matches} match(es)"
+        if self.findings:
+            line += f" - {', '.join(self.findings)}"
+        if self.suggestion:
+            line += f"\n    suggested: {self.suggestion}"
+            if self.suggestion_lookup_ms is not None:
+                line += f" {self.suggestion_lookup_ms:.1f} ms"
+            if self.suggestion_verified is not None:
+                line += " (verified)" if self.suggestion_verified else " (NOT equivalent)"
+        return line
+
+
+def collect_page_selectors() -> Iterator[Tuple[str, str, Dict[str, Tuple[str, str]]]]:
+    """
+    Walks all page object modules and yields their selectors.
+
+    :return: iterator of (page class name, selector name, platform selectors) tuples
+    """
+    for module_info in pkgutil.iter_modules(page_objects.__path__):
+        module = importlib.import_module(f"page_objects.{module_info.name}")
+        for page_name, page_class in inspect.getmembers(module, inspect.isclass):
+            if page_class.__module__ != module.__name__ or "SELECTORS" not in vars(page_class):
+                continue
+            for name, platform_selectors in vars(page_class)["SELECTORS"].items():
+                yield page_name, name, platform_selectors
+
+
+def suggest_selector(selector: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Derives a faster equivalent of the selector.
+
+    :param selector: tuple (eg. AppiumBy.XPATH, '//android.widget.TextView')
+    :return: faster selector or None when no equivalent is known
+    """
+    by, value = selector
+    if by == AppiumBy.XPATH:
+        for pattern, build in XPATH_SUGGESTIONS:
+            match = pattern.match(value)
+            if match:
+                return build(match.group(1))
+    if by == AppiumBy.ANDROID_UIAUTOMATOR and "%" not in value:
+        try:
+            ui_selector = parse_ui_selector(value)
+        except ValueError:
+            return None
+        if ui_selector.instance is not None or ui_selector.child is not None:
+            return None
+        calls = ui_selector.criteria
+        if len(calls) == 1 and calls[0][0] == "description":
+            return AppiumBy.ACCESSIBILITY_ID, str(calls[0][1])
+        if len(calls) == 1 and calls[0][0] == "resourceId":
+            return AppiumBy.ID, str(calls[0][1])
+    return None
+
+
+def check_selector(entry: SelectorAuditEntry) -> None:
+    """
+    Adds static findings and a suggestion to the audit entry.
+
+    :param entry: audited selector
+    """
+    if entry.selector is None:
+        entry.findings.append("missing platform entry")
+        return
+    by, value = entry.selector
+    if not value:
+        entry.findings.append("empty selector")
+        return
+    if by == AppiumBy.XPATH:
+        entry.findings.append("slow strategy: XPath serializes the whole hierarchy")
+    if by == AppiumBy.ANDROID_UIAUTOMATOR and "childSelector" in value:
+        entry.findings.append("chained UiSelector")
+    if "%" in value:
+        entry.findings.append("template, not timed")
+    entry.suggestion = suggest_selector(entry.selector)
+
+
+def time_on_session(
+    driver: webdriver, selector: Tuple[str, str], repeat: int
+) -> Tuple[float, int]:
+    """
+    Times find_elements on the live session. The implicit wait has to be switched off before.
+
+    :param driver: Appium driver
+    :param selector: tuple (eg. AppiumBy.ACCESSIBILITY_ID, 'test-Cart')
+    :param repeat: number of lookups, the median is reported
+    :return: (median lookup time in milliseconds, number of matches)
+    """
+    durations = []
+    matches = 0
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        matches = len(driver.find_elements(*selector))
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(durations), matches
+
+
+def time_on_snapshot(
+    snapshot: PageSnapshot, selector: Tuple[str, str], repeat: int
+) -> Tuple[float, List]:
+    """
+    Times selector evaluation against a recorded page source.
+
+    :param snapshot: parsed page source
+    :param selector: tuple (eg. AppiumBy.ACCESSIBILITY_ID, 'test-Cart')
+    :param repeat: number of lookups, the median is reported
+    :return: (median lookup time in milliseconds, matching nodes)
+    """
+    durations = []
+    nodes: List = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        nodes = snapshot.find_all(selector)
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(durations), nodes
+
+
+def audit_selectors(
+    platforms: Tuple[str, ...] = PLATFORMS,
+    driver: Optional[webdriver] = None,
+    snapshot: Optional[PageSnapshot] = None,
+    repeat: int = 3,
+) -> List[SelectorAuditEntry]:
+    """
+    Audits selectors of all page objects, optionally timing them on a session or a snapshot.
+
+    :param platforms: platforms to audit
+    :param driver: Appium driver of a live session, times selectors of its platform
+    :param snapshot: parsed page source, times selectors of its platform
+    :param repeat: number of timed lookups per selector
+    :return: audit entries sorted from the slowest
+    """
+    entries = []
+    for page, name, platform_selectors in collect_page_selectors():
+        for platform in platforms:
+            entry = SelectorAuditEntry(page, name, platform, platform_selectors.get(platform))
+            check_selector(entry)
+            entries.append(entry)
+            timed = entry.selector and entry.selector[1] and "%" not in entry.selector[1]
+            if not timed:
+                continue
+            if driver and driver.capabilities.get("platformName", "").lower() == platform:
+                entry.lookup_ms, entry.matches = time_on_session(driver, entry.selector, repeat)
+                if entry.suggestion:
+                    entry.suggestion_lookup_ms, _ = time_on_session(
+                        driver, entry.suggestion, repeat
+                    )
+            elif snapshot and snapshot.platform == platform:
+                _time_entry_on_snapshot(entry, snapshot, repeat)
+    return sorted(
+        entries,
+        key=lambda entry: (
+            -(entry.lookup_ms or 0),
+            -STRATEGY_COSTS.get(entry.selector[0] if entry.selector else "", 0),
+        ),
+    )
+
+
+def _time_entry_on_snapshot(
+    entry: SelectorAuditEntry, snapshot: PageSnapshot, repeat: int
+) -> None:
+    try:
+        entry.lookup_ms, nodes = time_on_snapshot(snapshot, entry.selector, repeat)
+    except ValueError as e:
+        entry.findings.append(f"not evaluated: {e}")
+        return
+    entry.matches = len(nodes)
+    if entry.suggestion:
+        entry.suggestion_lookup_ms, suggested_nodes = time_on_snapshot(
+            snapshot, entry.suggestion, repeat
+        )
+        entry.suggestion_verified = suggested_nodes == nodes
+
+
+def main() -> None:
+    coloredlogs.install()
+    parser = argparse.ArgumentParser(description="Audit page object selectors")
+    parser.add_argument("--platform", choices=PLATFORMS, action="append")
+    parser.add_argument("--page-source", help="Recorded page source XML to time selectors on")
+    parser.add_argument("--live", action="store_true", help="Time selectors on a new session")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the report to the JSON file")
+    args = parser.parse_args()
+    config = load_config_from_json(os.getenv("CONFIG_FILE", "android_config.json"))
+    platforms = tuple(args.platform or [config["platformName"].lower()])
+
+    snapshot = None
+    if args.page_source:
+        with open(args.page_source, encoding="utf-8") as page_source:
+            snapshot = PageSnapshot(page_source.read(), platforms[0])
+    driver = None
+    if args.live:
+        from utils.create_driver import start_driver
+
+        root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        driver = start_driver(
+            config, os.getenv("APP_DIRECTORY", os.path.join(root_path, "test_apps"))
+        )
+        driver.implicitly_wait(0)
+    try:
+        entries = audit_selectors(platforms, driver, snapshot, args.repeat)
+    finally:
+        if driver:
+            driver.quit()
+
+    for entry in entries:
+        if entry.findings or entry.suggestion or entry.lookup_ms is not None:
+            log.info(entry)
+    flagged = [entry for entry in entries if entry.findings or entry.suggestion]
+    log.info(f"{len(flagged)} of {len(entries)} selectors flagged")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report:
+            json.dump([entry.to_dict() for entry in entries], report, indent=2)
+    sys.exit(1 if any(entry.suggestion for entry in entries) else 0)
+
+
+if __name__ == "__main__":
+    main()
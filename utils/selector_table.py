@@ -0,0 +1,62 @@
+from typing import Dict, Tuple, Union
+
+SelectorsDict = Dict[str, Dict[str, Tuple[str, str]]]
+
+
+class SelectorTable:
+    """
+    Selectors of one page object compiled for a single platform. Lookups are a single dict
+    access and templated selectors (values with '%s') are formatted once per argument.
+    """
+
+    def __init__(self, owner: str, selectors: SelectorsDict, platform: str) -> None:
+        self.owner = owner
+        self.platform = platform
+        self._selectors: Dict[str, Tuple[str, str]] = {
+            name: platforms[platform]
+            for name, platforms in selectors.items()
+            if platform in platforms
+        }
+        self._formatted: Dict[Tuple[str, Tuple[Union[str, int], ...]], Tuple[str, str]] = {}
+
+    def __getitem__(self, name: str) -> Tuple[str, str]:
+        try:
+            return self._selectors[name]
+        except KeyError:
+            raise KeyError(f"{self.owner} has no {self.platform} selector {name}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._selectors
+
+    def format(self, name: str, *args: Union[str, int]) -> Tuple[str, str]:
+        """
+        Fills in the templated selector value, eg. 'new UiSelector().text("%s")'.
+
+        :param name: selector name
+        :param args: values of the template placeholders
+        :return: tuple (eg. AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("Tax")')
+        """
+        key = (name, args)
+        if key not in self._formatted:
+            by, value = self[name]
+            self._formatted[key] = (by, value % args)
+        return self._formatted[key]
+
+
+_SELECTOR_TABLES: Dict[Tuple[type, str], SelectorTable] = {}
+
+
+def selector_table_for(page_class: type, platform: str) -> SelectorTable:
+    """
+    Gets the compiled selectors of the page object class, compiling them on first use.
+
+    :param page_class: page object class with SELECTORS dictionary
+    :param platform: platform name, android or ios
+    :return: SelectorTable shared by all instances of the class
+    """
+    key = (page_class, platform)
+    if key not in _SELECTOR_TABLES:
+        _SELECTOR_TABLES[key] = SelectorTable(
+            page_class.__name__, getattr(page_class, "SELECTORS"), platform
+        )
+    return _SELECTOR_TABLES[key]
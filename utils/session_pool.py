@@ -0,0 +1,239 @@
+import atexit
+import logging as log
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import allure
+from appium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from utils.create_driver import create_driver, start_driver
+from utils.reset_strategies import ResetStrategy, default_strategy, reset_app
+
+SessionKey = Tuple[str, str, str, str]
+
+
+class SessionPool:
+    """
+    Keeps Appium sessions alive between test classes. A class acquires a driver in setUpClass and
+    releases it in tearDownClass; released sessions are reset cheaply and handed out again to the
+    next class with the same configuration and device. All sessions are quit at the end of the run.
+
+    Sessions can also be pre-warmed: while a class runs on one device, the session for the next
+    class is prepared on a background thread on one of the spare devices from the configuration.
+    """
+
+    def __init__(self) -> None:
+        self._idle: Dict[SessionKey, List[webdriver]] = {}
+        self._in_use: Dict[int, SessionKey] = {}
+        self._warming: Dict[SessionKey, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-prewarm")
+        # Test classes which have not acquired a session yet, None when the run plan is unknown.
+        self._classes_left: Optional[int] = None
+
+    @staticmethod
+    def session_key(config_file: dict) -> SessionKey:
+        """
+        Builds the key under which sessions for the given configuration are pooled.
+
+        :param config_file: Dictionary with test configuration.
+        :return: tuple of remote url, platform, device and application
+        """
+        return (
+            config_file["remote"],
+            config_file["platformName"].lower(),
+            config_file.get("udid") or config_file["deviceName"],
+            config_file["app"],
+        )
+
+    @staticmethod
+    def device_configs(config_file: dict) -> List[dict]:
+        """
+        Lists configurations of all devices sessions can be pre-warmed on: the configured device
+        followed by the "spareDevices" entries, which override e.g. udid, remote and systemPort.
+
+        :param config_file: Dictionary with test configuration.
+        :return: list of configurations, one per device
+        """
+        return [config_file] + [
+            {**config_file, **spare_device} for spare_device in config_file.get("spareDevices", [])
+        ]
+
+    def plan_classes(self, count: int) -> None:
+        """
+        Sets the number of test classes the run will acquire sessions for, so that no session is
+        pre-warmed after the last class. Called from the pytest collection hook in conftest.py.
+
+        :param count: number of collected test classes
+        """
+        with self._lock:
+            self._classes_left = count
+
+    @allure.step("Acquire appium driver from session pool")
+    def acquire(
+        self, config_file: dict, app_dir: str, reset_strategy: Optional[ResetStrategy] = None
+    ) -> webdriver:
+        """
+        Hands out a live driver for the configuration. A pre-warmed session is preferred, then an
+        idle session which passes the health check, otherwise a new session is created. Reused
+        sessions are reset with the strategy; pre-warmed sessions are reset with the default
+        strategy in the background and once more only when the class asks for another one.
+
+        :param config_file: Dictionary with test configuration.
+        :param app_dir: Path to directory with test applications.
+        :param reset_strategy: reset of a reused session, the configured default when not given
+        :return: Appium driver.
+        """
+        with self._lock:
+            if self._classes_left:
+                self._classes_left -= 1
+        strategy = reset_strategy or default_strategy(config_file)
+        driver = self._take_warm_session(config_file)
+        if driver is not None:
+            if strategy not in ("none", default_strategy(config_file)):
+                reset_app(driver, config_file, strategy, app_dir)
+            return driver
+        key = self.session_key(config_file)
+        driver = self._reuse_idle_session(key, config_file, app_dir, strategy, report_step=True)
+        if driver is None:
+            driver = create_driver(config_file, app_dir)
+        self._mark_in_use(driver, key)
+        return driver
+
+    def prewarm(self, config_file: dict, app_dir: str) -> None:
+        """
+        Starts preparing a session for the next test class on a background thread. The first
+        device which is neither in use nor already warming is picked; its idle session is reset
+        or a new session is created. Nothing is prepared when the last planned class is running.
+
+        :param config_file: Dictionary with test configuration.
+        :param app_dir: Path to directory with test applications.
+        """
+        with self._lock:
+            if self._classes_left == 0:
+                log.info("No test class left to run, the next session is not pre-warmed")
+                return
+            busy = set(self._in_use.values()) | set(self._warming)
+            free = [c for c in self.device_configs(config_file) if self.session_key(c) not in busy]
+            if not free:
+                log.info("No free device to pre-warm the next session on")
+                return
+            key = self.session_key(free[0])
+            self._warming[key] = self._executor.submit(self._prepare_session, free[0], app_dir)
+        log.info(f"Pre-warming appium session for {key}")
+
+    def release(self, driver: webdriver, keep_alive: bool = True) -> None:
+        """
+        Returns the driver to the pool, the session stays alive until close_all is called.
+
+        :param driver: driver previously handed out by acquire
+        :param keep_alive: False to quit the session instead of keeping it for reuse
+        """
+        with self._lock:
+            key = self._in_use.pop(id(driver), None)
+            if key is None:
+                log.warning(f"Session {driver.session_id} was not acquired from the pool")
+                return
+            if keep_alive:
+                self._idle.setdefault(key, []).append(driver)
+        if keep_alive:
+            log.info(f"Appium session {driver.session_id} returned to the pool")
+        else:
+            self._quit(driver)
+
+    def close_all(self) -> None:
+        """
+        Quits every session owned by the pool, including sessions which are still warming.
+        """
+        with self._lock:
+            warming = list(self._warming.values())
+            self._warming.clear()
+        for future in warming:
+            if future.exception() is None:
+                self._quit(future.result())
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+            self._in_use.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+    @staticmethod
+    def is_healthy(driver: webdriver) -> bool:
+        """
+        Checks if the session is still alive on the Appium server with one lightweight command.
+
+        :param driver: driver to check
+        :return: True if the session responds, False otherwise
+        """
+        if not driver.session_id:
+            return False
+        try:
+            driver.timeouts
+        except WebDriverException as e:
+            log.warning(f"Appium session {driver.session_id} failed health check: {e}")
+            return False
+        return True
+
+    def _reuse_idle_session(
+        self,
+        key: SessionKey,
+        config_file: dict,
+        app_dir: str,
+        strategy: ResetStrategy,
+        report_step: bool,
+    ) -> Optional[webdriver]:
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                return None
+            if self.is_healthy(driver):
+                log.info(f"Reusing appium session {driver.session_id} for {key}")
+                reset_app(driver, config_file, strategy, app_dir, report_step=report_step)
+                return driver
+            self._quit(driver)
+
+    def _prepare_session(self, config_file: dict, app_dir: str) -> webdriver:
+        # Runs on the pre-warm thread, allure steps are not reported from here because the allure
+        # lifecycle of the running test is not thread safe.
+        key = self.session_key(config_file)
+        driver = self._reuse_idle_session(
+            key, config_file, app_dir, default_strategy(config_file), report_step=False
+        )
+        return driver or start_driver(config_file, app_dir)
+
+    def _take_warm_session(self, config_file: dict) -> Optional[webdriver]:
+        for device_config in self.device_configs(config_file):
+            key = self.session_key(device_config)
+            with self._lock:
+                future = self._warming.pop(key, None)
+            if future is None:
+                continue
+            try:
+                driver = future.result()
+            except Exception as e:
+                log.warning(f"Pre-warming appium session for {key} failed: {e}")
+                continue
+            log.info(f"Using pre-warmed appium session {driver.session_id} for {key}")
+            self._mark_in_use(driver, key)
+            return driver
+        return None
+
+    def _mark_in_use(self, driver: webdriver, key: SessionKey) -> None:
+        with self._lock:
+            self._in_use[id(driver)] = key
+
+    @staticmethod
+    def _quit(driver: webdriver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            log.warning(f"Could not quit appium session {driver.session_id}: {e}")
+
+
+SESSION_POOL = SessionPool()
+atexit.register(SESSION_POOL.close_all)
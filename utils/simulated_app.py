@@ -0,0 +1,511 @@
+"""
+Model of the Swag Labs sample application used by the simulated driver.
+
+The model keeps the state of the app (current screen, text fields, cart, sorting, view mode)
+and renders the current screen as a UiAutomator2 like page source with the same accessibility
+ids and texts as the real Android app. Every rendered node carries a stable sim-key attribute
+identifying it across renders, interactive nodes carry the sim-action performed when they are
+tapped.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+TEXT_VIEW = "android.widget.TextView"
+EDIT_TEXT = "android.widget.EditText"
+VIEW_GROUP = "android.view.ViewGroup"
+SCROLL_VIEW = "android.widget.ScrollView"
+FRAME_LAYOUT = "android.widget.FrameLayout"
+
+PASSWORD = "secret_sauce"
+USERS = ("standard_user", "locked_out_user", "problem_user")
+LOCKED_OUT_USER = "locked_out_user"
+TAX_RATE = 0.08
+
+
+class Product:
+    """
+    Product of the catalog, sorting rules name the attribute the products are sorted by.
+    """
+
+    def __init__(self, name: str, price: float) -> None:
+        self.name = name
+        self.price = price
+
+
+PRODUCTS = [
+    Product("Sauce Labs Backpack", 29.99),
+    Product("Sauce Labs Bike Light", 9.99),
+    Product("Sauce Labs Bolt T-Shirt", 15.99),
+    Product("Sauce Labs Fleece Jacket", 49.99),
+    Product("Sauce Labs Onesie", 7.99),
+    Product("Test.allTheThings() T-Shirt (Red)", 15.99),
+]
+SORTING_RULES = {
+    "Name (A to Z)": ("name", False),
+    "Name (Z to A)": ("name", True),
+    "Price (low to high)": ("price", False),
+    "Price (high to low)": ("price", True),
+}
+CHECKOUT_FIELDS = (
+    ("first-name", "test-First Name", "First Name is required"),
+    ("last-name", "test-Last Name", "Last Name is required"),
+    ("postal-code", "test-Zip/Postal Code", "Postal Code is required"),
+)
+DEEP_LINKS = {
+    "swag-overview": "products",
+    "swag-item": "details",
+    "cart": "cart",
+    "personal-info": "checkout",
+    "checkout-overview": "overview",
+    "complete": "complete",
+}
+
+
+class UiNode:
+    """
+    Node of the rendered screen.
+    """
+
+    def __init__(
+        self,
+        class_name: str,
+        key: Optional[str] = None,
+        desc: str = "",
+        text: str = "",
+        children: Optional[List["UiNode"]] = None,
+        clickable: bool = False,
+    ) -> None:
+        self.class_name = class_name
+        self.key = key
+        self.desc = desc
+        self.text = text
+        self.children = children or []
+        self.clickable = clickable
+
+
+class SwagLabsApp:
+    """
+    State of the simulated Swag Labs app.
+    """
+
+    WIDTH = 1080
+    HEIGHT = 2400
+    ROW_HEIGHT = 100
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears the app data, the app starts again on the login screen.
+        """
+        self.screen = "login"
+        self.fields: Dict[str, str] = {}
+        self.error = ""
+        self.cart: List[int] = []
+        self.grid_view = True
+        self.sorting_rule = "Name (A to Z)"
+        self.sorting_modal_open = False
+        self.details_product: Optional[int] = None
+        self.changed()
+
+    def restart(self) -> None:
+        """
+        Restarts the app on the login screen, the cart is kept like the app data on the device.
+        """
+        self.screen = "login"
+        self.fields = {}
+        self.error = ""
+        self.sorting_modal_open = False
+        self.details_product = None
+        self.changed()
+
+    def open_url(self, url: str) -> None:
+        """
+        Opens a swaglabs:// deep link, the cart is replaced with the products in the link.
+
+        :param url: deep link, eg. 'swaglabs://personal-info/0,2'
+        """
+        target, _, argument = url.removeprefix("swaglabs://").partition("/")
+        if target not in DEEP_LINKS:
+            raise ValueError(f"Unknown deep link {url}")
+        ids = [int(product) for product in argument.split(",") if product]
+        self.fields, self.error, self.sorting_modal_open = {}, "", False
+        self.screen = DEEP_LINKS[target]
+        if target == "swag-item":
+            self.details_product = ids[0]
+        else:
+            self.cart = ids
+        self.changed()
+
+    def changed(self) -> None:
+        self.version += 1
+
+    def sorted_products(self) -> List[int]:
+        attribute, reverse = SORTING_RULES[self.sorting_rule]
+        return sorted(
+            range(len(PRODUCTS)),
+            key=lambda index: getattr(PRODUCTS[index], attribute),
+            reverse=reverse,
+        )
+
+    def tap(self, action_key: str) -> None:
+        """
+        Performs the action of the interactive node.
+
+        :param action_key: sim-action of the tapped node, eg. 'item-button:3'
+        """
+        action, _, argument = action_key.partition(":")
+        if action == "user":
+            self.fields.update({"username": argument, "password": PASSWORD})
+        elif action == "login":
+            self._log_in()
+        elif action == "toggle":
+            self.grid_view = not self.grid_view
+        elif action == "sort":
+            self.sorting_modal_open = True
+        elif action == "sort-rule":
+            self.sorting_rule = argument
+            self.sorting_modal_open = False
+        elif action == "item":
+            self.screen, self.details_product = "details", int(argument)
+        elif action in ("item-button", "cart-remove"):
+            self._toggle_in_cart(int(argument))
+        elif action == "details-button":
+            self._toggle_in_cart(self.details_product)
+        elif action in ("details-back", "continue-shopping", "back-home", "overview-cancel"):
+            self.screen = "products"
+        elif action == "cart":
+            self.screen = "cart"
+        elif action == "checkout":
+            self.screen, self.error = "checkout", ""
+        elif action == "checkout-cancel":
+            self.screen = "cart"
+        elif action == "checkout-continue":
+            self._continue_checkout()
+        elif action == "finish":
+            self.screen, self.cart = "complete", []
+        self.changed()
+
+    def set_text(self, key: str, text: str) -> None:
+        """
+        Sets the value of the text field.
+
+        :param key: sim-action of the text field
+        :param text: new value
+        """
+        self.fields[key] = text
+        self.changed()
+
+    def render(self) -> UiNode:
+        """
+        Renders the current screen.
+
+        :return: root node of the screen
+        """
+        screens = {
+            "login": self._render_login,
+            "products": self._render_products,
+            "details": self._render_details,
+            "cart": self._render_cart,
+            "checkout": self._render_checkout,
+            "overview": self._render_overview,
+            "complete": self._render_complete,
+        }
+        content = screens[self.screen]()
+        if self.screen != "login":
+            content = [self._render_header()] + content
+        return UiNode(
+            FRAME_LAYOUT, "root", children=[UiNode(SCROLL_VIEW, "content", children=content)]
+        )
+
+    def page_source(self) -> str:
+        """
+        Renders the current screen as page source with bounds of every node.
+
+        :return: page source XML
+        """
+        hierarchy = ET.Element(
+            "hierarchy", {"rotation": "0", "width": str(self.WIDTH), "height": str(self.HEIGHT)}
+        )
+        self._to_xml(self.render(), hierarchy, "", 0, 0)
+        return ET.tostring(hierarchy, encoding="unicode")
+
+    def _log_in(self) -> None:
+        username, password = self.fields.get("username", ""), self.fields.get("password", "")
+        if not username:
+            self.error = "Username is required"
+        elif not password:
+            self.error = "Password is required"
+        elif username == LOCKED_OUT_USER and password == PASSWORD:
+            self.error = "Sorry, this user has been locked out."
+        elif username not in USERS or password != PASSWORD:
+            self.error = "Username and password do not match any user in this service."
+        else:
+            self.screen, self.error = "products", ""
+
+    def _continue_checkout(self) -> None:
+        for key, _, error in CHECKOUT_FIELDS:
+            if not self.fields.get(key):
+                self.error = error
+                return
+        self.screen, self.error = "overview", ""
+
+    def _toggle_in_cart(self, product: int) -> None:
+        if product in self.cart:
+            self.cart.remove(product)
+        else:
+            self.cart.append(product)
+
+    def _cart_totals(self) -> Tuple[float, float, float]:
+        item_total = round(sum(PRODUCTS[product].price for product in self.cart), 2)
+        tax = round(item_total * TAX_RATE, 2)
+        return item_total, tax, round(item_total + tax, 2)
+
+    @staticmethod
+    def _text(text: str, key: Optional[str] = None, desc: str = "") -> UiNode:
+        return UiNode(TEXT_VIEW, key, desc=desc, text=text)
+
+    @classmethod
+    def _button(cls, key: str, desc: str, label: str) -> UiNode:
+        return UiNode(VIEW_GROUP, key, desc=desc, children=[cls._text(label)], clickable=True)
+
+    def _render_error(self) -> List[UiNode]:
+        if not self.error:
+            return []
+        return [
+            UiNode(
+                VIEW_GROUP, "error", desc="test-Error message", children=[self._text(self.error)]
+            )
+        ]
+
+    def _render_login(self) -> List[UiNode]:
+        return [
+            UiNode(
+                EDIT_TEXT,
+                "username",
+                desc="test-Username",
+                text=self.fields.get("username", ""),
+                clickable=True,
+            ),
+            UiNode(
+                EDIT_TEXT,
+                "password",
+                desc="test-Password",
+                text=self.fields.get("password", ""),
+                clickable=True,
+            ),
+            self._button("login", "test-LOGIN", "LOGIN"),
+            *self._render_error(),
+            *[UiNode(TEXT_VIEW, f"user:{user}", text=user, clickable=True) for user in USERS],
+        ]
+
+    def _render_header(self) -> UiNode:
+        cart_children = [self._text(str(len(self.cart)), "cart-count")] if self.cart else []
+        return UiNode(
+            VIEW_GROUP,
+            "header",
+            children=[
+                self._button("menu", "test-Menu", "MENU"),
+                UiNode(
+                    VIEW_GROUP, "cart", desc="test-Cart", children=cart_children, clickable=True
+                ),
+            ],
+        )
+
+    def _render_products(self) -> List[UiNode]:
+        items = []
+        for product in self.sorted_products():
+            in_cart = product in self.cart
+            items.append(
+                UiNode(
+                    VIEW_GROUP,
+                    f"item:{product}",
+                    desc="test-Item",
+                    clickable=True,
+                    children=[
+                        self._text(PRODUCTS[product].name, desc="test-Item title"),
+                        self._text(f"${PRODUCTS[product].price:.2f}", desc="test-Price"),
+                        self._button(
+                            f"item-button:{product}",
+                            "test-REMOVE" if in_cart else "test-ADD TO CART",
+                            "REMOVE" if in_cart else "ADD TO CART",
+                        ),
+                    ],
+                )
+            )
+        products = UiNode(
+            VIEW_GROUP,
+            "products",
+            desc="test-PRODUCTS",
+            children=[
+                self._text("PRODUCTS"),
+                self._button("toggle", "test-Toggle", "GRID" if self.grid_view else "LIST"),
+                self._button("sort", "test-Modal Selector Button", "SORT"),
+                *items,
+            ],
+        )
+        content = [
+            UiNode(VIEW_GROUP, "drop-zone", desc="test-Cart drop zone", children=[products])
+        ]
+        if self.sorting_modal_open:
+            rules = [
+                UiNode(TEXT_VIEW, f"sort-rule:{rule}", text=rule, clickable=True)
+                for rule in SORTING_RULES
+            ]
+            content.append(
+                UiNode(VIEW_GROUP, "sorting", desc="Selector container", children=rules)
+            )
+        return content
+
+    def _render_details(self) -> List[UiNode]:
+        product = self.details_product
+        in_cart = product in self.cart
+        return [
+            UiNode(
+                VIEW_GROUP,
+                "details",
+                desc="test-Inventory item page",
+                children=[
+                    self._button("details-back", "test-BACK TO PRODUCTS", "BACK TO PRODUCTS"),
+                    UiNode(
+                        VIEW_GROUP,
+                        "description",
+                        desc="test-Description",
+                        children=[
+                            self._text(PRODUCTS[product].name),
+                            self._text("Product description"),
+                        ],
+                    ),
+                    self._text(f"${PRODUCTS[product].price:.2f}", desc="test-Price"),
+                    self._button(
+                        "details-button",
+                        "test-REMOVE" if in_cart else "test-ADD TO CART",
+                        "REMOVE" if in_cart else "ADD TO CART",
+                    ),
+                ],
+            )
+        ]
+
+    def _render_cart_row(self, product: int, removable: bool) -> UiNode:
+        children = [
+            UiNode(VIEW_GROUP, "amount", desc="test-Amount", children=[self._text("1")]),
+            UiNode(
+                VIEW_GROUP,
+                "description",
+                desc="test-Description",
+                children=[
+                    self._text(PRODUCTS[product].name),
+                    self._text("Product description"),
+                ],
+            ),
+            UiNode(
+                VIEW_GROUP,
+                "price",
+                desc="test-Price",
+                children=[self._text(f"${PRODUCTS[product].price:.2f}")],
+            ),
+        ]
+        if removable:
+            children.append(self._button(f"cart-remove:{product}", "test-REMOVE", "REMOVE"))
+        return UiNode(VIEW_GROUP, f"row:{product}", desc="test-Item", children=children)
+
+    def _render_cart(self) -> List[UiNode]:
+        return [
+            UiNode(
+                VIEW_GROUP,
+                "cart-content",
+                desc="test-Cart Content",
+                children=[
+                    self._text("YOUR CART"),
+                    *[self._render_cart_row(product, removable=True) for product in self.cart],
+                    self._button(
+                        "continue-shopping", "test-CONTINUE SHOPPING", "CONTINUE SHOPPING"
+                    ),
+                    self._button("checkout", "test-CHECKOUT", "CHECKOUT"),
+                ],
+            )
+        ]
+
+    def _render_checkout(self) -> List[UiNode]:
+        fields = [
+            UiNode(EDIT_TEXT, key, desc=desc, text=self.fields.get(key, ""), clickable=True)
+            for key, desc, _ in CHECKOUT_FIELDS
+        ]
+        return [
+            UiNode(
+                VIEW_GROUP,
+                "checkout-content",
+                desc="test-Checkout: Your Info",
+                children=[
+                    self._text("CHECKOUT: INFORMATION"),
+                    *fields,
+                    *self._render_error(),
+                    self._button("checkout-cancel", "test-CANCEL", "CANCEL"),
+                    self._button("checkout-continue", "test-CONTINUE", "CONTINUE"),
+                ],
+            )
+        ]
+
+    def _render_overview(self) -> List[UiNode]:
+        item_total, tax, total = self._cart_totals()
+        return [
+            UiNode(
+                VIEW_GROUP,
+                "overview",
+                desc="test-CHECKOUT: OVERVIEW",
+                children=[
+                    self._text("CHECKOUT: OVERVIEW"),
+                    *[self._render_cart_row(product, removable=False) for product in self.cart],
+                    self._text("Payment Information:"),
+                    self._text("SauceCard #31337"),
+                    self._text(f"Item total: ${item_total:.2f}"),
+                    self._text(f"Tax: ${tax:.2f}"),
+                    self._text(f"Total: ${total:.2f}"),
+                    self._button("overview-cancel", "test-CANCEL", "CANCEL"),
+                    self._button("finish", "test-FINISH", "FINISH"),
+                ],
+            )
+        ]
+
+    def _render_complete(self) -> List[UiNode]:
+        return [
+            UiNode(
+                VIEW_GROUP,
+                "complete",
+                desc="test-CHECKOUT: COMPLETE!",
+                children=[
+                    self._text("CHECKOUT: COMPLETE!"),
+                    self._text("THANK YOU FOR YOU ORDER"),
+                    self._button("back-home", "test-BACK HOME", "BACK HOME"),
+                ],
+            )
+        ]
+
+    def _to_xml(
+        self, node: UiNode, parent: ET.Element, parent_path: str, index: int, top: int
+    ) -> int:
+        short_class_name = node.class_name.rsplit(".", 1)[-1]
+        path = f"{parent_path}/{node.key or f'{short_class_name}{index}'}".lstrip("/")
+        element = ET.SubElement(
+            parent,
+            node.class_name,
+            {
+                "index": str(index),
+                "class": node.class_name,
+                "text": node.text,
+                "content-desc": node.desc,
+                "clickable": str(node.clickable).lower(),
+                "displayed": "true",
+                "sim-key": path,
+                "sim-action": node.key if node.clickable else "",
+            },
+        )
+        bottom = top
+        for child_index, child in enumerate(node.children):
+            bottom = self._to_xml(child, element, path, child_index, bottom)
+        bottom = max(bottom, top + self.ROW_HEIGHT)
+        element.set("bounds", f"[0,{top}][{self.WIDTH},{bottom}]")
+        return bottom
@@ -0,0 +1,332 @@
+"""
+In-process driver simulating an Appium session with the Swag Labs app.
+
+The driver implements the part of the Appium WebDriver API used by the framework on top of
+utils.simulated_app. Selectors are evaluated with utils.page_snapshot against the rendered
+screen, so page objects, helpers and tests run without a device or an Appium server. Select it
+with "remote": "simulator" in the configuration file, see configuration/simulator_config.json.
+"""
+
+import logging as log
+import re
+import struct
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from appium.webdriver.common.appiumby import AppiumBy
+from appium.webdriver.webelement import WebElement as AppiumWebElement
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+
+from utils.command_batch import ops_from_script, run_ops
+from utils.page_snapshot import PageSnapshot, SnapshotNode
+from utils.simulated_app import SwagLabsApp
+
+UI_SCROLLABLE = re.compile(r"^\s*new\s+UiScrollable\(.*?\)\s*\.scrollIntoView\((.*)\)\s*;?\s*$")
+
+
+class WebElement(AppiumWebElement):
+    """
+    Element of the simulated app. The element id is the sim-key of the node, an element which is
+    no longer rendered raises StaleElementReferenceException like a real one.
+    """
+
+    def __init__(self, parent: "SimulatedDriver", id_: str) -> None:
+        super().__init__(parent, id_)
+
+    @property
+    def node(self) -> SnapshotNode:
+        return self._parent.resolve(self._id)
+
+    @property
+    def text(self) -> str:
+        return self.node.text
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.class_name
+
+    @property
+    def rect(self) -> Dict[str, int]:
+        left, top, right, bottom = self.node.bounds
+        return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+    @property
+    def location(self) -> Dict[str, int]:
+        rect = self.rect
+        return {"x": rect["x"], "y": rect["y"]}
+
+    @property
+    def size(self) -> Dict[str, int]:
+        rect = self.rect
+        return {"width": rect["width"], "height": rect["height"]}
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.node.element.attrib.get(name)
+
+    def is_displayed(self) -> bool:
+        return self.node.displayed
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def click(self) -> None:
+        self._parent.click_node(self.node)
+
+    def clear(self) -> None:
+        self._parent.app.set_text(self.node.get_attribute("sim-action"), "")
+
+    def send_keys(self, *value: str) -> None:
+        node = self.node
+        self._parent.app.set_text(
+            node.get_attribute("sim-action"), node.text + "".join(map(str, value))
+        )
+
+    def find_element(
+        self, by: str = AppiumBy.ID, value: Union[str, Dict, None] = None
+    ) -> "WebElement":
+        return self._parent.find_element(by, value, parent=self.node)
+
+    # Same signature as the Appium element, which itself narrows the Selenium return type.
+    def find_elements(  # type: ignore[override]
+        self, by: str = AppiumBy.ID, value: Union[str, Dict, None] = None
+    ) -> List[AppiumWebElement]:
+        return self._parent.find_elements(by, value, parent=self.node)
+
+
+class Timeouts:
+    def __init__(self, implicit_wait: float) -> None:
+        self.implicit_wait = implicit_wait
+
+
+class ExecuteDriverResult:
+    def __init__(self, result: Any) -> None:
+        self.result = result
+        self.logs: Dict[str, List[str]] = {"log": [], "warn": [], "error": []}
+
+
+class SimulatedDriver:
+    """
+    Appium driver replacement backed by the simulated Swag Labs app.
+    """
+
+    def __init__(self, config_file: dict) -> None:
+        self.app = SwagLabsApp()
+        self.session_id: Optional[str] = uuid.uuid4().hex
+        self.capabilities: Dict[str, Any] = {
+            "platformName": config_file.get("platformName", "Android"),
+            "deviceName": config_file.get("deviceName", "simulator"),
+            "appPackage": config_file.get("appPackage", "com.swaglabsmobileapp"),
+            "pixelRatio": 2.625,
+            "statBarHeight": 63,
+        }
+        self.implicit_wait: float = 0
+        self.command_count = 0
+        self.installed = True
+        self._snapshot: Optional[PageSnapshot] = None
+        self._snapshot_version = -1
+        self._page_source = ""
+        log.info(f"Started simulated session {self.session_id}")
+
+    @property
+    def page_source(self) -> str:
+        self.snapshot()
+        return self._page_source
+
+    @property
+    def timeouts(self) -> Timeouts:
+        self._command()
+        return Timeouts(self.implicit_wait)
+
+    def snapshot(self) -> PageSnapshot:
+        """
+        Gets the parsed current screen, rendered again only after the app state changed.
+
+        :return: PageSnapshot of the current screen
+        """
+        self._command()
+        if self._snapshot_version != self.app.version:
+            self._page_source = self.app.page_source()
+            self._snapshot = PageSnapshot(self._page_source, "android")
+            self._snapshot_version = self.app.version
+        return self._snapshot
+
+    def resolve(self, key: str) -> SnapshotNode:
+        """
+        Finds the node of the element on the current screen.
+
+        :param key: sim-key of the node
+        :return: SnapshotNode
+        """
+        for node in self.snapshot().nodes:
+            if node.get_attribute("sim-key") == key:
+                return node
+        raise StaleElementReferenceException(f"Element {key} is no longer on the screen")
+
+    def find_elements(
+        self, by: str = AppiumBy.ID, value: Optional[str] = None, parent: SnapshotNode = None
+    ) -> List[WebElement]:
+        scrollable = (
+            UI_SCROLLABLE.match(value or "") if by == AppiumBy.ANDROID_UIAUTOMATOR else None
+        )
+        if scrollable:
+            # Every node of the simulated screen is rendered, scrolling into view is a lookup.
+            value = scrollable.group(1)
+        try:
+            nodes = self.snapshot().find_all((by, value), parent)
+        except ValueError as e:
+            raise InvalidSelectorException(str(e))
+        return [WebElement(self, node.get_attribute("sim-key")) for node in nodes]
+
+    def find_element(
+        self, by: str = AppiumBy.ID, value: Optional[str] = None, parent: SnapshotNode = None
+    ) -> WebElement:
+        elements = self.find_elements(by, value, parent)
+        if not elements:
+            raise NoSuchElementException(f"No element found by {by} {value}")
+        return elements[0]
+
+    def click_node(self, node: SnapshotNode) -> None:
+        """
+        Performs the action of the node or of its nearest clickable ancestor, like a tap on the
+        node center would.
+
+        :param node: tapped node
+        """
+        self._command()
+        while node is not None and not node.get_attribute("sim-action"):
+            node = node.parent
+        if node is not None:
+            self.app.tap(node.get_attribute("sim-action"))
+
+    def tap(self, positions: List[Tuple[int, int]], duration: Optional[int] = None) -> None:
+        x, y = positions[0]
+        containing = [
+            node
+            for node in self.snapshot().nodes
+            if node.bounds[0] <= x < node.bounds[2] and node.bounds[1] <= y < node.bounds[3]
+        ]
+        if containing:
+            self.click_node(containing[-1])
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 0) -> None:
+        self._command()
+
+    def get_window_size(self) -> Dict[str, int]:
+        self._command()
+        return {"width": self.app.WIDTH, "height": self.app.HEIGHT}
+
+    def implicitly_wait(self, time_to_wait: float) -> None:
+        self._command()
+        self.implicit_wait = time_to_wait
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self._command()
+        if script == "mobile: clearApp":
+            self.app.reset()
+        elif script == "mobile: deviceInfo":
+            return {"displayDensity": 420}
+        elif script == "mobile: getSystemBars":
+            return {"statusBar": {"visible": True, "height": 63}}
+        elif script == "mobile: activateApp":
+            self.activate_app(args[0]["appId"])
+        elif script == "mobile: terminateApp":
+            return self.terminate_app(args[0]["appId"])
+        elif script == "mobile: removeApp":
+            self.remove_app(args[0]["appId"])
+        elif script == "mobile: installApp":
+            self.install_app(args[0]["app"])
+        elif script == "mobile: isAppInstalled":
+            return self.is_app_installed(args[0]["appId"])
+        elif script == "mobile: hideKeyboard":
+            self.hide_keyboard()
+        elif script == "mobile: deepLink":
+            try:
+                self.app.open_url(args[0]["url"])
+            except ValueError as e:
+                raise WebDriverException(str(e))
+        else:
+            raise WebDriverException(f"Script {script} is not supported by the simulator")
+
+    def execute_driver(
+        self, script: str, script_type: str = "webdriverio", timeout_ms: Optional[int] = None
+    ) -> ExecuteDriverResult:
+        """
+        Runs batch scripts built by utils.command_batch, other WebdriverIO code is not
+        interpreted.
+        """
+        self._command()
+        try:
+            ops = ops_from_script(script)
+        except AssertionError as e:
+            raise WebDriverException(str(e))
+        # The operations run inside the one request, they are not counted as commands.
+        commands = self.command_count
+        result = run_ops(self, ops)
+        self.command_count = commands
+        return ExecuteDriverResult(result)
+
+    def activate_app(self, app_id: str) -> None:
+        self._command()
+
+    def terminate_app(self, app_id: str, **options: Any) -> bool:
+        self._command()
+        self.app.restart()
+        return True
+
+    def remove_app(self, app_id: str, **options: Any) -> None:
+        self._command()
+        self.installed = False
+        self.app.reset()
+
+    def install_app(self, app_path: str, **options: Any) -> None:
+        self._command()
+        self.installed = True
+
+    def is_app_installed(self, bundle_id: str) -> bool:
+        self._command()
+        return self.installed
+
+    def hide_keyboard(self, *args: Any, **kwargs: Any) -> None:
+        self._command()
+
+    def is_locked(self) -> bool:
+        self._command()
+        return False
+
+    def get_screenshot_as_png(self) -> bytes:
+        """
+        The simulated app is not rendered to pixels, the screenshot is a blank image of the
+        window size.
+        """
+        self._command()
+        width, height = self.app.WIDTH, self.app.HEIGHT
+        rows = (b"\x00" + b"\xff" * width * 3) * height
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            body = kind + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+        header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows))
+            + chunk(b"IEND", b"")
+        )
+
+    def get_log(self, log_type: str) -> List[Dict[str, Any]]:
+        self._command()
+        return []
+
+    def quit(self) -> None:
+        log.info(f"Simulated session {self.session_id} quit after {self.command_count} commands")
+        self.session_id = None
+
+    def _command(self) -> None:
+        self.command_count += 1
@@ -0,0 +1,337 @@
+"""
+Local stand-in for an Appium server, backed by the simulated Swag Labs app.
+
+The server speaks the W3C WebDriver protocol for the commands the framework sends and delays
+every response by a configurable latency, so the real client stack (webdriver.Remote,
+TunedAppiumConnection) can be measured at a chosen device round-trip time without a device.
+Every session gets its own utils.simulated_driver.SimulatedDriver.
+
+Usage: python -m utils.stand_in_server --port 4723 --latency-ms 50
+"""
+
+import argparse
+import json
+import logging as log
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import coloredlogs
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+
+from utils.simulated_driver import SimulatedDriver, WebElement
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+ERRORS: List[Tuple[type, int, str]] = [
+    (NoSuchElementException, 404, "no such element"),
+    (StaleElementReferenceException, 404, "stale element reference"),
+    (InvalidSelectorException, 400, "invalid selector"),
+    (WebDriverException, 500, "unknown error"),
+]
+Handler = Callable[["StandInAppiumServer", SimulatedDriver, dict, List[str]], Any]
+ROUTES: List[Tuple[str, re.Pattern, str, Handler]] = []
+
+
+def route(method: str, path: str) -> Callable[[Handler], Handler]:
+    """
+    Registers a session command handler. The path is relative to /session/{sessionId}, {name}
+    parts are passed to the handler as positional strings.
+
+    :param method: HTTP method
+    :param path: path template, eg. "/element/{id}/text"
+    :return: decorator
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        pattern = re.compile("^" + re.sub(r"\{\w+\}", "([^/]+)", path) + "$")
+        ROUTES.append((method, pattern, f"{method} {path}", handler))
+        return handler
+
+    return decorator
+
+
+def element_reference(element: WebElement) -> Dict[str, str]:
+    # Simulated element ids are node paths, they are quoted to fit into a single URL segment.
+    return {ELEMENT_KEY: quote(element.id, safe="")}
+
+
+@route("POST", "/element")
+def find_element(server, driver, body, args):
+    return element_reference(driver.find_element(body["using"], body["value"]))
+
+
+@route("POST", "/elements")
+def find_elements(server, driver, body, args):
+    return [element_reference(e) for e in driver.find_elements(body["using"], body["value"])]
+
+
+@route("POST", "/element/{id}/element")
+def find_child_element(server, driver, body, args):
+    parent = driver.resolve(args[0])
+    return element_reference(driver.find_element(body["using"], body["value"], parent))
+
+
+@route("POST", "/element/{id}/elements")
+def find_child_elements(server, driver, body, args):
+    parent = driver.resolve(args[0])
+    elements = driver.find_elements(body["using"], body["value"], parent)
+    return [element_reference(e) for e in elements]
+
+
+@route("GET", "/element/{id}/text")
+def element_text(server, driver, body, args):
+    return WebElement(driver, args[0]).text
+
+
+@route("GET", "/element/{id}/rect")
+def element_rect(server, driver, body, args):
+    return WebElement(driver, args[0]).rect
+
+
+@route("GET", "/element/{id}/attribute/{name}")
+def element_attribute(server, driver, body, args):
+    return WebElement(driver, args[0]).get_attribute(args[1])
+
+
+@route("GET", "/element/{id}/displayed")
+def element_displayed(server, driver, body, args):
+    return WebElement(driver, args[0]).is_displayed()
+
+
+@route("GET", "/element/{id}/enabled")
+def element_enabled(server, driver, body, args):
+    return WebElement(driver, args[0]).is_enabled()
+
+
+@route("POST", "/element/{id}/click")
+def element_click(server, driver, body, args):
+    WebElement(driver, args[0]).click()
+
+
+@route("POST", "/element/{id}/clear")
+def element_clear(server, driver, body, args):
+    WebElement(driver, args[0]).clear()
+
+
+@route("POST", "/element/{id}/value")
+def element_send_keys(server, driver, body, args):
+    WebElement(driver, args[0]).send_keys(body.get("text") or "".join(body.get("value", [])))
+
+
+@route("GET", "/source")
+def page_source(server, driver, body, args):
+    return driver.page_source
+
+
+@route("GET", "/window/rect")
+def window_rect(server, driver, body, args):
+    return {"x": 0, "y": 0, **driver.get_window_size()}
+
+
+@route("GET", "/timeouts")
+def get_timeouts(server, driver, body, args):
+    return {"implicit": int(driver.implicit_wait * 1000), "pageLoad": 300000, "script": 30000}
+
+
+@route("POST", "/timeouts")
+def set_timeouts(server, driver, body, args):
+    if "implicit" in body:
+        driver.implicitly_wait(body["implicit"] / 1000)
+
+
+@route("POST", "/execute/sync")
+def execute_script(server, driver, body, args):
+    return driver.execute_script(body["script"], *body.get("args", []))
+
+
+@route("POST", "/appium/execute_driver")
+def execute_driver(server, driver, body, args):
+    executed = driver.execute_driver(body["script"], body.get("type"), body.get("timeout"))
+    result = [
+        element_reference(item) if isinstance(item, WebElement) else item
+        for item in executed.result
+    ]
+    return {"result": result, "logs": executed.logs}
+
+
+@route("POST", "/actions")
+def perform_actions(server, driver, body, args):
+    for source in body.get("actions", []):
+        if source.get("type") != "pointer":
+            continue
+        moves = [(a["x"], a["y"]) for a in source["actions"] if a["type"] == "pointerMove"]
+        if not moves:
+            continue
+        if moves[0] == moves[-1]:
+            driver.tap([moves[0]])
+        else:
+            driver.swipe(*moves[0], *moves[-1])
+
+
+@route("DELETE", "/actions")
+def release_actions(server, driver, body, args):
+    return None
+
+
+class StandInAppiumServer(ThreadingHTTPServer):
+    """
+    HTTP server answering WebDriver commands from simulated sessions after the configured latency.
+    Commands are counted per route, the counters can be read while tests are running.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", port), _RequestHandler)
+        self.latency = latency
+        self.sessions: Dict[str, SimulatedDriver] = {}
+        self.command_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def commands(self) -> int:
+        """
+        Number of commands received so far, session creation and deletion included.
+        """
+        with self._lock:
+            return sum(self.command_counts.values())
+
+    def start(self) -> "StandInAppiumServer":
+        """
+        Serves requests on a background thread.
+
+        :return: the server
+        """
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="stand-in-appium", daemon=True
+        )
+        self._thread.start()
+        log.info(f"Stand-in Appium server on {self.url}, latency {self.latency * 1000:.0f} ms")
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def handle_command(self, method: str, path: str, body: dict) -> Tuple[int, Any]:
+        """
+        Dispatches one WebDriver command to the session it belongs to.
+
+        :param method: HTTP method
+        :param path: request path
+        :param body: decoded JSON body
+        :return: tuple of HTTP status and the value of the response
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        if method == "POST" and path == "/session":
+            self._count("POST /session")
+            return 200, self._new_session(body)
+        match = re.match(r"^/session/([^/]+)(/.*)?$", path)
+        if match is None:
+            return 404, self._error("unknown command", f"{method} {path}")
+        session_id, command_path = match.group(1), match.group(2) or ""
+        driver = self.sessions.get(session_id)
+        if driver is None:
+            return 404, self._error("invalid session id", session_id)
+        if method == "DELETE" and command_path == "":
+            self._count("DELETE /session")
+            self.sessions.pop(session_id).quit()
+            return 200, None
+        for route_method, pattern, name, handler in ROUTES:
+            args = pattern.match(command_path)
+            if route_method == method and args:
+                self._count(name)
+                try:
+                    return 200, handler(self, driver, body, [unquote(a) for a in args.groups()])
+                except WebDriverException as e:
+                    status, error = next(
+                        (status, error) for kind, status, error in ERRORS if isinstance(e, kind)
+                    )
+                    return status, self._error(error, e.msg)
+        self._count(f"{method} {command_path} (unsupported)")
+        return 404, self._error("unknown command", f"{method} {command_path}")
+
+    def _new_session(self, body: dict) -> dict:
+        capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+        driver = SimulatedDriver(
+            {
+                "platformName": capabilities.get("platformName", "Android"),
+                "deviceName": capabilities.get("appium:deviceName", "stand-in"),
+                "appPackage": capabilities.get("appium:appPackage", "com.swaglabsmobileapp"),
+            }
+        )
+        self.sessions[driver.session_id] = driver
+        return {"sessionId": driver.session_id, "capabilities": driver.capabilities}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.command_counts[name] = self.command_counts.get(name, 0) + 1
+
+    @staticmethod
+    def _error(error: str, message: str) -> dict:
+        return {"error": error, "message": message or "", "stacktrace": ""}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: StandInAppiumServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, with Nagle's algorithm every response would wait
+    # for the delayed ACK of the client and add ~40 ms to the configured latency.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._respond("GET")
+
+    def do_POST(self) -> None:
+        self._respond("POST")
+
+    def do_DELETE(self) -> None:
+        self._respond("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug("Stand-in Appium server: " + format, *args)
+
+    def _respond(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        body = json.loads(raw_body) if raw_body else {}
+        path = self.path.split("?")[0].rstrip("/").removeprefix("/wd/hub")
+        status, value = self.server.handle_command(method, path, body)
+        payload = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main() -> None:
+    coloredlogs.install()
+    parser = argparse.ArgumentParser(description="Serve the simulated app as an Appium server")
+    parser.add_argument("--port", type=int, default=4723)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay of every response")
+    args = parser.parse_args()
+    server = StandInAppiumServer(args.port, args.latency_ms / 1000)
+    log.info(f"Stand-in Appium server on {server.url}, latency {args.latency_ms:.0f} ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
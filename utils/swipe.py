@@ -1,11 +1,14 @@
 import logging
 import logging as log
-from typing import Literal, Optional
+import math
+from typing import Dict, Literal, Optional, Tuple
 
+from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
-from appium.webdriver.webelement import WebElement
+from selenium.webdriver.remote.webelement import WebElement
 
 from utils import ELEMENT
+from utils.device_profile import device_profile_for
 from utils.driver_commands import DriverCommands
 
 
@@ -15,15 +18,29 @@ class Swipe:
         driver: WebDriver,
         screen_border_x: int = 100,
         screen_border_y: Optional[int] = None,
+        fast_scroll: bool = True,
+        driver_commands: Optional[DriverCommands] = None,
     ) -> None:
         self.driver = driver
-        self.screen_size = self.driver.get_window_size()
-        self.dc = DriverCommands(self.driver)
+        self.fast_scroll = fast_scroll
+        self.device = device_profile_for(self.driver)
+        self.dc = driver_commands or DriverCommands(self.driver)
         self.screen_border_x = screen_border_x
-        if not screen_border_y:
-            self.screen_border_y = self.screen_size.get("height") / 5
-        else:
-            self.screen_border_y = screen_border_y
+        self._screen_border_y = screen_border_y
+
+    @property
+    def screen_size(self) -> Dict[str, int]:
+        """
+        Window size taken from the device profile shared by the driver session.
+        """
+        return self.device.window_size
+
+    @property
+    def screen_border_y(self) -> float:
+        """
+        Vertical border of swipes, by default one fifth of the screen height.
+        """
+        return self._screen_border_y or self.screen_size.get("height") / 5
 
     def swipe(
         self,
@@ -53,6 +70,7 @@ class Swipe:
                 end_y=end_y,
                 duration=duration,
             )
+        self.dc.element_cache.next_generation()
 
     def _swipe_in_specified_direction(
         self, direction: Literal["down", "up", "right", "left"], **kwargs: int
@@ -93,10 +111,10 @@ class Swipe:
         duration = kwargs.get("duration") or 1000
         count = kwargs.get("count") or 1
         self.swipe(
-            start_x=start_x,
-            start_y=start_y,
-            end_x=end_x,
-            end_y=end_y,
+            start_x=int(start_x),
+            start_y=int(start_y),
+            end_x=int(end_x),
+            end_y=int(end_y),
             duration=duration,
             count=count,
         )
@@ -205,7 +223,9 @@ class Swipe:
         """
         Swipes in the specified direction until the element is visible on the screen,
         this method performs repeated swipes in the given direction until the specified
-        element becomes visible or the maximum number of swipes is reached.
+        element becomes visible or the maximum number of swipes is reached. When fast_scroll is
+        enabled, scrolling up or down is first attempted with a single scroll into view, see
+        _scroll_into_view; the repeated swipes are the fallback.
 
         :param direction: the direction to swipe, must be one of:
             - 'up'
@@ -217,25 +237,119 @@ class Swipe:
         :param max_count_of_swipe: the maximum number of swipes to perform, defaults to 10
         :returns: the found element if it becomes visible within the maximum number of swipes
         """
-        if isinstance(my_object, str):
-            my_object = self.dc.convert_selector(my_object)
+        locator: Tuple[str, str] = self.dc.convert_selector(my_object)
         for i in range(max_count_of_swipe):
-            element = self.dc.find_elements(my_object)
+            element = self.dc.find_elements(locator)
             if element and element[0].is_displayed():
                 logging.info(
-                    f"Element {my_object} found after {i}"
+                    f"Element {locator} found after {i}"
                     f" swipes to {direction}. ID: {element[0].id}"
                 )
                 return element[0]
-            else:
-                log.info(f"Element {my_object} not visible. Swiping {direction}.")
-                match direction:
-                    case "up":
-                        self.swipe_up(duration=duration)
-                    case "down":
-                        self.swipe_down(duration=duration)
-                    case "left":
-                        self.swipe_left(duration=duration)
-                    case "right":
-                        self.swipe_right(duration=duration)
-        assert False, f"{my_object} not found after {max_count_of_swipe} swipes to {direction}"
+            elif i == 0 and self.fast_scroll and direction in ("up", "down"):
+                scrolled_element = self._scroll_into_view(locator, duration)
+                if scrolled_element is not None:
+                    return scrolled_element
+            log.info(f"Element {locator} not visible. Swiping {direction}.")
+            match direction:
+                case "up":
+                    self.swipe_up(duration=duration)
+                case "down":
+                    self.swipe_down(duration=duration)
+                case "left":
+                    self.swipe_left(duration=duration)
+                case "right":
+                    self.swipe_right(duration=duration)
+        assert False, f"{locator} not found after {max_count_of_swipe} swipes to {direction}"
+
+    def _scroll_into_view(
+        self, my_object: Tuple[str, str], duration: Optional[int]
+    ) -> Optional[WebElement]:
+        """
+        Scrolls to the element in one step. On Android accessibility id and UiSelector selectors
+        are scrolled to with a single UiScrollable scrollIntoView command, otherwise the scroll
+        distance is computed from the element bounds read from one page source snapshot.
+
+        :param my_object: the element to scroll to
+        :param duration: the duration of the swipe in milliseconds
+        :return: the element if it is visible after scrolling, None otherwise
+        """
+        scroll_selector = self.scroll_into_view_selector(my_object)
+        if scroll_selector:
+            log.info(f"Scrolling {my_object} into view with UiScrollable")
+            self.dc.find_elements(scroll_selector)
+            self.dc.element_cache.next_generation()
+        elif not self._swipe_by_element_bounds(my_object, duration):
+            return None
+        element = self.dc.find_elements(my_object)
+        if element and element[0].is_displayed():
+            log.info(f"Element {my_object} scrolled into view. ID: {element[0].id}")
+            return element[0]
+        return None
+
+    def scroll_into_view_selector(self, my_object: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        """
+        Builds the Android selector which scrolls the element into view when it is looked up,
+        usable eg. as an optional find of a CommandBatch.
+
+        :param my_object: selector tuple of the element to scroll to
+        :return: UiScrollable selector or None on iOS and for selectors which can not be
+            converted
+        """
+        ui_selector = self._to_ui_selector(my_object) if self.dc.driver_is_android() else None
+        if ui_selector is None:
+            return None
+        return (
+            AppiumBy.ANDROID_UIAUTOMATOR,
+            f"new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView({ui_selector})",
+        )
+
+    @staticmethod
+    def _to_ui_selector(my_object: Tuple[str, str]) -> Optional[str]:
+        """
+        Converts selector to UiSelector expression usable in UiScrollable.
+
+        :param my_object: selector tuple
+        :return: UiSelector expression or None if the selector can not be converted
+        """
+        by, value = my_object
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            escaped_value = value.replace("\\", "\\\\").replace('"', '\\"')
+            return f'new UiSelector().description("{escaped_value}")'
+        if by == AppiumBy.ANDROID_UIAUTOMATOR and value.strip().startswith("new UiSelector()"):
+            return value
+        return None
+
+    def _swipe_by_element_bounds(
+        self, my_object: Tuple[str, str], duration: Optional[int]
+    ) -> bool:
+        """
+        Finds the element in the page source and swipes by the distance between the element and
+        the middle of the screen, split into as few swipes as the screen borders allow.
+
+        :param my_object: the element to scroll to
+        :param duration: the duration of each swipe in milliseconds
+        :return: True if the swipe was performed, False if the element is not in the page source
+            or is already on the screen
+        """
+        try:
+            node = self.dc.snapshot().find(my_object)
+        except ValueError as e:
+            log.info(f"Can not compute scroll distance to {my_object}: {e}")
+            return False
+        height = self.screen_size["height"]
+        if node is None or self.screen_border_y <= node.bounds[1] <= height - self.screen_border_y:
+            return False
+        distance = (node.bounds[1] + node.bounds[3]) / 2 - height / 2
+        count = math.ceil(abs(distance) / (height - 2 * self.screen_border_y))
+        step = distance / count
+        log.info(f"Swiping {distance:.0f} px to {my_object} in {count} swipes")
+        self.swipe(
+            start_x=int(self.screen_size["width"] / 2),
+            start_y=int(height / 2 + step / 2),
+            end_x=int(self.screen_size["width"] / 2),
+            end_y=int(height / 2 - step / 2),
+            duration=duration or 1000,
+            count=count,
+        )
+        return True
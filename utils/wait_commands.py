@@ -2,10 +2,10 @@ import logging as log
 from typing import Tuple
 
 from appium import webdriver
-from appium.webdriver.webelement import WebElement
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.remote.webelement import WebElement
+
+from utils.wait_strategies import WaitStrategy, wait_strategy_for
 
 
 class WaitCommands:
@@ -15,6 +15,13 @@ class WaitCommands:
         self.interval: float = 0.5
         self.wait_time: int = 5
 
+    @property
+    def strategy(self) -> WaitStrategy:
+        """
+        Wait strategy of the driver session, see utils.wait_strategies.
+        """
+        return wait_strategy_for(self.driver)
+
     def wait_for_element_visibility(
         self, selector: Tuple[str, str], wait: float = None
     ) -> WebElement:
@@ -25,12 +32,10 @@ class WaitCommands:
         :param wait: time to wait
         """
         wait = wait or self.wait_time
-        log.debug(f"Waiting {wait} seconds for visibility of element {selector}")
+        log.debug("Waiting %s seconds for visibility of element %s", wait, selector)
         try:
-            element = WebDriverWait(self.driver, wait, poll_frequency=1).until(
-                EC.visibility_of_element_located(selector)
-            )
-            log.debug(f"Element by {selector} is visible. (ID: {element.id})")
+            element = self.strategy.visibility(self.driver, selector, wait)
+            log.debug("Element by %s is visible. (ID: %s)", selector, element.id)
             return element
         except (TimeoutException, NoSuchElementException):
             raise AssertionError(f"Could not find element {selector}")
@@ -45,7 +50,7 @@ class WaitCommands:
         :param wait: time to wait
         """
         wait = wait or self.wait_time
-        log.info(f"Waiting {wait} seconds for visibility of element {selector}")
-        element = WebDriverWait(self.driver, wait).until(EC.presence_of_element_located(selector))
-        log.info(f"Element by {selector} is presence in DOM. (ID: {element.id})")
+        log.debug("Waiting %s seconds for presence of element %s", wait, selector)
+        element = self.strategy.presence(self.driver, selector, wait)
+        log.debug("Element by %s is presence in DOM. (ID: %s)", selector, element.id)
         return element
@@ -0,0 +1,246 @@
+import logging as log
+import os
+import time
+import weakref
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Tuple, TypeVar, Union
+
+from appium.webdriver.webdriver import WebDriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+T = TypeVar("T")
+SERVER_IMPLICIT_WAIT: float = float(os.getenv("SERVER_IMPLICIT_WAIT", "1"))
+SearchContext = Union[WebDriver, WebElement]
+
+
+class WaitStrategy(ABC):
+    """
+    Defines how WaitCommands waits for elements. Subclasses implement until; strategies which
+    change session state override probe to restore it before lookups that must not wait.
+    """
+
+    @abstractmethod
+    def until(
+        self,
+        driver: SearchContext,
+        condition: Callable[[SearchContext], T],
+        timeout: float,
+        message: str,
+    ) -> T:
+        """
+        Waits until the condition returns a truthy value.
+
+        :param driver: Appium driver or WebElement the condition is called with
+        :param condition: callable, e.g. an expected condition
+        :param timeout: time to wait
+        :param message: message of the TimeoutException raised when the time is up
+        :return: value returned by the condition
+        """
+
+    def presence(
+        self,
+        driver: WebDriver,
+        selector: Tuple[str, str],
+        timeout: float,
+        parent: Optional[WebElement] = None,
+    ) -> WebElement:
+        """
+        Waits until the element is present in the DOM.
+
+        :param driver: Appium driver
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param timeout: time to wait
+        :param parent: element to search in, by default the whole screen
+        :return: WebElement
+        """
+        return self.until(
+            parent or driver,
+            EC.presence_of_element_located(selector),
+            timeout,
+            f"{selector} not present",
+        )
+
+    def visibility(
+        self, driver: WebDriver, selector: Tuple[str, str], timeout: float
+    ) -> WebElement:
+        """
+        Waits until the element is visible on the screen.
+
+        :param driver: Appium driver
+        :param selector: tuple (eg. By.ID, 'element/id')
+        :param timeout: time to wait
+        :return: WebElement
+        """
+        element = self.until(
+            driver, EC.visibility_of_element_located(selector), timeout, f"{selector} not visible"
+        )
+        # The condition returns False while the element is hidden, until returns truthy values.
+        assert element is not False
+        return element
+
+    def probe(self, driver: WebDriver) -> None:
+        """
+        Prepares the session for a lookup which has to return immediately, e.g. find_elements.
+
+        :param driver: Appium driver
+        """
+
+
+class PollingWaitStrategy(WaitStrategy):
+    """
+    Polls the condition with a fixed interval.
+    """
+
+    def __init__(self, poll_frequency: float = 0.5) -> None:
+        self.poll_frequency = poll_frequency
+
+    def until(
+        self,
+        driver: SearchContext,
+        condition: Callable[[SearchContext], T],
+        timeout: float,
+        message: str,
+    ) -> T:
+        return WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(
+            condition, message
+        )
+
+
+class AdaptivePollingWaitStrategy(WaitStrategy):
+    """
+    Polls the condition starting with a short interval which grows with every attempt, so fast
+    transitions are noticed within tens of milliseconds and long waits send few requests.
+    """
+
+    def __init__(
+        self, initial_interval: float = 0.05, factor: float = 1.6, max_interval: float = 1.0
+    ) -> None:
+        self.initial_interval = initial_interval
+        self.factor = factor
+        self.max_interval = max_interval
+
+    def until(
+        self,
+        driver: SearchContext,
+        condition: Callable[[SearchContext], T],
+        timeout: float,
+        message: str,
+    ) -> T:
+        end_time = time.monotonic() + timeout
+        interval = self.initial_interval
+        while True:
+            try:
+                value = condition(driver)
+                if value:
+                    return value
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message)
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.factor, self.max_interval)
+
+
+class ServerSideWaitStrategy(WaitStrategy):
+    """
+    Lets the Appium server wait for elements with one fixed implicit wait, set once per session
+    on first use, so a wait costs a find request per implicit wait period instead of a request
+    per poll. Lookups which return at once, eg. find_elements and batch scripts, run with the
+    same implicit wait and take it only when nothing matches, which keeps it short.
+    """
+
+    def __init__(
+        self, fallback: Optional[WaitStrategy] = None, implicit_wait: float = SERVER_IMPLICIT_WAIT
+    ) -> None:
+        self.fallback = fallback or AdaptivePollingWaitStrategy()
+        self.implicit_wait = implicit_wait
+        self._implicit_wait_set = False
+
+    def until(
+        self,
+        driver: SearchContext,
+        condition: Callable[[SearchContext], T],
+        timeout: float,
+        message: str,
+    ) -> T:
+        if not isinstance(driver, WebElement):
+            self.probe(driver)
+        return self.fallback.until(driver, condition, timeout, message)
+
+    def presence(
+        self,
+        driver: WebDriver,
+        selector: Tuple[str, str],
+        timeout: float,
+        parent: Optional[WebElement] = None,
+    ) -> WebElement:
+        self.probe(driver)
+        end_time = time.monotonic() + timeout
+        while True:
+            try:
+                return (parent or driver).find_element(*selector)
+            except NoSuchElementException:
+                # Every attempt already waited the implicit wait on the server.
+                if time.monotonic() >= end_time:
+                    raise TimeoutException(f"{selector} not present")
+
+    def visibility(
+        self, driver: WebDriver, selector: Tuple[str, str], timeout: float
+    ) -> WebElement:
+        start_time = time.monotonic()
+        element = self.presence(driver, selector, timeout)
+        if element.is_displayed():
+            return element
+        remaining = max(timeout - (time.monotonic() - start_time), 0)
+        visible = self.until(
+            driver,
+            EC.visibility_of_element_located(selector),
+            remaining,
+            f"{selector} not visible",
+        )
+        assert visible is not False
+        return visible
+
+    def probe(self, driver: WebDriver) -> None:
+        if not self._implicit_wait_set:
+            driver.implicitly_wait(self.implicit_wait)
+            self._implicit_wait_set = True
+
+
+WAIT_STRATEGIES = {
+    "polling": PollingWaitStrategy,
+    "adaptive": AdaptivePollingWaitStrategy,
+    "server": ServerSideWaitStrategy,
+}
+PLATFORM_WAIT_STRATEGIES = {
+    "android": "server",
+    "ios": "adaptive",
+}
+
+_WAIT_STRATEGIES: "weakref.WeakKeyDictionary[WebDriver, WaitStrategy]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def wait_strategy_for(driver: WebDriver) -> WaitStrategy:
+    """
+    Gets the wait strategy of the driver session. WAIT_STRATEGY environment variable selects
+    polling, adaptive or server strategy, otherwise the default for the platform is used.
+
+    :param driver: Appium driver
+    :return: WaitStrategy shared by all helpers using the driver
+    """
+    if driver not in _WAIT_STRATEGIES:
+        platform = driver.capabilities.get("platformName", "").lower()
+        name = os.getenv("WAIT_STRATEGY") or PLATFORM_WAIT_STRATEGIES.get(platform, "adaptive")
+        log.info(f"Using {name} wait strategy")
+        _WAIT_STRATEGIES[driver] = WAIT_STRATEGIES[name]()
+    return _WAIT_STRATEGIES[driver]